@@ -1,11 +1,32 @@
+import math
+import time
+import tracemalloc
+from collections import deque
+
 import cv2
-import numpy as np
 from PyQt5.QtGui import QImage
 from PyQt5.QtCore import QThread, pyqtSignal
+from processing.averaging import TemporalAverager
+from processing.awb import AwbController
+from processing.buffer_pool import BufferPool
+from processing.capture import CaptureThread
+from processing.focus import FocusMeter
+from processing.frame import BGR8, MONO8, RGB8, Frame
+from processing.geometry import NATIVE_GEOMETRY, DisplayGeometry, letterbox_rect, output_size
+from processing.histogram import HistogramEngine
+from processing.pipeline import apply_grayscale
+from processing.sources import OpenCVSource
+from processing.tone import ToneMapper
 
 # worker thread (QThread) for camera
 class CameraWorkerThread(QThread):
-    change_pixmap_signal = pyqtSignal(QImage)
+    change_pixmap_signal = pyqtSignal(object)  # Frame
+    histogram_signal = pyqtSignal(QImage)
+    snapshot_signal = pyqtSignal(object, str)  # full-resolution BGR or MONO Frame, request purpose
+    burst_finished_signal = pyqtSignal(object)  # filled BurstRing
+    focus_signal = pyqtSignal(float)
+    timelapse_signal = pyqtSignal(object, int)  # full-resolution Frame, capture number
+    source_ended_signal = pyqtSignal(str)  # the source failed or ran out of frames; reason
 
     def __init__(self):
         super().__init__()
@@ -13,142 +34,341 @@ class CameraWorkerThread(QThread):
         self.brightness = 50
         self.contrast = 50
         self.exposure = 50
+        self.tone = ToneMapper(self.brightness, self.contrast, self.exposure)
         self.zoom = 15  # Default 1.0x
         self.auto_awb = True
         self.grayscale = False
         self.ThreadActive = False
         self.camera_index = 0
+        self.source = None
+        self.snapshot_requests = deque()  # purposes; appended by the GUI thread, popped here
+        self.capture_shape = None
+        self.capture_format = None
+        self.timelapse = None
+        self.preview_interval = None  # None processes every frame
+        self._next_preview = 0.0
+        self.buffer_pool = BufferPool()
+        self.bytes_allocated_per_frame = 0  # pool buffers allocated by the last frame
+        self.bytes_transient_per_frame = None  # peak temporary allocation of the last frame, when tracing
+        self.capture = None
+        self.display_geometry = NATIVE_GEOMETRY
+        self.recorder = None
+        self.histogram = HistogramEngine()
+        self.awb = AwbController()
+        self.averager = TemporalAverager()
+        self.focus = FocusMeter()
+        self.focus_enabled = True
+        self.average_outputs = False  # average at full resolution so snapshots/recordings get it too
 
     def run(self):
         self.ThreadActive = True
-        cap = cv2.VideoCapture(0) # camera source
+        source = self.source or OpenCVSource(self.camera_index) # camera source
 
-        if not cap.isOpened():
+        if not source.open():
             print("Cannot open camera")
             self.ThreadActive = False
+            self.source_ended_signal.emit("Cannot open camera")
             return
 
-        actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        print(f"Camera resolution: {actual_width}x{actual_height}")
-
-        while self.ThreadActive:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # brightness and contrast adjustments
-            brightness_factor = (self.brightness - 50) * 2
-            contrast_factor = (self.contrast - 50) / 50.0
-            bright_frame = cv2.convertScaleAbs(frame, alpha=1 + contrast_factor, beta=brightness_factor)
-
-            exposure_factor = (self.exposure - 50) / 50.0
-            adjusted_image = cv2.convertScaleAbs(bright_frame, alpha=1.0, beta=exposure_factor * 50)
-
-            frame = cv2.flip(adjusted_image, 1)
-
-            display_width = getattr(self, 'display_width', actual_width)  # Set your actual display width
-            display_height = getattr(self, 'display_height', actual_height)  # Set your actual display height
-
-            h, w = frame.shape[:2]
-
-            # scaling factor
-            scale_w = display_width / w
-            scale_h = display_height / h
-            scale_factor = min(scale_w, scale_h)
-
-            new_width = int(w * scale_factor)
-            new_height = int(h * scale_factor)
-
-            # resize
-            fitted_image = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
-
-            # display canvas dimensions
-            canvas = np.zeros((display_height, display_width, 3), dtype=np.uint8)
-
-            # camera frame position
-            start_x = (display_width - new_width) // 2
-            start_y = (display_height - new_height) // 2
-
-            canvas[start_y:start_y + new_height, start_x:start_x + new_width] = fitted_image
-
-            # Use the fitted image for further processing
-            zoomed_image = canvas
-
-            # Auto White Balance
-            if getattr(self, 'auto_awb', False):
-                # Use center region for more accurate AWB
-                h_awb, w_awb = zoomed_image.shape[:2]
-                center_region = zoomed_image[h_awb // 4:3 * h_awb // 4, w_awb // 4:3 * w_awb // 4]
-
-                b, g, r = cv2.split(center_region)
-                avg_b = cv2.mean(b)[0]
-                avg_g = cv2.mean(g)[0]
-                avg_r = cv2.mean(r)[0]
+        print(f"Camera: {source.describe()}")
 
-                # Calculate scaling factors
-                avg_gray = (avg_b + avg_g + avg_r) / 3
+        # acquisition runs on its own thread and hands over only the newest frame
+        self.capture = CaptureThread(source)
+        self.capture.start()
 
-                if avg_b > 0 and avg_g > 0 and avg_r > 0:
-                    scale_b = avg_gray / avg_b
-                    scale_g = avg_gray / avg_g
-                    scale_r = avg_gray / avg_r
-
-                    # Apply AWB to entire image
-                    b_full, g_full, r_full = cv2.split(zoomed_image)
-                    b_full = cv2.convertScaleAbs(b_full, alpha=scale_b)
-                    g_full = cv2.convertScaleAbs(g_full, alpha=scale_g)
-                    r_full = cv2.convertScaleAbs(r_full, alpha=scale_r)
-
-                    awb_image = cv2.merge([b_full, g_full, r_full])
-                else:
-                    awb_image = zoomed_image
-            else:
-                awb_image = zoomed_image
-
-            # Apply grayscale if enabled
-            if getattr(self, 'grayscale', False):
-                awb_image = cv2.cvtColor(awb_image, cv2.COLOR_BGR2GRAY)
-                awb_image = cv2.cvtColor(awb_image, cv2.COLOR_GRAY2BGR)
-
-            # Convert BGR to RGB for Qt display
-            color_swapped_image = cv2.cvtColor(awb_image, cv2.COLOR_BGR2RGB)
-
-            # Create Qt image
-            qt_image = QImage(color_swapped_image.data,
-                              color_swapped_image.shape[1],
-                              color_swapped_image.shape[0],
-                              color_swapped_image.strides[0],
-                              QImage.Format_RGB888)
-
-            # Emit the signal to update the display
-            self.change_pixmap_signal.emit(qt_image)
+        while self.ThreadActive:
+            captured = self.capture.mailbox.take(timeout=0.5)
+            if captured is None:
+                if self.capture.mailbox.closed:
+                    break  # camera stopped delivering frames
+                continue
+            self.capture_shape = captured.image.shape
+            self.capture_format = captured.pixel_format
+            if not self.frame_wanted(captured.timestamp):
+                # throttled: hand the buffer straight back, no processing and no repaint
+                self.capture.recycle(captured)
+                continue
+            marks = {'capture': captured.timestamp, 'dequeued': time.monotonic()}
+            display_frame = self.process_counted(captured, marks)
+
+            # the raw frame is no longer needed; give its buffer back to the capture thread
+            self.capture.recycle(captured)
+
+            # Emit the signal to update the display, with the zoom it was rendered at
+            marks['emitted'] = time.monotonic()
+            self.change_pixmap_signal.emit(display_frame)
+            display_frame = None
 
         # Clean up
-        cap.release()
+        self.capture.stop()
+        self.capture.join()
+        source.close()
+        if self.capture.ended:
+            error = self.capture.error
+            self.source_ended_signal.emit(f"Camera error: {error}" if error else "The source has no more frames")
+
+    def process_frame(self, captured, marks=None):
+        """Run one captured BGR or MONO Frame through the live pipeline; returns the display Frame.
+
+        Mono frames stay single-channel all the way to the screen: white balance
+        and grayscale are skipped and the canvas itself is handed to Qt.
+        Stage boundary times are written into `marks`.
+        """
+        marks = {} if marks is None else marks
+        pool = self.buffer_pool
+        frame = captured.image
+        mono = captured.pixel_format == MONO8
+
+        # brightness, contrast and exposure in one table lookup
+        adjusted = frame
+        if not self.tone.is_identity():
+            adjusted = self.tone.apply(frame, dst=pool.get('tone', frame.shape))
+
+        # Temporal averaging: at full resolution when the outputs should be averaged,
+        # otherwise (much cheaper) on the display canvas further down
+        averager = self.averager
+        if averager.enabled and self.average_outputs:
+            adjusted = averager.apply(adjusted, dst=pool.get('average', adjusted.shape))
+        marks['tone'] = time.monotonic()
+
+        h, w = adjusted.shape[:2]
+
+        # output size negotiated with the view: this is the only resample of the frame
+        geometry = self.display_geometry
+        display_width, display_height = output_size(geometry, w, h)
+        start_x, start_y, new_width, new_height = letterbox_rect(w, h, display_width, display_height)
+
+        # a mono canvas leaves this thread as the display frame, so it comes from a shared ring
+        canvas = pool.get('canvas', (display_height, display_width) + adjusted.shape[2:], shared=mono)
+
+        # letterbox bars (stages below run in place, so clear them every frame)
+        canvas[:start_y] = 0
+        canvas[start_y + new_height:] = 0
+        canvas[:, :start_x] = 0
+        canvas[:, start_x + new_width:] = 0
+
+        # resize straight into the canvas, then mirror the (smaller) result in place
+        fitted = canvas[start_y:start_y + new_height, start_x:start_x + new_width]
+        interpolation = cv2.INTER_AREA if new_width < w else cv2.INTER_LINEAR
+        cv2.resize(adjusted, (new_width, new_height), dst=fitted, interpolation=interpolation)
+        cv2.flip(fitted, 1, dst=fitted)
+        if averager.enabled and not self.average_outputs:
+            averager.apply(canvas, dst=canvas)
+        marks['resize'] = time.monotonic()
+
+        # Auto White Balance: gains re-estimated at a low rate, smoothed, or frozen when locked
+        awb_enabled = getattr(self, 'auto_awb', False) and not mono
+        if awb_enabled:
+            self.awb.update(canvas, captured.timestamp)
+
+        if not mono:
+            self.finish_frame(canvas, awb_enabled, 'gray')
+        marks['color'] = time.monotonic()
+
+        # Histogram at its own (low) rate, on a subsampled frame
+        hist_img = self.histogram.update(canvas, 'bgr', now=captured.timestamp)
+        if hist_img is not None:
+            self.histogram_signal.emit(QImage(hist_img.data, hist_img.shape[1], hist_img.shape[0],
+                                              hist_img.strides[0], QImage.Format_RGB888).copy())
+
+        # Focus score at a few Hz on a decimated ROI of the full-resolution frame
+        if self.focus_enabled:
+            score = self.focus.update(adjusted, captured.timestamp)
+            if score is not None:
+                self.focus_signal.emit(score)
+        marks['histogram'] = time.monotonic()
+
+        # Recording and snapshots get the full-resolution frame; encoding happens on other threads
+        recorder = self.recorder
+        snapshot_due = bool(self.snapshot_requests)
+        timelapse = self.timelapse
+        timelapse_due = timelapse is not None and timelapse.due(captured.timestamp)
+        if recorder is not None or snapshot_due or timelapse_due:
+            full_frame = self.full_resolution_frame(adjusted, awb_enabled, mono)
+            if timelapse_due:
+                number = timelapse.advance(captured.timestamp)
+                self.timelapse_signal.emit(Frame(full_frame.copy(), captured.timestamp, captured.sequence,
+                                                 MONO8 if mono else BGR8), number)
+            if snapshot_due:
+                # one frame per request, so held-down requests land on consecutive frames
+                purpose = self.snapshot_requests.popleft()
+                self.snapshot_signal.emit(Frame(full_frame.copy(), captured.timestamp, captured.sequence,
+                                                MONO8 if mono else BGR8), purpose)
+            if recorder is not None:
+                if mono:
+                    full_frame = cv2.cvtColor(full_frame, cv2.COLOR_GRAY2BGR,
+                                              dst=pool.get('record', full_frame.shape + (3,)))
+                recorder.submit(full_frame, captured.timestamp)
+        marks['record'] = time.monotonic()
+
+        if mono:
+            marks['convert'] = marks['record']
+            return Frame(canvas, captured.timestamp, captured.sequence, MONO8, geometry.zoom, marks)
+
+        # Convert BGR to RGB for Qt display. The buffer leaves this thread inside
+        # the Frame, so the pool only reuses it once the GUI has let go of it.
+        color_swapped_image = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB,
+                                           dst=pool.get('rgb', canvas.shape, shared=True))
+        marks['convert'] = time.monotonic()
+        return Frame(color_swapped_image, captured.timestamp, captured.sequence, RGB8, geometry.zoom, marks)
+
+    def process_counted(self, captured, marks=None):
+        """process_frame, then record what the frame allocated.
+
+        bytes_allocated_per_frame is what the buffer pool had to allocate; it is
+        0 in steady state. While tracemalloc is tracing (PYTHONTRACEMALLOC=1,
+        the benchmark, the tests) bytes_transient_per_frame is also set: the
+        peak of everything else numpy and OpenCV allocated during the frame.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        display_frame = self.process_frame(captured, marks)
+        self.bytes_allocated_per_frame = self.buffer_pool.end_frame()
+        self.bytes_transient_per_frame = tracemalloc.get_traced_memory()[1] - start if tracing else None
+        return display_frame
+
+    def allocation_counters(self):
+        """(pool bytes, transient bytes or None) allocated by the last processed frame."""
+        return self.bytes_allocated_per_frame, self.bytes_transient_per_frame
+
+    def frame_wanted(self, timestamp):
+        """Whether a captured frame must go through the pipeline while the preview is throttled."""
+        if self.preview_interval is None or self.recorder is not None:
+            return True
+        if self.snapshot_requests:
+            return True
+        if self.timelapse is not None and self.timelapse.due(timestamp):
+            return True
+        if timestamp >= self._next_preview:
+            self._next_preview = timestamp + self.preview_interval
+            return True
+        return False
+
+    def full_resolution_frame(self, adjusted, awb_enabled, mono):
+        """The full-size frame as shown in the view (mirrored, balanced, grayscale), in a pool buffer."""
+        pool = self.buffer_pool
+        if mono:
+            return cv2.flip(adjusted, 1, dst=pool.get('full_mono', adjusted.shape))
+        full_frame = cv2.flip(adjusted, 1, dst=pool.get('full', adjusted.shape))
+        self.finish_frame(full_frame, awb_enabled, 'full_gray')
+        return full_frame
+
+    def finish_frame(self, image, awb_enabled, gray_name):
+        """White balance and grayscale, applied in place on a BGR frame."""
+        if awb_enabled:
+            # all channels in one LUT pass
+            self.awb.apply(image, dst=image)
+
+        if getattr(self, 'grayscale', False):
+            apply_grayscale(image, self.buffer_pool.get(gray_name, image.shape[:2]))
+
+    def set_histogram_rate(self, rate_hz):
+        self.histogram.set_rate(rate_hz)
+
+    def set_histogram_stride(self, stride):
+        self.histogram.set_stride(stride)
+
+    def start_burst(self, ring):
+        """Copy raw frames into `ring` at the full capture rate; burst_finished_signal fires when it is full."""
+        if self.capture is None:
+            return False
+        self.capture.on_burst_done = self.burst_finished_signal.emit
+        self.capture.burst = ring
+        return True
+
+    def set_timelapse(self, schedule):
+        """Capture a full-resolution frame at each slot of a TimelapseSchedule (None stops)."""
+        self.timelapse = schedule
+
+    def set_preview_rate(self, rate_hz):
+        """Throttle the live view to `rate_hz` frames per second: None shows every frame, 0 none.
+
+        Frames skipped this way cost only the capture itself.
+        """
+        if rate_hz is None:
+            self.preview_interval = None
+        else:
+            self.preview_interval = 1.0 / rate_hz if rate_hz > 0 else math.inf
+        self._next_preview = 0.0
+
+    def request_snapshot(self, purpose='snapshot'):
+        """Ask for the next processed full-resolution frame on snapshot_signal. Requests queue up."""
+        self.snapshot_requests.append(purpose)
+
+    def set_recorder(self, recorder):
+        """Start (or with None, stop) feeding frames to a VideoRecorder."""
+        self.recorder = recorder
 
     def set_camera(self, index):
         self.camera_index = index
         print(index)
 
+    def set_source(self, source):
+        """Use `source` (a FrameSource) instead of the OpenCV camera at camera_index. Takes effect on start."""
+        self.source = source
+
     def stop(self):
         self.ThreadActive = False
 
+    def capture_counters(self):
+        """(frames captured, frames dropped, mailbox depth) so far for the running capture."""
+        if self.capture is None:
+            return 0, 0, 0
+        mailbox = self.capture.mailbox
+        return mailbox.frames_put, mailbox.frames_dropped, mailbox.depth()
+
+    def dropped_frames(self):
+        """Frames the capture thread replaced before processing could take them."""
+        if self.capture is None:
+            return 0
+        return self.capture.mailbox.frames_dropped
+
     def set_brightness(self, value):
         self.brightness = value
+        self.tone.set_brightness(value)
 
     def set_contrast(self, value):
         self.contrast = value
+        self.tone.set_contrast(value)
 
     def set_exposure(self, value):
         self.exposure = value
+        self.tone.set_exposure(value)
 
     def set_zoom(self, value):
         self.zoom = value
 
+    def set_display_geometry(self, canvas_width, canvas_height, zoom):
+        """Called by the view so frames are emitted at exactly the size it will show."""
+        self.display_geometry = DisplayGeometry(canvas_width, canvas_height, zoom)
+
     def set_auto_awb(self, enabled: bool):
         self.auto_awb = enabled
 
+    def set_awb_locked(self, locked: bool):
+        self.awb.set_locked(locked)
+
+    def set_averaging(self, mode, frames):
+        """Temporal averaging mode (processing.averaging OFF/EMA/BOX) over about `frames` frames."""
+        self.averager.set_frames(frames)
+        self.averager.set_mode(mode)
+
+    def set_average_outputs(self, enabled: bool):
+        self.average_outputs = enabled
+        self.averager.reset()
+
+    def set_focus_enabled(self, enabled: bool):
+        self.focus_enabled = enabled
+
+    def set_focus_roi(self, roi):
+        """Focus ROI as (x, y, w, h) fractions of the displayed (mirrored) frame; None for the centre."""
+        if roi is not None:
+            x, y, w, h = roi
+            roi = (1.0 - x - w, y, w, h)  # the view is mirrored; the ROI is cut before the flip
+        self.focus.set_roi(roi)
+
     def set_grayscale(self, enabled: bool):
         self.grayscale = enabled
 
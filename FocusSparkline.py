@@ -0,0 +1,51 @@
+from collections import deque
+
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+
+class FocusSparkline(QWidget):
+    """Rolling plot of recent focus scores with a marker at the best score so far."""
+
+    def __init__(self, history=120):
+        super().__init__()
+        self.values = deque(maxlen=history)
+        self.peak = None
+        self.setMinimumHeight(60)
+        self.setStyleSheet("background-color:#111; border:1px solid #333;")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+
+    def add_value(self, value):
+        self.values.append(value)
+        if self.peak is None or value > self.peak:
+            self.peak = value
+        self.update()
+
+    def reset(self):
+        self.values.clear()
+        self.peak = None
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.values:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        w, h = self.width(), self.height()
+        top = max(max(self.values), self.peak or 0) or 1.0
+        step = w / max(1, self.values.maxlen - 1)
+
+        def y_of(value):
+            return h - 2 - (h - 4) * value / top
+
+        # peak-so-far marker
+        painter.setPen(QPen(QColor(255, 200, 0), 1, Qt.DashLine))
+        painter.drawLine(QPointF(0, y_of(self.peak)), QPointF(w, y_of(self.peak)))
+
+        x0 = w - step * (len(self.values) - 1)
+        points = QPolygonF([QPointF(x0 + i * step, y_of(v)) for i, v in enumerate(self.values)])
+        painter.setPen(QPen(QColor(0, 220, 120), 2))
+        painter.drawPolyline(points)
+        painter.end()
@@ -0,0 +1,48 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from processing.capture import LatestFrameMailbox
+from processing.frame import RGB8, Frame
+from processing.still_image import adjust_still
+from processing.tone import ToneMapper
+
+# worker thread (QThread) for full-resolution still adjustments
+class ImageAdjustWorker(QThread):
+    result_signal = pyqtSignal(int, object)  # generation, Frame
+
+    def __init__(self):
+        super().__init__()
+        self.requests = LatestFrameMailbox()  # only the newest request is ever processed
+        self.generation = 0
+        self.ThreadActive = False
+
+    def request(self, still, brightness, contrast, exposure, grayscale):
+        """Queue a full-resolution render, superseding any earlier request."""
+        self.generation += 1
+        self.requests.put((self.generation, still, brightness, contrast, exposure, grayscale))
+        return self.generation
+
+    def cancel(self):
+        """Invalidate queued and in-flight work without queueing anything new."""
+        self.generation += 1
+
+    def run(self):
+        self.ThreadActive = True
+        while self.ThreadActive:
+            item = self.requests.take(timeout=0.5)
+            if item is None:
+                continue
+
+            generation, still, brightness, contrast, exposure, grayscale = item
+            if generation != self.generation:
+                continue
+
+            tone = ToneMapper(brightness, contrast, exposure)
+            rgb = adjust_still(still.source, tone, grayscale,
+                               cancelled=lambda: generation != self.generation)
+            if rgb is None or generation != self.generation:
+                continue
+
+            self.result_signal.emit(generation, Frame(rgb, pixel_format=RGB8))
+
+    def stop(self):
+        self.ThreadActive = False
+        self.requests.close()
@@ -1,6 +1,9 @@
 import cv2
 import datetime
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PyQt5.QtGui import QImage, QPixmap, QPainter
 from PyQt5.QtMultimedia import QCameraInfo
@@ -14,29 +17,104 @@ from PyQt5.QtWidgets import (
     QCheckBox, QGroupBox, QComboBox, QStackedLayout, QToolButton, QLayoutItem, QToolBar, QListWidget, QStyle, QLineEdit
 )
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt, QSize, QRect
+from PyQt5.QtCore import Qt, QSize, QRect, pyqtSignal
 from CameraWorker import CameraWorkerThread
+from ImageAdjustWorker import ImageAdjustWorker
+from processing.averaging import BOX as AVERAGE_BOX, EMA as AVERAGE_EMA, OFF as AVERAGE_OFF
+from processing.burst import BurstReader, BurstRing, available_memory, write_burst
+from processing.focus_stack import fuse_stack
+from processing.frame import MONO8, RGB8, Frame
+from processing.histogram import HistogramEngine
+from processing.measurements import (
+    QUANTITIES, export_csv as export_measurements_csv, export_json as export_measurements_json, summarize_tables
+)
+from processing.mosaic import Mosaic
+from processing.particles import ParticleDetector, circle_coords
+from processing.recorder import DROP_OLDEST, VideoRecorder
+from processing.sources import source_from_spec
+from processing.snapshot import SnapshotSaver
+from processing.stats import PipelineStats
+from processing.still_image import StillImage, adjust_still
+from processing.timelapse import TimelapseSchedule
+from processing.tone import ToneMapper
 from RulerLabel import RulerLabel
+from TiledImageLabel import TiledImageLabel
+from utils.qt_image import frame_to_qimage, qimage_to_bgr
 from utils.style_sheet import active_colors, inactive_colors
 from v_line import VLine
+from ui.burst_panel import burst_panel
+from ui.focus_panel import focus_panel
+from ui.focus_stack_panel import focus_stack_panel
 from ui.histogram_panel import histogram_panel
+from ui.measurements_panel import measurements_panel
 from ui.menu_bar import menu_bar
+from ui.mosaic_panel import mosaic_panel
+from ui.particles_panel import LIVE_DETECTION_RATES, particles_panel
+from ui.stats_panel import stats_panel
+from ui.timelapse_panel import PREVIEW_RATES, timelapse_panel
 
 W = 10
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    snapshot_saved_signal = pyqtSignal(str, bool)
+    burst_saved_signal = pyqtSignal(str)
+    stack_progress_signal = pyqtSignal(int, int)
+    stack_fused_signal = pyqtSignal(object, str)
+    mosaic_updated_signal = pyqtSignal(object, object)  # placed field (None if rejected), overview image
+    particles_detected_signal = pyqtSignal(object, float)  # (n, 4) detections (None on failure), seconds
+    recording_finished_signal = pyqtSignal(object)  # RecordingSummary, once the file is closed
+
+    def __init__(self, source_spec=None):
         super().__init__()
         self.camera = CameraWorkerThread()
+        self.camera_index = 0
+        self.source_spec = source_spec  # e.g. "synthetic:1920x1080@30"; None uses the OpenCV camera
         self.latest_frame = None
+        self.current_frame = None
         self.current_image_path = None
+        self.still_image = None
+        self.adjust_worker = ImageAdjustWorker()
+        self.adjust_worker.result_signal.connect(self.on_full_resolution_adjusted)
         self.camera_active = False
         self.recording = False
+        self.recorder = None
+        self.finishing_recorders = []  # stopped recorders still encoding their queue
+        self.recording_finished_signal.connect(self.on_recording_finished)
         self.setWindowTitle("Microscope Camera Software")
         self.brightness_value = 50
         self.contrast_value = 50
         self.exposure_value = 50
         self.zoom_value = 2
+        self.tone_mapper = ToneMapper()
+        self.histogram_engine = HistogramEngine()
+        self.pipeline_stats = PipelineStats()
+        # emitted from the saver's threads; Qt queues it onto the GUI thread
+        self.snapshot_saved_signal.connect(self.on_snapshot_saved)
+        self.snapshot_saver = SnapshotSaver(
+            on_done=lambda path, ok, elapsed: self.snapshot_saved_signal.emit(path, ok))
+        self.burst_saved_signal.connect(self.on_burst_saved)
+        self.burst_ring = None
+        self.burst_reader = None
+        self.timelapse = None
+        self.timelapse_dir = None
+        self.stack_dir = None
+        self.stack_paths = []
+        self.stack_futures = []
+        self.stack_progress_signal.connect(self.on_stack_progress)
+        self.stack_fused_signal.connect(self.on_stack_fused)
+        self.stack_result_window = None  # fused result shown while the camera keeps running
+        self.stack_result = None
+        self.mosaic = None
+        # registration and tile writes run one field at a time, in order
+        self.mosaic_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mosaic')
+        self.mosaic_updated_signal.connect(self.on_mosaic_updated)
+
+        # Particle detection runs on its own thread, one frame at a time
+        self.particle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='particles')
+        self.particles_busy = False
+        self.particle_request_detector = None
+        self.detected_circle_ids = []  # circle measurement ids added by the last detection
+        self.particles_detected_signal.connect(self.on_particles_detected)
 
         # Create output directory
         self.output_dir = "saved_frames"
@@ -45,10 +123,12 @@ class MainWindow(QMainWindow):
 
         menu_bar(self) # create menu bar
 
-        self.central_label = RulerLabel()
+        self.central_label = TiledImageLabel()
         self.central_label.setAlignment(Qt.AlignCenter)
         self.central_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
         self.central_label.setScaledContents(False)
+        self.central_label.focus_roi_changed.connect(self.on_focus_roi_changed)
+        self.focus_roi = None  # (x, y, w, h) fractions of the displayed frame
 
         self.logo_label = QLabel()
 
@@ -141,6 +221,13 @@ class MainWindow(QMainWindow):
         self.angle_button.setCheckable(True)
         self.angle_button.clicked.connect(self.toggle_angle_tool)
 
+        self.select_button = QToolButton()
+        self.select_button.setText("Select")
+        self.select_button.setToolTip("Select measurements: click, Shift+click or drag a box; "
+                                      "drag an endpoint to move it, Delete removes the selection")
+        self.select_button.setCheckable(True)
+        self.select_button.clicked.connect(self.toggle_select_tool)
+
         self.zoom_in = QToolButton()
         self.zoom_in.setIcon(QIcon("assets/zoom_in.svg"))
         self.zoom_in.setIconSize(QSize(W, W))
@@ -160,6 +247,7 @@ class MainWindow(QMainWindow):
         panel_layout.addWidget(self.line_button)
         panel_layout.addWidget(self.circle_button)
         panel_layout.addWidget(self.angle_button)
+        panel_layout.addWidget(self.select_button)
         panel_layout.addWidget(self.zoom_in)
         panel_layout.addWidget(self.zoom_out)
 
@@ -196,6 +284,14 @@ class MainWindow(QMainWindow):
         self.create_left_bottom_properties_panel()
 
         histogram_panel(self)
+        stats_panel(self)
+        burst_panel(self)
+        timelapse_panel(self)
+        focus_stack_panel(self)
+        focus_panel(self)
+        mosaic_panel(self)
+        measurements_panel(self)
+        particles_panel(self)
 
         # Dock widget setup
         left_dock_content = QWidget()
@@ -284,49 +380,35 @@ class MainWindow(QMainWindow):
         if self.latest_frame is None:
             return
 
-        # Convert QImage -> numpy RGB
-        cv_image = self.latest_frame.convertToFormat(QImage.Format_RGB888)
-        ptr = cv_image.bits()
-        ptr.setsize(cv_image.byteCount())
-
-        # Number of bytes per pixel in RGB888 format is 3 (1 byte for R, G, and B)
-        # The image width and height should be correct for reshaping into a 3D array (height, width, 3)
-        width = cv_image.width()
-        height = cv_image.height()
-
-        # Correct reshaping based on width and height (using 3 channels for RGB)
-        # img = np.array(ptr, dtype=np.uint8).reshape((height, width, 3))
-        bytes_per_line = cv_image.bytesPerLine()
-        # Convert buffer to 1D array
-        img_1d = np.frombuffer(ptr, dtype=np.uint8, count=bytes_per_line * height)
-        # Reshape to (height, bytes_per_line)
-        img_2d = img_1d.reshape((height, bytes_per_line))
-        # Slice to width pixels (width * 3 because RGB888)
-        img = img_2d[:, :width * 3].reshape((height, width, 3))
-
-        # Draw hist image (H=200, W=256)
-        H, W = 200, 256
-        hist_img = np.zeros((H, W, 3), dtype=np.uint8)
-
-        # Channels in img are RGB (0=R,1=G,2=B). Choose colors to draw in RGB space.
-        channel_info = [
-            (0, (255, 0, 0)),  # R channel drawn in red
-            (1, (0, 255, 0)),  # G channel drawn in green
-            (2, (0, 0, 255)),  # B channel drawn in blue
-        ]
-
-        for ch, color in channel_info:
-            hist = cv2.calcHist([img], [ch], None, [256], [0, 256])
-            cv2.normalize(hist, hist, 0, H - 1, cv2.NORM_MINMAX)
-            hist = hist.flatten().astype(int)
-            for x in range(1, 256):
-                cv2.line(hist_img,
-                         (x - 1, H - 1 - hist[x - 1]),
-                         (x, H - 1 - hist[x]),
-                         color, 1)
-
-        # Convert numpy -> QPixmap (copy so QImage owns its data)
-        qimg = QImage(hist_img.data, W, H, 3 * W, QImage.Format_RGB888).copy()
+        if self.current_frame is not None:
+            # numpy-backed frame (RGB or mono): read the pixels directly
+            img = self.current_frame.image
+        else:
+            # Convert QImage -> numpy RGB
+            cv_image = self.latest_frame.convertToFormat(QImage.Format_RGB888)
+            ptr = cv_image.bits()
+            ptr.setsize(cv_image.byteCount())
+
+            width = cv_image.width()
+            height = cv_image.height()
+
+            bytes_per_line = cv_image.bytesPerLine()
+            # Convert buffer to 1D array
+            img_1d = np.frombuffer(ptr, dtype=np.uint8, count=bytes_per_line * height)
+            # Reshape to (height, bytes_per_line)
+            img_2d = img_1d.reshape((height, bytes_per_line))
+            # Slice to width pixels (width * 3 because RGB888)
+            img = img_2d[:, :width * 3].reshape((height, width, 3))
+
+        # On-demand refresh: bypass the rate limit used for live frames
+        hist_img = self.histogram_engine.update(img, 'rgb', force=True)
+
+        # Convert numpy -> QImage (copy so QImage owns its data)
+        qimg = QImage(hist_img.data, hist_img.shape[1], hist_img.shape[0],
+                      hist_img.strides[0], QImage.Format_RGB888).copy()
+        self.show_histogram(qimg)
+
+    def show_histogram(self, qimg):
         pm = QPixmap.fromImage(qimg)
 
         # Show in toolbox panel
@@ -337,6 +419,11 @@ class MainWindow(QMainWindow):
         if hasattr(self, "histogram_label"):
             self.histogram_label.setPixmap(pm)
 
+    def update_histogram_rate(self, rate_hz):
+        self.histogram_engine.set_rate(rate_hz)
+        if self.camera:
+            self.camera.set_histogram_rate(rate_hz)
+
     def update_ruler_position(self):
         scroll_pos = self.scroll_area.verticalScrollBar().value()
 
@@ -345,7 +432,7 @@ class MainWindow(QMainWindow):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if self.latest_frame:
+        if self.latest_frame and not self.camera_active and self.central_label.pyramid is None:
             self.rescale_latest_frame()
             scaled_image = self.latest_frame.scaled(
                 self.central_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -359,11 +446,20 @@ class MainWindow(QMainWindow):
             self.central_label.setPixmap(QPixmap.fromImage(scaled_image))
 
     def on_zoom_percent_changed(self, value):
-        if self.latest_frame:
+        if self.central_label.pyramid is not None:
+            # tiled still: the label redraws only the visible tiles at the new zoom
+            self.central_label.set_zoom_factor(value / 100.0)
+        elif self.latest_frame:
             percent = value
-            scale_factor = percent / 10.0
-            new_width = int(self.latest_frame.width() * scale_factor)
-            new_height = int(self.latest_frame.height() * scale_factor)
+            scale_factor = percent / 100.0
+            # Size from the full-resolution still, even while a proxy is shown,
+            # so ruler measurements stay in image coordinates
+            if self.still_image is not None:
+                source_width, source_height = self.still_image.width, self.still_image.height
+            else:
+                source_width, source_height = self.latest_frame.width(), self.latest_frame.height()
+            new_width = int(source_width * scale_factor)
+            new_height = int(source_height * scale_factor)
             scaled_image = self.latest_frame.scaled(
                 new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
 
@@ -395,16 +491,22 @@ class MainWindow(QMainWindow):
 
         if filename:
             self.current_image_path = filename
-            # Load and display image
-            pixmap = QPixmap(filename)
             self.reset_controls_to_default()
 
-            if not pixmap.isNull():
-                self.latest_frame = pixmap.toImage()
-                self.on_zoom_percent_changed(self.zoom_slider.value())
+            # Decode once per open; every later adjustment works from this copy
+            still = StillImage.load(filename)
+            if still is None:
+                # formats OpenCV cannot read (e.g. GIF) go through Qt
+                qimage = QImage(filename)
+                if not qimage.isNull():
+                    still = StillImage(qimage_to_bgr(qimage), filename)
+
+            if still is not None:
+                self.still_image = still
+                if not self.adjust_worker.isRunning():
+                    self.adjust_worker.start()
+                self.apply_image_adjustments()
                 self.toggle_controls(True)
-                self.update_zoom_factor_for_ruler()
-                self.update_histogram()
                 self.stack_layout.setCurrentWidget(self.central_label)
             else:
                 QMessageBox.warning(self, "Error", "Could not load the selected image.")
@@ -426,21 +528,21 @@ class MainWindow(QMainWindow):
         self.brightness_value = value
         if self.camera:
             self.camera.set_brightness(value)
-        elif self.current_image_path:
+        if not self.camera_active and self.still_image is not None:
             self.apply_image_adjustments()
 
     def update_contrast(self, value):
         self.contrast_value = value
         if self.camera:
             self.camera.set_contrast(value)
-        elif self.current_image_path:
+        if not self.camera_active and self.still_image is not None:
             self.apply_image_adjustments()
 
     def update_exposure(self, value):
         self.exposure_value = value
         if self.camera:
             self.camera.set_exposure(value)
-        elif self.current_image_path:
+        if not self.camera_active and self.still_image is not None:
             self.apply_image_adjustments()
 
     def update_zoom(self, value):
@@ -462,53 +564,88 @@ class MainWindow(QMainWindow):
         self.central_label.set_zoom_factor(zoom_factor)
 
     def apply_image_adjustments(self):
-        """Apply adjustments to static image"""
-        if not self.current_image_path:
-            return
+        """Apply adjustments to static image.
 
-        # Load original image
-        cv_image = cv2.imread(self.current_image_path)
-        if cv_image is None:
+        A screen-sized proxy is adjusted immediately for feedback. The
+        full-resolution result is rendered in the background once no slider is
+        being dragged; newer requests supersede older ones.
+        """
+        if self.still_image is None:
             return
 
-        # Apply brightness and contrast
-        brightness_factor = (self.brightness_value - 50) * 2
-        contrast_factor = (self.contrast_value - 50) / 50.0
-        adjusted_image = cv2.convertScaleAbs(cv_image, alpha=1 + contrast_factor, beta=brightness_factor)
-
-        # Apply exposure (simplified)
-        exposure_factor = (self.exposure_value - 50) / 50.0
-        adjusted_image = cv2.convertScaleAbs(adjusted_image, alpha=1.0, beta=exposure_factor * 50)
-
-        # Apply grayscale if enabled
-        if self.grayscale_checkbox.isChecked():
-            adjusted_image = cv2.cvtColor(adjusted_image, cv2.COLOR_BGR2GRAY)
-            adjusted_image = cv2.cvtColor(adjusted_image, cv2.COLOR_GRAY2BGR)
-
-        # Convert to QImage and update latest_frame
-        color_swapped_image = cv2.cvtColor(adjusted_image, cv2.COLOR_BGR2RGB)
-        qt_image = QImage(color_swapped_image.data,
-                          color_swapped_image.shape[1],
-                          color_swapped_image.shape[0],
-                          color_swapped_image.strides[0],
-                          QImage.Format_RGB888)
+        grayscale = self.grayscale_checkbox.isChecked()
+        self.tone_mapper.set_values(self.brightness_value, self.contrast_value, self.exposure_value)
 
-        self.latest_frame = qt_image
+        viewport = self.scroll_area.viewport().size()
+        proxy = self.still_image.proxy(max(1, viewport.width()), max(1, viewport.height()))
+        self.show_still_frame(Frame(adjust_still(proxy, self.tone_mapper, grayscale), pixel_format=RGB8))
 
-        # 🔥 Apply zoom after updating image
+        sliders = (self.slider, self.contrast_slider, self.exposure_slider)
+        if proxy is self.still_image.source:
+            # the still already fits on screen: the preview is the full-resolution result
+            self.adjust_worker.cancel()
+        elif any(slider.isSliderDown() for slider in sliders):
+            self.adjust_worker.cancel()
+        else:
+            self.adjust_worker.request(self.still_image, self.brightness_value, self.contrast_value,
+                                       self.exposure_value, grayscale)
+
+    def on_full_resolution_adjusted(self, generation, frame):
+        # drop results for settings that have changed since the request
+        if generation == self.adjust_worker.generation and not self.camera_active:
+            self.show_still_frame(frame)
+
+    def show_still_frame(self, frame):
+        # current_frame keeps the pixels alive for the QImage wrapping them
+        self.current_frame = frame
+        self.latest_frame = frame_to_qimage(frame)
+        self.central_label.set_tiled_image(frame.image, self.still_image.width, self.still_image.height)
         self.on_zoom_percent_changed(self.zoom_slider.value())
         self.update_histogram()
 
-    def update_awb_checkbox(self, state):
+    def update_awb_lock(self, state):
+        if self.camera:
+            self.camera.set_awb_locked(state == Qt.Checked)
+
+    def update_averaging(self, *args):
+        if self.camera:
+            mode = (AVERAGE_OFF, AVERAGE_EMA, AVERAGE_BOX)[self.averaging_combo.currentIndex()]
+            self.camera.set_averaging(mode, self.averaging_frames_spinbox.value())
+            self.camera.set_average_outputs(self.average_outputs_checkbox.isChecked())
+
+    def update_focus_metric(self, enabled):
+        if self.camera:
+            self.camera.set_focus_enabled(enabled)
+        if not enabled:
+            self.focus_score_label.setText("-")
+
+    def on_focus_score(self, score):
+        self.focus_score_label.setText(f"{score:.0f}")
+        self.focus_sparkline.add_value(score)
+        self.focus_peak_label.setText(f"Peak: {self.focus_sparkline.peak:.0f}")
+
+    def reset_focus_peak(self):
+        self.focus_sparkline.reset()
+        self.focus_peak_label.setText("Peak: -")
+
+    def on_focus_roi_changed(self, rect):
+        # the label works in full-resolution image coordinates; the worker wants fractions
+        if rect is None or self.camera is None or self.camera.capture_shape is None:
+            self.focus_roi = None
+        else:
+            h, w = self.camera.capture_shape[:2]
+            self.focus_roi = (max(0.0, rect.x() / w), max(0.0, rect.y() / h),
+                              min(1.0, rect.width() / w), min(1.0, rect.height() / h))
         if self.camera:
-            self.camera.set_auto_awb(state == Qt.Checked)
+            self.camera.set_focus_roi(self.focus_roi)
+        self.reset_focus_peak()
 
     def update_grayscale(self, state):
         grayscale_enabled = state == Qt.Checked
         self.central_label.enable_grayscale(grayscale_enabled)
         if self.camera:
             self.camera.set_grayscale(grayscale_enabled)
-        elif self.current_image_path:
+        if not self.camera_active and self.still_image is not None:
             self.apply_image_adjustments()
 
     def toggle_ruler_from_menu(self, checked):
@@ -535,6 +672,8 @@ class MainWindow(QMainWindow):
         self.angle_button.setChecked(False)
         self.central_label.enable_circle_tool(False)
         self.central_label.enable_angle_tool(False)
+        self.select_button.setChecked(False)
+        self.central_label.enable_select_tool(False)
 
     def toggle_circle_tool(self, checked):
         if not self.camera_active:
@@ -555,6 +694,8 @@ class MainWindow(QMainWindow):
         self.line_button.setChecked(False)
         self.central_label.enable_line_tool(False)
         self.central_label.enable_angle_tool(False)
+        self.select_button.setChecked(False)
+        self.central_label.enable_select_tool(False)
 
     def toggle_angle_tool(self, checked):
         if not self.camera_active:
@@ -574,46 +715,565 @@ class MainWindow(QMainWindow):
         self.line_button.setChecked(False)
         self.central_label.enable_line_tool(False)
         self.central_label.enable_circle_tool(False)
+        self.select_button.setChecked(False)
+        self.central_label.enable_select_tool(False)
+
+    def toggle_select_tool(self, checked):
+        # selection also works on stills, so it does not need the camera
+        self.central_label.enable_select_tool(checked)
+        if checked:
+            self.central_label.setFocus()
+        for button in (self.line_button, self.circle_button, self.angle_button):
+            button.setChecked(False)
+        self.line_button.setIcon(QIcon("assets/line_inactive"))
+        self.circle_button.setIcon(QIcon("assets/circle_inactive"))
+        self.angle_button.setIcon(QIcon("assets/angle_inactive"))
+        self.central_label.enable_line_tool(False)
+        self.central_label.enable_circle_tool(False)
+        self.central_label.enable_angle_tool(False)
 
     def clear_all_rulers(self):
         self.central_label.clear_rulers()
 
+    def delete_selected_measurements(self):
+        deleted = self.central_label.delete_selection()
+        self.statusBar().showMessage(f"Deleted {deleted} measurement(s)", 3000)
+
+    def particle_detector(self):
+        return ParticleDetector(min_radius=self.particle_min_radius_spinbox.value(),
+                                max_radius=self.particle_max_radius_spinbox.value(),
+                                min_circularity=self.particle_circularity_spinbox.value(),
+                                method=self.particle_method_combo.currentData(),
+                                polarity=self.particle_polarity_combo.currentData())
+
+    def detect_particles(self):
+        if self.particles_busy:
+            return  # still working on the previous frame
+        if not (self.camera_active or self.still_image is not None):
+            QMessageBox.warning(self, "Failure", "Start Camera or open an image to detect particles")
+            return
+        if self.particle_min_radius_spinbox.value() > self.particle_max_radius_spinbox.value():
+            self.particle_live_checkbox.setChecked(False)  # one warning, not one per live tick
+            QMessageBox.warning(self, "Failure", "Min radius must not be larger than max radius")
+            return
+        # settings are fixed when the detection is requested
+        self.particle_request_detector = self.particle_detector()
+        self.particles_busy = True
+        if self.camera_active:
+            # the worker hands over its next full-resolution frame (on_snapshot_frame)
+            self.camera.request_snapshot('particles')
+        else:
+            self.particle_executor.submit(self.detect_particles_in_background, self.particle_request_detector,
+                                          self.still_image.source)
+
+    def detect_live_particles(self):
+        if self.camera_active:
+            self.detect_particles()
+
+    def detect_particles_in_background(self, detector, image):
+        """Runs on the particle detection thread."""
+        start = time.perf_counter()
+        particles = None
+        try:
+            particles = detector.detect(image)
+        except Exception as e:
+            print(f"Particle detection failed: {e}")
+        finally:
+            # always report back, or particles_busy would block every later detection
+            self.particles_detected_signal.emit(particles, time.perf_counter() - start)
+
+    def on_particles_detected(self, particles, seconds):
+        self.particles_busy = False
+        if particles is None:
+            self.particle_status_label.setText("Detection failed.")
+            return
+        # each detection replaces the previous one; hand-drawn circles stay
+        label = self.central_label
+        label.remove_measurements('circle', self.detected_circle_ids)
+        self.detected_circle_ids = label.add_measurements('circle', circle_coords(particles)).tolist()
+        self.particle_status_label.setText(f"{len(particles)} particles ({seconds * 1000:.0f} ms)")
+
+    def clear_detected_particles(self):
+        self.central_label.remove_measurements('circle', self.detected_circle_ids)
+        self.detected_circle_ids = []
+        self.particle_status_label.setText("")
+
+    def update_live_detection(self):
+        if self.particle_live_checkbox.isChecked():
+            rate = LIVE_DETECTION_RATES[self.particle_rate_combo.currentIndex()][1]
+            self.particle_timer.start(int(1000 / rate))
+        else:
+            self.particle_timer.stop()
+
+    def refresh_measurement_summary(self):
+        kind = self.measurement_kind_combo.currentData()
+        summary = summarize_tables({kind: self.central_label.tables[kind]}, bins=20)[kind]
+        unit = QUANTITIES[kind][1]
+        self.measurement_labels['count'].setText(str(summary['count']))
+        for key in ('mean', 'std', 'min', 'max'):
+            self.measurement_labels[key].setText(f"{summary[key]:.2f} {unit}" if summary['count'] else "-")
+
+        # Histogram of the quantity as a small bar chart
+        label = self.measurement_histogram_label
+        pixmap = QPixmap(max(label.width(), 100), label.height())
+        pixmap.fill(Qt.black)
+        if summary['count']:
+            counts = summary['histogram']['counts']
+            painter = QPainter(pixmap)
+            bar_width = pixmap.width() / len(counts)
+            peak = max(counts)
+            for i, count in enumerate(counts):
+                bar_height = int((pixmap.height() - 2) * count / peak)
+                painter.fillRect(int(i * bar_width), pixmap.height() - bar_height, max(1, int(bar_width) - 1),
+                                 bar_height, Qt.green)
+            painter.end()
+            label.setToolTip(f"{summary['min']:.2f} - {summary['max']:.2f} {unit}")
+        label.setPixmap(pixmap)
+
+    def export_measurements(self, fmt):
+        tables = self.central_label.tables
+        if not any(len(table) for table in tables.values()):
+            QMessageBox.warning(self, "Failure", "No measurements to export")
+            return
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        filters = {'csv': "CSV Files (*.csv)", 'json': "JSON Files (*.json)"}
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Measurements", os.path.join(self.output_dir, f"measurements_{timestamp}.{fmt}"),
+            filters[fmt])
+        if not filename:
+            return
+        try:
+            if fmt == 'csv':
+                rows = export_measurements_csv(filename, tables)
+            else:
+                rows = export_measurements_json(filename, tables)
+        except OSError as e:
+            QMessageBox.warning(self, "Failure", f"Could not export measurements: {e}")
+            return
+        print(f"Exported {rows} measurements to {filename}")
+
     def save_current_frame(self):
         if self.latest_frame is None or self.camera_active==False:
             QMessageBox.warning(self, "Warning", "No frame to save!")
             return
 
-        # Create a pixmap of the same size as the label
-        pixmap = QPixmap(self.central_label.size())
-        self.central_label.render(pixmap)  # Renders the widget (with overlays) onto the pixmap
+        # The worker hands over its next full-resolution frame (on_snapshot_frame);
+        # every request is kept, so holding the shortcut queues one file per frame
+        self.camera.request_snapshot()
 
-        # Generate file path
+    def on_snapshot_frame(self, frame, purpose):
+        if purpose == 'stack':
+            self.add_stack_slice(frame)
+            return
+        if purpose == 'mosaic':
+            self.mosaic_executor.submit(self.place_mosaic_field, self.mosaic, frame.image)
+            return
+        if purpose == 'particles':
+            self.particle_executor.submit(self.detect_particles_in_background, self.particle_request_detector,
+                                          frame.image)
+            return
+
+        # Generate file path (frame sequence keeps names unique within a second)
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
         file_format = self.format_combo.currentText().lower()
-        filename = f"cryonano_{timestamp}.{file_format}"
+        filename = f"cryonano_{timestamp}_{frame.sequence:06d}.{file_format}"
         filepath = os.path.join(self.output_dir, filename)
 
-        # Save the pixmap using Qt
-        if file_format in ("png", "jpg", "jpeg", "bmp"):
-            if pixmap.save(filepath):
-                QMessageBox.information(self, "Success", f"Overlay saved as:\n{filepath}")
-            else:
-                QMessageBox.warning(self, "Error", "Failed to save overlay!")
+        # Encoding runs on the saver's threads; the live view keeps going
+        self.snapshot_saver.save(frame.image, filepath)
+        self.statusBar().showMessage(f"Saving snapshot ({self.snapshot_saver.pending} pending)...")
+
+    def on_snapshot_saved(self, path, ok):
+        if ok:
+            self.statusBar().showMessage(f"Saved: {path}", 5000)
+        else:
+            self.statusBar().showMessage(f"Failed to save: {path}", 5000)
+
+    def start_burst(self):
+        if not self.camera_active or self.camera.capture_shape is None:
+            QMessageBox.warning(self, "Failure", "Start Camera to capture a burst")
+            return
+        if self.burst_ring is not None:
+            return
+
+        frames = self.burst_frames_spinbox.value()
+        shape = self.camera.capture_shape
+        nbytes = frames * int(np.prod(shape))
+        available = available_memory()
+        if available is not None and nbytes > 0.8 * available:
+            QMessageBox.warning(self, "Failure",
+                                f"A burst of {frames} frames needs {nbytes / 1e6:.0f} MB of memory; "
+                                f"only {available / 1e6:.0f} MB is available.")
+            return
+
+        # All memory is allocated before the first frame, so capture itself never allocates
+        self.burst_ring = BurstRing(frames, shape, pixel_format=self.camera.capture_format)
+        self.camera.start_burst(self.burst_ring)
+        self.burst_btn.setEnabled(False)
+        self.burst_status_label.setText(f"Capturing {frames} frames ({nbytes / 1e6:.0f} MB)...")
+
+    def on_burst_finished(self, ring):
+        if ring is not self.burst_ring:
+            return  # already flushed (camera stopped while the signal was queued)
+        if self.camera is not None and self.camera.capture is not None:
+            self.camera.capture.burst = None
+        if ring.count == 0:
+            self.on_burst_saved("")
+            return
+
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        directory = os.path.join(self.output_dir, f"burst_{timestamp}")
+        settings = {
+            "brightness": self.brightness_value,
+            "contrast": self.contrast_value,
+            "exposure": self.exposure_value,
+            "grayscale": self.grayscale_checkbox.isChecked(),
+            "awb_locked": self.awb_lock_checkbox.isChecked(),
+            "source": self.source_spec or f"opencv:{self.camera_index}",
+        }
+        self.burst_status_label.setText(f"Writing {ring.count} frames to {directory}...")
+        # Writing hundreds of MB takes a while; do it off the GUI thread
+        threading.Thread(target=self.write_burst_container, args=(ring, directory, settings), daemon=True).start()
+
+    def write_burst_container(self, ring, directory, settings):
+        """Runs on a background thread."""
+        try:
+            index_path = write_burst(ring, directory, settings)
+        except OSError as e:
+            print(f"Failed to write burst: {e}")
+            index_path = ""
+        self.burst_saved_signal.emit(index_path)
+
+    def on_burst_saved(self, index_path):
+        self.burst_ring = None
+        self.burst_btn.setEnabled(True)
+        if index_path:
+            self.burst_status_label.setText(f"Saved: {os.path.dirname(index_path)}")
+            self.statusBar().showMessage(f"Burst saved: {index_path}", 5000)
+        else:
+            self.burst_status_label.setText("No burst frames were saved.")
+
+    def open_burst(self):
+        """Open a burst container for frame-by-frame review."""
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Open Burst", self.output_dir, "Burst index (index.json)")
+        if not filename:
+            return
+        if self.camera_active:
+            self.stop_camera()
+
+        try:
+            reader = BurstReader(filename)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self, "Error", f"Could not open burst: {e}")
+            return
+        if len(reader) == 0:
+            QMessageBox.warning(self, "Error", "The burst contains no frames.")
+            return
+
+        self.close_burst()
+        self.burst_reader = reader
+        self.current_image_path = None
+        self.reset_controls_to_default()
+        self.burst_slider.blockSignals(True)
+        self.burst_slider.setRange(0, len(reader) - 1)
+        self.burst_slider.setValue(0)
+        self.burst_slider.blockSignals(False)
+        self.burst_slider.setEnabled(True)
+        self.show_burst_frame(0)
+        self.toggle_controls(True)
+        self.stack_layout.setCurrentWidget(self.central_label)
+
+    def show_burst_frame(self, index):
+        if self.burst_reader is None:
+            return
+        # Only this frame is read from disk; it is then treated like an opened still
+        image = self.burst_reader.frame(index)
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else np.array(image)
+        self.still_image = StillImage(image, f"{self.burst_reader.directory}#{index}")
+        if not self.adjust_worker.isRunning():
+            self.adjust_worker.start()
+        self.apply_image_adjustments()
+        self.burst_frame_label.setText(
+            f"{index + 1} / {len(self.burst_reader)}   t = {self.burst_reader.timestamp(index) * 1000:.1f} ms")
+
+    def close_burst(self):
+        if self.burst_reader is not None:
+            self.burst_reader.close()
+            self.burst_reader = None
+        self.burst_slider.setEnabled(False)
+        self.burst_frame_label.setText("-")
+
+    def start_stop_timelapse(self):
+        if self.timelapse is not None:
+            self.stop_timelapse()
+            return
+        if not self.camera_active:
+            QMessageBox.warning(self, "Failure", "Start Camera to run a time-lapse")
+            return
+
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.timelapse_dir = os.path.join(self.output_dir, f"timelapse_{timestamp}")
+        os.makedirs(self.timelapse_dir, exist_ok=True)
+        with open(os.path.join(self.timelapse_dir, "timelapse.csv"), 'w') as f:
+            f.write("frame,file,time,elapsed_s\n")
+
+        # the first frame is taken straight away; the rest follow on the monotonic clock
+        self.timelapse = TimelapseSchedule(self.timelapse_interval_spinbox.value(),
+                                           self.timelapse_count_spinbox.value())
+        self.camera.set_timelapse(self.timelapse)
+        self.update_timelapse_preview()
+        self.timelapse_btn.setText("Stop Time-lapse")
+        self.timelapse_status_label.setText(f"Saving to {self.timelapse_dir}")
+
+    def stop_timelapse(self):
+        if self.camera:
+            self.camera.set_timelapse(None)
+            self.camera.set_preview_rate(None)
+        schedule = self.timelapse
+        self.timelapse = None
+        self.timelapse_btn.setText("Start Time-lapse")
+        if schedule is not None:
+            self.timelapse_status_label.setText(
+                f"Stopped after {schedule.index} frames ({schedule.missed} missed).")
+
+    def update_timelapse_preview(self):
+        if self.camera and self.timelapse is not None:
+            self.camera.set_preview_rate(PREVIEW_RATES[self.timelapse_preview_combo.currentIndex()][1])
+
+    def on_timelapse_frame(self, frame, number):
+        schedule = self.timelapse
+        if schedule is None:
+            return
+        file_format = self.format_combo.currentText().lower()
+        filename = f"frame_{number:06d}.{file_format}"
+        # written by the snapshot saver's threads, like any snapshot
+        self.snapshot_saver.save(frame.image, os.path.join(self.timelapse_dir, filename))
+        with open(os.path.join(self.timelapse_dir, "timelapse.csv"), 'a') as f:
+            f.write(f"{number},{filename},{datetime.datetime.now().isoformat(timespec='milliseconds')},"
+                    f"{frame.timestamp - schedule.start:.3f}\n")
+
+        next_time = datetime.datetime.now() + datetime.timedelta(seconds=schedule.next_time() - time.monotonic())
+        total = f" / {schedule.count}" if schedule.count else ""
+        self.timelapse_status_label.setText(
+            f"Captured {schedule.index}{total} ({schedule.missed} missed). "
+            f"Next at {next_time.strftime('%H:%M:%S')}.")
+        if schedule.finished:
+            self.stop_timelapse()
+
+    def new_focus_stack(self):
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.stack_dir = os.path.join(self.output_dir, f"stack_{timestamp}")
+        os.makedirs(self.stack_dir, exist_ok=True)
+        self.stack_paths = []
+        self.stack_futures = []
+        self.stack_status_label.setText(f"New stack: {self.stack_dir}")
+
+    def capture_stack_slice(self):
+        if not self.camera_active:
+            self.stack_interval_checkbox.setChecked(False)
+            QMessageBox.warning(self, "Failure", "Start Camera to capture a focus stack")
+            return
+        if self.stack_dir is None:
+            self.new_focus_stack()
+        self.camera.request_snapshot('stack')
+
+    def add_stack_slice(self, frame):
+        # Slices are streamed to disk as raw arrays as they arrive; none are kept in memory
+        path = os.path.join(self.stack_dir, f"slice_{len(self.stack_paths):03d}.npy")
+        self.stack_futures.append(self.snapshot_saver.save(frame.image, path))
+        self.stack_paths.append(path)
+        self.stack_status_label.setText(f"{len(self.stack_paths)} slices in {self.stack_dir}")
+
+    def toggle_stack_interval(self, checked):
+        if checked:
+            self.stack_timer.start(int(self.stack_interval_spinbox.value() * 1000))
+        else:
+            self.stack_timer.stop()
+
+    def fuse_focus_stack(self):
+        if len(self.stack_paths) < 2:
+            QMessageBox.warning(self, "Failure", "Capture at least two slices to fuse a stack")
+            return
+        self.stack_interval_checkbox.setChecked(False)
+        self.stack_fuse_btn.setEnabled(False)
+        self.stack_status_label.setText(f"Fusing {len(self.stack_paths)} slices...")
+        threading.Thread(target=self.fuse_stack_in_background,
+                         args=(list(self.stack_paths), list(self.stack_futures), self.stack_dir),
+                         daemon=True).start()
+
+    def fuse_stack_in_background(self, paths, futures, directory):
+        """Runs on a background thread."""
+        try:
+            if not all(future.result() for future in futures):
+                raise OSError("some slices could not be written")
+            fused, depth = fuse_stack(paths, progress=self.stack_progress_signal.emit)
+            path = os.path.join(directory, "fused.png")
+            cv2.imwrite(path, fused)
+            # depth map: which slice each pixel came from, stretched for viewing
+            cv2.imwrite(os.path.join(directory, "depth.png"),
+                        cv2.convertScaleAbs(depth, alpha=255.0 / max(1, len(paths) - 1)))
+        except (OSError, ValueError, cv2.error) as e:
+            print(f"Focus stacking failed: {e}")
+            fused, path = None, ""
+        self.stack_fused_signal.emit(fused, path)
+
+    def on_stack_progress(self, done, total):
+        self.stack_status_label.setText(f"Fusing: {done * 100 // total}%")
+
+    def on_stack_fused(self, fused, path):
+        self.stack_fuse_btn.setEnabled(True)
+        if fused is None:
+            self.stack_status_label.setText("Focus stacking failed.")
+            return
+        self.stack_status_label.setText(f"Saved: {path}")
+        self.statusBar().showMessage(f"Fused image saved: {path}", 5000)
+
+        if self.camera_active:
+            # keep the live session (and any recording or time-lapse) running
+            self.show_stack_result_window(fused, path)
+        else:
+            self.show_fused_as_still(fused, path)
+
+    def show_fused_as_still(self, fused, path):
+        """Show a fused stack like an opened image (leaves live mode)."""
+        if self.camera_active:
+            self.stop_camera()
+        image = cv2.cvtColor(fused, cv2.COLOR_GRAY2BGR) if fused.ndim == 2 else fused
+        self.close_burst()
+        self.current_image_path = path
+        self.still_image = StillImage(image, path)
+        if not self.adjust_worker.isRunning():
+            self.adjust_worker.start()
+        self.apply_image_adjustments()
+        self.toggle_controls(True)
+        self.stack_layout.setCurrentWidget(self.central_label)
+
+    def show_stack_result_window(self, fused, path, max_size=(1280, 960)):
+        """Show a fused stack in its own window, scaled to fit, next to the live view."""
+        h, w = fused.shape[:2]
+        scale = min(1.0, max_size[0] / w, max_size[1] / h)
+        preview = cv2.resize(fused, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else fused
+        if preview.ndim == 3:
+            preview = Frame(cv2.cvtColor(preview, cv2.COLOR_BGR2RGB), pixel_format=RGB8)
         else:
-            QMessageBox.warning(self, "Error", f"Unsupported format: {file_format}")
+            preview = Frame(np.ascontiguousarray(preview), pixel_format=MONO8)
+        pixmap = QPixmap.fromImage(frame_to_qimage(preview).copy())
+
+        if self.stack_result_window is None:
+            self.stack_result_window = QWidget(self, Qt.Window)
+            layout = QVBoxLayout()
+            self.stack_result_label = QLabel()
+            self.stack_result_label.setAlignment(Qt.AlignCenter)
+            open_btn = QPushButton("Open as Image (stops the camera)")
+            open_btn.clicked.connect(lambda: self.show_fused_as_still(*self.stack_result))
+            layout.addWidget(self.stack_result_label)
+            layout.addWidget(open_btn)
+            self.stack_result_window.setLayout(layout)
+        self.stack_result = (fused, path)
+        self.stack_result_label.setPixmap(pixmap)
+        self.stack_result_window.setWindowTitle(f"Focus Stack - {os.path.basename(path)}")
+        self.stack_result_window.show()
+        self.stack_result_window.raise_()
+
+    def new_mosaic(self):
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.mosaic = Mosaic(os.path.join(self.output_dir, f"mosaic_{timestamp}"))
+        self.mosaic_overview_label.clear()
+        self.mosaic_overview_label.setText("Add the first field.")
+        self.mosaic_status_label.setText(self.mosaic.directory)
+
+    def add_mosaic_field(self):
+        if not self.camera_active:
+            QMessageBox.warning(self, "Failure", "Start Camera to add mosaic fields")
+            return
+        if self.mosaic is None:
+            self.new_mosaic()
+        self.camera.request_snapshot('mosaic')
+
+    def place_mosaic_field(self, mosaic, image):
+        """Runs on the mosaic thread."""
+        try:
+            field = mosaic.add(image)
+        except (OSError, cv2.error) as e:
+            print(f"Failed to add mosaic field: {e}")
+            field = None
+        self.mosaic_updated_signal.emit(field, mosaic.overview())
+
+    def on_mosaic_updated(self, field, overview):
+        if self.mosaic is None:
+            return
+        count = len(self.mosaic.fields)
+        if field is None:
+            self.mosaic_status_label.setText(
+                f"{count} fields. The last field did not overlap enough to be placed; "
+                f"move back towards the previous field and add it again.")
+        else:
+            x0, y0, x1, y1 = self.mosaic.bounds()
+            self.mosaic_status_label.setText(f"{count} fields, {x1 - x0} x {y1 - y0} px "
+                                             f"(match {field['response']:.2f})")
+        if overview is not None:
+            rgb = np.ascontiguousarray(overview[..., ::-1]) if overview.ndim == 3 else overview
+            qformat = QImage.Format_RGB888 if overview.ndim == 3 else QImage.Format_Grayscale8
+            qimage = QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.strides[0], qformat).copy()
+            self.mosaic_overview_label.setPixmap(QPixmap.fromImage(qimage).scaled(
+                self.mosaic_overview_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def export_mosaic(self):
+        if self.mosaic is None or not self.mosaic.fields:
+            QMessageBox.warning(self, "Failure", "The mosaic has no fields yet")
+            return
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Mosaic", os.path.join(self.mosaic.directory, "mosaic.png"),
+            "Images (*.png *.jpg *.tif *.tiff)")
+        if filename:
+            mosaic = self.mosaic
+            self.mosaic_status_label.setText(f"Exporting {filename}...")
+            # queued behind any field still being placed
+            self.mosaic_executor.submit(self.export_mosaic_in_background, mosaic, filename)
+
+    def export_mosaic_in_background(self, mosaic, filename):
+        """Runs on the mosaic thread."""
+        try:
+            ok = mosaic.export(filename)
+        except (OSError, cv2.error) as e:
+            print(f"Failed to export mosaic: {e}")
+            ok = False
+        self.snapshot_saved_signal.emit(filename, ok)
 
     def start_stop_camera_feed(self):
         if not self.camera_active:
             self.reset_controls_to_default()
             self.current_image_path = None
+            self.still_image = None
+            self.close_burst()
+            self.adjust_worker.cancel()
+            self.central_label.clear_tiled_image()
             self.camera = CameraWorkerThread()
+            self.camera.set_camera(self.camera_index)
+            if self.source_spec:
+                self.camera.set_source(source_from_spec(self.source_spec, self.camera_index))
             self.camera.change_pixmap_signal.connect(self.update_image)
+            self.camera.histogram_signal.connect(self.show_histogram)
+            self.camera.snapshot_signal.connect(self.on_snapshot_frame)
+            self.camera.burst_finished_signal.connect(self.on_burst_finished)
+            self.camera.timelapse_signal.connect(self.on_timelapse_frame)
+            self.camera.focus_signal.connect(self.on_focus_score)
+            self.camera.source_ended_signal.connect(self.on_source_ended)
+            self.camera.set_focus_enabled(self.focus_enabled_checkbox.isChecked())
+            self.camera.set_focus_roi(self.focus_roi)
+            self.reset_focus_peak()
+            self.pipeline_stats.reset()
+            self.camera.set_histogram_rate(self.histogram_engine.rate_hz)
             self.camera.set_brightness(self.brightness_value)
             self.camera.set_contrast(self.contrast_value)
             self.camera.set_exposure(self.exposure_value)
             self.camera.set_zoom(self.zoom_value)
+            self.camera.set_display_geometry(0, 0, self.zoom_slider.value() / 100.0)
             # self.camera.set_auto_awb(self.awb_checkbox.isChecked())
             self.camera.set_grayscale(self.grayscale_checkbox.isChecked())
+            self.camera.set_awb_locked(self.awb_lock_checkbox.isChecked())
+            self.update_averaging()
             self.camera.start()
             self.camera_active = True
             self.toggle_controls(True)
@@ -636,37 +1296,57 @@ class MainWindow(QMainWindow):
 
     def start_recording(self):
         if self.camera_active and not self.recording:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"recording_{timestamp}.mp4"
             filepath = os.path.join(self.output_dir, filename)
 
-            # Get frame dimensions from the camera
-            frame_width = int(self.latest_frame.width())
-            frame_height = int(self.latest_frame.height())
-            self.video_writer = cv2.VideoWriter(filepath, fourcc, 30.0, (frame_width, frame_height))
+            # Encoding happens on the recorder thread; frame size and frame rate
+            # are taken from the frames the camera actually delivers.
+            self.recorder = VideoRecorder(filepath, overflow=DROP_OLDEST)
+            self.recorder.on_finished = self.recording_finished_signal.emit
+            self.recorder.start()
+            self.camera.set_recorder(self.recorder)
             self.recording = True
             # self.record_btn.setIcon(QIcon('assets/record_active.svg'))
-            self.stop_record_btn.setIcon('assets/record_stop_active.svg')
+            self.stop_record_btn.setIcon(QIcon('assets/record_stop_active.svg'))
             print(f"Recording started: {filepath}")
-            self.record_button.setText("Stop Record")
-            self.record_button.setIcon(QIcon('assets/stop.png'))
             self.record_btn.setText("Stop")
         elif self.recording:
             self.stop_recording()
-            self.record_button.setText("Start Record")
-            self.record_button.setIcon(QIcon('assets/play.png'))
         else:
             QMessageBox.warning(self, "Failure", f"Start Camera to record")
 
     def stop_recording(self):
-        if self.video_writer:
-            self.video_writer.release()
-            self.video_writer = None
+        if self.recorder:
+            if self.camera:
+                self.camera.set_recorder(None)
+            # the recorder drains its queue on its own thread; the summary arrives on recording_finished_signal
+            self.recorder.stop(wait=False)
+            self.finishing_recorders.append(self.recorder)
+            self.recorder = None
             self.recording = False
             print("Recording stopped.")
+            self.record_btn.setText("Record")
             self.record_btn.setIcon(QIcon('assets/record_inactive.svg'))
-            QMessageBox.information(self, "Success", f"Recording saved")
+            self.stop_record_btn.setIcon(QIcon('assets/record_stop_inactive.svg'))
+            self.statusBar().showMessage("Finishing recording...")
+
+    def on_recording_finished(self, summary):
+        self.finishing_recorders = [r for r in self.finishing_recorders if r.path != summary.path]
+        self.statusBar().showMessage(f"Recording saved: {summary.path}", 5000)
+        QMessageBox.information(
+            self, "Success",
+            f"Recording saved: {summary.path}\n"
+            f"Frames written: {summary.frames_written}, dropped: {summary.frames_dropped}\n"
+            f"Frame rate: {summary.fps:.1f} fps, average encode time: {summary.avg_encode_ms:.1f} ms")
+
+    def on_source_ended(self, reason):
+        """The worker's source failed or ran out; put the window back in the stopped state."""
+        if not self.camera_active:
+            return
+        print(reason)
+        self.start_stop_camera_feed()
+        self.statusBar().showMessage(reason, 5000)
 
     def stop_camera(self):
         """Stop camera and clean up"""
@@ -674,36 +1354,91 @@ class MainWindow(QMainWindow):
             self.camera.stop()
             self.camera.wait()
             self.camera.change_pixmap_signal.disconnect()
+            self.camera.histogram_signal.disconnect()
+            self.camera.snapshot_signal.disconnect()
+            self.camera.burst_finished_signal.disconnect()
+            self.camera.timelapse_signal.disconnect()
+            self.camera.focus_signal.disconnect()
+            self.camera.source_ended_signal.disconnect()
             self.camera = None
             self.camera_active = False
-
-    def update_image(self, image):
-        self.latest_frame = image
-        image = image.convertToFormat(QImage.Format_RGB888)
-        ptr = image.bits()
-        ptr.setsize(image.byteCount())
-        img_data = np.array(ptr).reshape(image.height(), image.width(), 3)
-        img_data_bgr = img_data[..., ::-1]
-
-        if self.recording and self.video_writer:
-            self.video_writer.write(img_data_bgr)
-
-        # zoom_text = self.zoom_combo.currentText()
-        # percent = int(zoom_text.strip('%'))
-        scale_factor = self.zoom_slider.value() / 100.0
-        new_width = int(image.width() * scale_factor)
-        new_height = int(image.height() * scale_factor)
-
-        scaled_image = image.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.central_label.setPixmap(QPixmap.fromImage(scaled_image))
-        self.central_label.resize(new_width, new_height)
-        self.central_label.set_zoom_factor(scale_factor)
-        self.update_histogram()
+            self.particles_busy = False  # a requested detection frame will not arrive now
+            if self.timelapse is not None:
+                self.stop_timelapse()
+            # keep whatever part of an unfinished burst was captured
+            if self.burst_ring is not None:
+                self.on_burst_finished(self.burst_ring)
+
+    def update_image(self, frame):
+        # The worker already rendered the frame at the negotiated display size,
+        # so the GUI thread only blits it. latest_frame wraps the frame's buffer
+        # without a copy; holding the Frame keeps that buffer alive.
+        self.current_frame = frame
+        self.latest_frame = frame_to_qimage(frame)
+
+        self.central_label.setPixmap(QPixmap.fromImage(self.latest_frame))
+        self.central_label.resize(frame.width, frame.height)
+        self.central_label.set_zoom_factor(frame.zoom)
+
+        if frame.marks is not None and self.camera:
+            frame.marks['displayed'] = time.monotonic()
+            captured, dropped, depth = self.camera.capture_counters()
+            recorder_queue = self.recorder.queue_depth() if self.recorder else 0
+            allocated, transient = self.camera.allocation_counters()
+            self.pipeline_stats.record(frame.sequence, frame.marks, captured, dropped, depth, recorder_queue,
+                                       allocated, transient)
+
+    def refresh_stats_panel(self):
+        summary = self.pipeline_stats.summary()
+        if not summary:
+            return
+        labels = self.stats_labels
+        labels['capture_fps'].setText(f"{summary['capture_fps']:.1f} fps")
+        labels['display_fps'].setText(f"{summary['display_fps']:.1f} fps")
+        labels['latency_ms'].setText(f"{summary['latency_ms']:.1f} ms (p95 {summary['latency_p95_ms']:.1f}, "
+                                     f"max {summary['latency_max_ms']:.1f})")
+        labels['queue_depth'].setText(str(summary['queue_depth']))
+        labels['recorder_queue'].setText(str(summary['recorder_queue']))
+        labels['frames_dropped'].setText(str(summary['frames_dropped']))
+        allocated = f"{summary['bytes_allocated_max']:,} B"
+        if summary['bytes_transient_max'] is not None:
+            allocated += f" (temporaries {summary['bytes_transient_max']:,} B)"
+        labels['bytes_allocated'].setText(allocated)
+        for stage, ms in summary['stage_ms'].items():
+            self.stats_stage_labels[stage].setText(f"{ms:.2f}")
+
+    def reset_stats(self):
+        self.pipeline_stats.reset()
+        for label in list(self.stats_labels.values()) + list(self.stats_stage_labels.values()):
+            label.setText("-")
+
+    def export_stats_csv(self):
+        if not self.pipeline_stats.rows:
+            QMessageBox.warning(self, "Failure", "No frame statistics recorded yet")
+            return
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Statistics", os.path.join(self.output_dir, f"pipeline_stats_{timestamp}.csv"),
+            "CSV Files (*.csv)")
+        if filename:
+            rows = self.pipeline_stats.export_csv(filename)
+            print(f"Exported {rows} frames of statistics to {filename}")
 
     def closeEvent(self, event):
         """Clean up when closing application"""
         if self.camera_active:
             self.stop_camera()
+        if self.recording:
+            self.stop_recording()
+        for recorder in self.finishing_recorders:
+            recorder.on_finished = None
+            recorder.stop()  # finalize the file so it stays playable
+        if self.adjust_worker.isRunning():
+            self.adjust_worker.stop()
+            self.adjust_worker.wait()
+        self.snapshot_saver.shutdown()  # finish writing queued snapshots
+        self.mosaic_executor.shutdown()
+        self.particle_executor.shutdown()
         event.accept()
 
     def helper_reset_slider(self, slider, value):
@@ -782,29 +1517,23 @@ class MainWindow(QMainWindow):
         scale = value / 100.0  # Convert zoom value to scale
 
         # Update zoom for the camera and the ruler
-        if self.camera:
+        if self.camera_active:
+            # the worker renders the next frame at the new size; nothing to rescale here
             self.camera.set_zoom(value)
-        elif self.current_image_path:
-            self.apply_image_adjustments()  # This will re-render the image with zoom
-
-        # Apply scaling immediately to the display and ruler
-        if self.latest_frame:
-            new_w = int(self.latest_frame.width() * scale)
-            new_h = int(self.latest_frame.height() * scale)
-            scaled = self.latest_frame.scaled(new_w, new_h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.central_label.setPixmap(QPixmap.fromImage(scaled))
-            self.central_label.resize(new_w, new_h)
-            self.central_label.set_zoom_factor(scale)
+            self.camera.set_display_geometry(0, 0, scale)
+        elif self.latest_frame:
+            # Zoom does not change the adjustments; only rescale what is displayed
+            self.on_zoom_percent_changed(value)
 
         # Update the ruler zoom factor (this will affect tick spacing)
         self.fixed_ruler_label.set_zoom_factor(scale)
 
     def set_camera_from_list(self, index):
         if 0 <= index < len(self.available_cameras):
-            selected_camera_info = self.available_cameras[index]
-            # call your camera setup here
-            self.camera.set_camera(selected_camera_info)
-            print(index)
+            # used the next time the camera is started
+            self.camera_index = index
+            if self.camera:
+                self.camera.set_camera(index)
 
     def create_left_properties_panel(self):
         properties_widget = QWidget()
@@ -860,6 +1589,7 @@ class MainWindow(QMainWindow):
         self.slider.setValue(50)
         self.brightness_value = 50
         self.slider.valueChanged.connect(self.update_brightness)
+        self.slider.sliderReleased.connect(self.apply_image_adjustments)
 
         self.brightness_spinbox = QSpinBox()
         self.brightness_spinbox.setRange(0, 100)
@@ -880,6 +1610,7 @@ class MainWindow(QMainWindow):
         self.contrast_slider.setValue(50)
         self.contrast_value = 50
         self.contrast_slider.valueChanged.connect(self.update_contrast)
+        self.contrast_slider.sliderReleased.connect(self.apply_image_adjustments)
 
         self.contrast_slider.setStyleSheet(active_colors)
 
@@ -902,6 +1633,7 @@ class MainWindow(QMainWindow):
         self.exposure_slider.setValue(50)
         self.exposure_value = 50
         self.exposure_slider.valueChanged.connect(self.update_exposure)
+        self.exposure_slider.sliderReleased.connect(self.apply_image_adjustments)
 
         self.exposure_slider.setStyleSheet(active_colors)
 
@@ -960,8 +1692,35 @@ class MainWindow(QMainWindow):
         self.grayscale_checkbox = QCheckBox("Grayscale Mode")
         self.grayscale_checkbox.stateChanged.connect(self.update_grayscale)
         effects_layout.addWidget(self.grayscale_checkbox)
+
+        self.awb_lock_checkbox = QCheckBox("Lock White Balance")
+        self.awb_lock_checkbox.stateChanged.connect(self.update_awb_lock)
+        effects_layout.addWidget(self.awb_lock_checkbox)
         effects_group.setLayout(effects_layout)
 
+        # Frame Averaging Group (live camera only)
+        averaging_group = QGroupBox("Frame Averaging")
+        averaging_layout = QVBoxLayout()
+
+        averaging_row = QHBoxLayout()
+        self.averaging_combo = QComboBox()
+        self.averaging_combo.addItems(["Off", "Running Average", "N-Frame Average"])
+        self.averaging_combo.currentIndexChanged.connect(self.update_averaging)
+        self.averaging_frames_spinbox = QSpinBox()
+        self.averaging_frames_spinbox.setRange(2, 64)
+        self.averaging_frames_spinbox.setValue(8)
+        self.averaging_frames_spinbox.setSuffix(" frames")
+        self.averaging_frames_spinbox.valueChanged.connect(self.update_averaging)
+        averaging_row.addWidget(self.averaging_combo)
+        averaging_row.addWidget(self.averaging_frames_spinbox)
+
+        self.average_outputs_checkbox = QCheckBox("Average Snapshots and Recordings")
+        self.average_outputs_checkbox.stateChanged.connect(self.update_averaging)
+
+        averaging_layout.addLayout(averaging_row)
+        averaging_layout.addWidget(self.average_outputs_checkbox)
+        averaging_group.setLayout(averaging_layout)
+
         self.format_combo = QComboBox()
         self.format_combo.addItems(["PNG", "JPG"])
         self.format_combo.setMaximumWidth(60)
@@ -985,6 +1744,7 @@ class MainWindow(QMainWindow):
 
         properties_layout.addWidget(camera_group)
         properties_layout.addWidget(effects_group)
+        properties_layout.addWidget(averaging_group)
         properties_layout.addStretch()
         properties_widget.setLayout(properties_layout)
 
@@ -1,9 +1,27 @@
+from collections import OrderedDict
+
 import numpy as np
-from PyQt5.QtCore import Qt, QPointF, QRectF
-from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap, QPicture
 from PyQt5.QtWidgets import QLabel
 
+from processing.measurements import FIELDS, MeasurementTable, bounds, distances, quantity
+from processing.spatial_index import GridIndex
+
+OVERLAY_CACHE_SIZE = 4  # zoom levels kept rendered
+MAX_OVERLAY_PIXMAP_AREA = 4096 * 4096  # larger views cache a QPicture instead of a pixmap
+PREVIEW_MARGIN = 80  # room around a drag preview for its marker and label
+HIT_TOLERANCE = 6  # widget pixels within which a click picks a measurement
+HANDLE_RADIUS = 8  # widget pixels within which a click grabs an endpoint
+
+MEASUREMENT_COLORS = {'line': QColor(0, 255, 0), 'circle': QColor(0, 200, 255), 'angle': QColor(255, 100, 0)}
+SELECTION_COLOR = QColor(255, 0, 255)
+
+
 class RulerLabel(QLabel):
+    focus_roi_changed = pyqtSignal(object)  # QRectF in image coordinates, or None for the default
+    measurements_changed = pyqtSignal()
+
     def __init__(self, text=""):
         super().__init__(text)
 
@@ -15,26 +33,274 @@ class RulerLabel(QLabel):
         self.ruler_start = None
         self.ruler_end = None
         self.drawing_ruler = False
-        self.ruler_lines = []  # Stored in image coordinates (QPointF)
         self.zoom_factor = 1.0
 
+        # Committed lines, circles and angles, in image coordinates, one
+        # structured-array table per kind (see processing.measurements)
+        self.tables = {kind: MeasurementTable(kind) for kind in FIELDS}
+
         self.circle_tool = False
-        self.circle_measurements = []  # (center: QPointF, edge: QPointF)
 
         self.angle_tool = False
         self.angle_points = []  # Temporarily holds points
-        self.angle_measurements = []  # Stores list of (A, B, C)
 
         self.mouse_pos = None  # Used for dynamic third point preview
 
-        self.line_redo_stack = []
+        self.line_redo_stack = []  # table records
         self.circle_redo_stack = []
         self.angle_redo_stack = []
 
+        self.focus_roi_tool = False
+        self.focus_roi = None  # QRectF in image coordinates
+        self.focus_roi_start = None
+
+        # Committed measurements are drawn once per zoom level into a cached layer;
+        # only the drag preview is drawn on every paint
+        self.label_font = QFont()
+        self.label_font.setPixelSize(10)
+        self.label_font.setBold(True)
+        self.overlay_cache = OrderedDict()  # (zoom, width, height) -> QPixmap or QPicture
+        self.preview_rect = None
+
+        # Spatial index over committed measurements (image coordinates) for
+        # hit-testing, hover and rubber-band selection; keys are (kind, row id)
+        self.select_tool = False
+        self.measurement_index = GridIndex()
+        self.selection = set()
+        self.hover_key = None
+        self.rubber_band = None  # QRectF in image coordinates while dragging
+        self.rubber_band_start = None
+        self.drag_handle = None  # (key, point index) of an endpoint being moved
+
     def set_zoom_factor(self, zoom_factor):
-        self.zoom_factor = zoom_factor
+        if zoom_factor != self.zoom_factor:
+            self.zoom_factor = zoom_factor
+            self.update()
+
+    def invalidate_overlay(self):
+        """Call after any change to the committed measurements."""
+        self.overlay_cache.clear()
+        self.measurements_changed.emit()
+        self.update()
+
+    def measurement_overlay(self):
+        """Cached layer with every committed measurement at the current zoom and size."""
+        key = (self.zoom_factor, self.width(), self.height())
+        layer = self.overlay_cache.get(key)
+        if layer is not None:
+            self.overlay_cache.move_to_end(key)
+            return layer
+
+        if self.width() * self.height() <= MAX_OVERLAY_PIXMAP_AREA:
+            layer = QPixmap(self.size())
+            layer.fill(Qt.transparent)
+        else:
+            layer = QPicture()  # replayed without the Python drawing code, at any size
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_measurement_rulers(painter)
+        painter.end()
+
+        self.overlay_cache[key] = layer
+        while len(self.overlay_cache) > OVERLAY_CACHE_SIZE:
+            self.overlay_cache.popitem(last=False)
+        return layer
+
+    def has_measurements(self):
+        return any(len(table) for table in self.tables.values())
+
+    def current_preview_rect(self):
+        """Widget-space area covered by the in-progress drag preview, or None."""
+        points = []
+        if self.focus_roi_start is not None and self.focus_roi is not None:
+            points = [self.focus_roi.topLeft(), self.focus_roi.bottomRight()]
+        elif self.rubber_band is not None:
+            points = [self.rubber_band.topLeft(), self.rubber_band.bottomRight()]
+        elif self.drag_handle is not None:
+            x0, y0, x1, y1 = self.measurement_index.boxes[self.drag_handle[0]]
+            points = [QPointF(x0, y0), QPointF(x1, y1)]
+        elif self.drawing_ruler and self.ruler_start and self.ruler_end:
+            points = [self.ruler_start, self.ruler_end]
+            if self.circle_tool:
+                r = np.hypot(self.ruler_end.x() - self.ruler_start.x(), self.ruler_end.y() - self.ruler_start.y())
+                points = [self.ruler_start - QPointF(r, r), self.ruler_start + QPointF(r, r)]
+        elif self.angle_tool and self.angle_points:
+            points = list(self.angle_points) + ([self.mouse_pos] if self.mouse_pos else [])
+        if not points:
+            return None
+        xs = [p.x() * self.zoom_factor for p in points]
+        ys = [p.y() * self.zoom_factor for p in points]
+        return QRectF(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)).toAlignedRect().adjusted(
+            -PREVIEW_MARGIN, -PREVIEW_MARGIN, PREVIEW_MARGIN, PREVIEW_MARGIN)
+
+    def update_preview(self):
+        """Repaint only where the drag preview was and now is."""
+        rect = self.current_preview_rect()
+        dirty = rect if self.preview_rect is None else (self.preview_rect if rect is None else rect.united(self.preview_rect))
+        self.preview_rect = rect
+        if dirty is not None:
+            self.update(dirty)
+
+    def points(self, kind, record):
+        """A table row's coordinates as QPointFs."""
+        names = FIELDS[kind]
+        return [QPointF(record[names[i]], record[names[i + 1]]) for i in range(0, len(names), 2)]
+
+    def measurement_points(self, kind):
+        """Every measurement of a kind as a tuple of QPointFs (image coordinates)."""
+        coords = self.tables[kind].coords().tolist()
+        return [tuple(QPointF(c[i], c[i + 1]) for i in range(0, len(c), 2)) for c in coords]
+
+    @property
+    def ruler_lines(self):
+        return self.measurement_points('line')
+
+    @property
+    def circle_measurements(self):
+        return self.measurement_points('circle')
+
+    @property
+    def angle_measurements(self):
+        return self.measurement_points('angle')
+
+    def index_rows(self, kind, rows):
+        for row_id, box in zip(rows['id'].tolist(), bounds(kind, rows).tolist()):
+            self.measurement_index.insert((kind, row_id), tuple(box))
+
+    def unindex(self, key):
+        self.measurement_index.remove(key)
+        self.selection.discard(key)
+        if self.hover_key == key:
+            self.hover_key = None
+
+    def rebuild_index(self):
+        """Re-index every measurement from the tables."""
+        self.measurement_index.clear()
+        self.selection.clear()
+        self.hover_key = None
+        for kind, table in self.tables.items():
+            self.index_rows(kind, table.rows)
+
+    def add_measurement(self, kind, points):
+        """Store one measurement given as QPointFs; returns its id."""
+        table = self.tables[kind]
+        row_id = table.append([v for p in points for v in (p.x(), p.y())])
+        self.index_rows(kind, table.rows[-1:])
+        self.invalidate_overlay()
+        return row_id
+
+    def add_measurements(self, kind, coords):
+        """Store many measurements at once from an (n, coordinates) array; returns their ids."""
+        table = self.tables[kind]
+        ids = table.extend(coords)
+        self.index_rows(kind, table.rows[len(table) - len(ids):])
+        self.invalidate_overlay()
+        return ids
+
+    def remove_measurements(self, kind, ids):
+        """Delete measurements of one kind by id; returns how many were removed."""
+        if not len(ids):
+            return 0
+        removed = self.tables[kind].remove(ids)
+        for row_id in ids:
+            self.unindex((kind, int(row_id)))
+        if removed:
+            self.clear_redo(kind)
+        self.invalidate_overlay()
+        return removed
+
+    def clear_redo(self, kind=None):
+        """Forget undone measurements (of one kind, or all) once other removals have changed the history."""
+        for stack_kind, _, stack in self.tool_stacks():
+            if kind is None or stack_kind == kind:
+                stack.clear()
+
+    def hit_test(self, img_pos):
+        """Key of the measurement nearest to an image position, or None if nothing is close."""
+        tol = HIT_TOLERANCE / self.zoom_factor
+        x, y = img_pos.x(), img_pos.y()
+        candidates = {}
+        for kind, row_id in self.measurement_index.query_point(x, y, tol):
+            candidates.setdefault(kind, []).append(row_id)
+        best, best_distance = None, tol
+        for kind, ids in candidates.items():
+            rows = self.tables[kind].take(ids)
+            d = distances(kind, rows, x, y)
+            i = int(np.argmin(d))
+            if d[i] <= best_distance:
+                best, best_distance = (kind, int(rows['id'][i])), d[i]
+        return best
+
+    def handle_at(self, img_pos):
+        """(key, point index) of a selected measurement's endpoint under an image position, or None."""
+        tol = HANDLE_RADIUS / self.zoom_factor
+        x, y = img_pos.x(), img_pos.y()
+        for key in self.measurement_index.query_point(x, y, tol):
+            if key not in self.selection:
+                continue
+            kind, row_id = key
+            for i, point in enumerate(self.points(kind, self.tables[kind].record(row_id))):
+                if np.hypot(point.x() - x, point.y() - y) <= tol:
+                    return key, i
+        return None
+
+    def select_in_rect(self, rect, extend=False):
+        """Select the measurements lying entirely inside an image-space rectangle."""
+        if not extend:
+            self.selection.clear()
+        x0, y0, x1, y1 = rect.left(), rect.top(), rect.right(), rect.bottom()
+        for key in self.measurement_index.query_rect(x0, y0, x1, y1):
+            bx0, by0, bx1, by1 = self.measurement_index.boxes[key]
+            if bx0 >= x0 and by0 >= y0 and bx1 <= x1 and by1 <= y1:
+                self.selection.add(key)
+        self.update()
+
+    def clear_selection(self):
+        self.selection.clear()
         self.update()
 
+    def move_handle(self, key, index, img_pos):
+        """Move one point of a measurement; moving a circle's center moves the whole circle."""
+        kind, row_id = key
+        table = self.tables[kind]
+        if kind == 'circle' and index == 0:
+            record = table.record(row_id)
+            table.set_point(row_id, 1, record['ex'] + img_pos.x() - record['cx'],
+                            record['ey'] + img_pos.y() - record['cy'])
+        table.set_point(row_id, index, img_pos.x(), img_pos.y())
+        self.measurement_index.update(key, tuple(bounds(kind, table.take([row_id]))[0].tolist()))
+        if self.drag_handle is None:
+            self.invalidate_overlay()
+        else:
+            self.update_preview()
+
+    def delete_selection(self):
+        """Remove every selected measurement; returns how many were deleted."""
+        doomed = list(self.selection)
+        if not doomed:
+            return 0
+        for kind, table in self.tables.items():
+            if table.remove([row_id for k, row_id in doomed if k == kind]):
+                self.clear_redo(kind)
+        for key in doomed:
+            self.unindex(key)
+        self.invalidate_overlay()
+        return len(doomed)
+
+    def item_widget_rect(self, key):
+        x0, y0, x1, y1 = self.measurement_index.boxes[key]
+        z = self.zoom_factor
+        return QRectF(x0 * z, y0 * z, (x1 - x0) * z, (y1 - y0) * z).toAlignedRect().adjusted(
+            -PREVIEW_MARGIN, -PREVIEW_MARGIN, PREVIEW_MARGIN, PREVIEW_MARGIN)
+
+    def set_hover(self, key):
+        if key == self.hover_key:
+            return
+        for old in (self.hover_key, key):
+            if old is not None and old in self.measurement_index:
+                self.update(self.item_widget_rect(old))
+        self.hover_key = key
+
     def enable_ruler(self, enabled):
         self.ruler_enabled = enabled
         # if not enabled:
@@ -55,17 +321,35 @@ class RulerLabel(QLabel):
         self.angle_tool = enabled
         self.update()
 
+    def enable_select_tool(self, enabled):
+        self.select_tool = enabled
+        self.rubber_band = self.rubber_band_start = self.drag_handle = None
+        if not enabled:
+            self.selection.clear()
+        self.update()
+
+    def enable_focus_roi_tool(self, enabled):
+        self.focus_roi_tool = enabled
+        self.focus_roi_start = None
+        self.update()
+
+    def set_focus_roi(self, rect):
+        self.focus_roi = rect
+        self.focus_roi_changed.emit(rect)
+        self.update()
+
     def enable_grayscale(self, enabled):
         self.grayscale_enabled = enabled
 
     def clear_rulers(self):
         self.ruler_start = None
         self.ruler_end = None
-        self.ruler_lines = []
-        self.circle_measurements = []
         self.angle_points = []
-        self.angle_measurements = []
-        self.update()
+        for table in self.tables.values():
+            table.clear()
+        self.clear_redo()
+        self.rebuild_index()
+        self.invalidate_overlay()
 
     def mousePressEvent(self, event):
         if event.button() != Qt.LeftButton:
@@ -73,20 +357,61 @@ class RulerLabel(QLabel):
 
         img_pos = event.pos() / self.zoom_factor
 
-        if self.line_tool or self.circle_tool:
+        if self.focus_roi_tool:
+            self.focus_roi_start = QPointF(img_pos)
+            self.focus_roi = QRectF(self.focus_roi_start, self.focus_roi_start)
+            self.update()
+        elif self.select_tool:
+            extend = bool(event.modifiers() & Qt.ShiftModifier)
+            self.drag_handle = self.handle_at(img_pos)
+            if self.drag_handle is not None:
+                # the item being edited leaves the cached layer and is drawn live until release
+                self.preview_rect = self.current_preview_rect()
+                self.invalidate_overlay()
+                return
+            key = self.hit_test(img_pos)
+            if key is not None:
+                if extend:
+                    self.selection.symmetric_difference_update({key})
+                else:
+                    self.selection = {key}
+                self.update()
+            else:
+                if not extend:
+                    self.clear_selection()
+                self.rubber_band_start = QPointF(img_pos)
+                self.rubber_band = QRectF(self.rubber_band_start, self.rubber_band_start)
+        elif self.line_tool or self.circle_tool:
             self.ruler_start = img_pos
             self.ruler_end = img_pos
             self.drawing_ruler = True
-            self.update()
+            self.update_preview()
 
     def mouseMoveEvent(self, event):
+        if self.focus_roi_start is not None:
+            self.focus_roi = QRectF(self.focus_roi_start, QPointF(event.pos() / self.zoom_factor)).normalized()
+            self.update_preview()
+            return
+
+        if self.drag_handle is not None:
+            self.move_handle(*self.drag_handle, event.pos() / self.zoom_factor)
+            return
+
+        if self.rubber_band_start is not None:
+            self.rubber_band = QRectF(self.rubber_band_start, QPointF(event.pos() / self.zoom_factor)).normalized()
+            self.update_preview()
+            return
+
+        if self.select_tool:
+            self.set_hover(self.hit_test(event.pos() / self.zoom_factor))
+
         if (self.line_tool or self.circle_tool) and self.drawing_ruler:
             self.ruler_end = event.pos() / self.zoom_factor
-            self.update()
+            self.update_preview()
 
         if self.angle_tool:
             self.mouse_pos = event.pos() / self.zoom_factor
-            self.update()
+            self.update_preview()
 
     def mouseReleaseEvent(self, event):
         if event.button() != Qt.LeftButton:
@@ -94,22 +419,42 @@ class RulerLabel(QLabel):
 
         img_pos = event.pos() / self.zoom_factor
 
-        if self.drawing_ruler:
+        if self.focus_roi_start is not None:
+            rect = QRectF(self.focus_roi_start, QPointF(img_pos)).normalized()
+            self.focus_roi_start = None
+            # a click without a drag goes back to the default ROI
+            self.set_focus_roi(rect if rect.width() >= 4 and rect.height() >= 4 else None)
+
+        elif self.drag_handle is not None:
+            self.drag_handle = None
+            self.preview_rect = None
+            self.invalidate_overlay()
+
+        elif self.rubber_band_start is not None:
+            self.select_in_rect(self.rubber_band, extend=bool(event.modifiers() & Qt.ShiftModifier))
+            self.rubber_band = self.rubber_band_start = None
+            self.update_preview()
+
+        elif self.drawing_ruler:
             if self.ruler_start and img_pos:
                 if self.line_tool:
-                    self.ruler_lines.append((QPointF(self.ruler_start), QPointF(img_pos)))
+                    self.add_measurement('line', (QPointF(self.ruler_start), QPointF(img_pos)))
                 elif self.circle_tool:
-                    self.circle_measurements.append((QPointF(self.ruler_start), QPointF(img_pos)))
+                    self.add_measurement('circle', (QPointF(self.ruler_start), QPointF(img_pos)))
             self.drawing_ruler = False
-            self.update()
+            self.preview_rect = None
+            self.invalidate_overlay()
 
         elif self.angle_tool:
             self.angle_points.append(QPointF(img_pos))
             if len(self.angle_points) == 3:
-                self.angle_measurements.append(tuple(self.angle_points))
+                self.add_measurement('angle', tuple(self.angle_points))
                 self.angle_points = []
+                self.preview_rect = None
+                self.invalidate_overlay()
+            else:
+                self.update_preview()
             self.mouse_pos = None
-            self.update()
 
     def paintEvent(self, event):
         super().paintEvent(event)
@@ -120,8 +465,34 @@ class RulerLabel(QLabel):
         # Draw rulers fixed to the window size
         # self.draw_scale_rulers(painter)
 
-        # Draw saved measurements (lines, circles, angles)
-        self.draw_measurement_rulers(painter)
+        # Saved measurements (lines, circles, angles) come from the cached layer
+        if self.has_measurements():
+            layer = self.measurement_overlay()
+            if isinstance(layer, QPixmap):
+                painter.drawPixmap(event.rect(), layer, event.rect())
+            else:
+                painter.drawPicture(0, 0, layer)
+
+        # Focus metric region
+        if self.focus_roi is not None:
+            painter.setPen(QPen(QColor(0, 200, 255), 1, Qt.DashLine))
+            painter.setBrush(Qt.NoBrush)
+            r = self.focus_roi
+            painter.drawRect(QRectF(r.topLeft() * self.zoom_factor, r.bottomRight() * self.zoom_factor))
+
+        if self.drag_handle is not None:
+            kind, row_id = self.drag_handle[0]
+            self.draw_measurement(painter, kind, self.points(kind, self.tables[kind].record(row_id)))
+
+        # Selection and hover highlights are few, so they are drawn live
+        if self.selection or self.hover_key is not None:
+            self.draw_highlights(painter)
+
+        if self.rubber_band is not None:
+            painter.setPen(QPen(SELECTION_COLOR, 1, Qt.DashLine))
+            painter.setBrush(Qt.NoBrush)
+            r = self.rubber_band
+            painter.drawRect(QRectF(r.topLeft() * self.zoom_factor, r.bottomRight() * self.zoom_factor))
 
         # --- Tool-specific previews ---
         # Preview active line or circle tool
@@ -200,26 +571,60 @@ class RulerLabel(QLabel):
         # if not self.ruler_enabled:
         #     return
 
-        # Draw all lines
-        for start, end in self.ruler_lines:
-            self.draw_single_ruler(painter, start, end, QColor(0, 255, 0))
-
-        # Draw all circles
-        for center, edge in self.circle_measurements:
-            self.draw_circle_measurement(painter, center, edge, QColor(0, 200, 255))
-
-        # Draw angle measurements
-        for a, b, c in self.angle_measurements:
-            self.draw_angle_measurement(painter, a, b, c, QColor(255, 100, 0))
-
-        # Draw current (active) tool
-        if self.drawing_ruler and self.ruler_start and self.ruler_end:
-            if self.line_tool:
-                self.draw_single_ruler(painter, self.ruler_start, self.ruler_end, QColor(255, 255, 0))
-            elif self.circle_tool:
-                self.draw_circle_measurement(painter, self.ruler_start, self.ruler_end, QColor(255, 255, 0))
-
-    def draw_single_ruler(self, painter, start_img, end_img, color):
+        # An endpoint being dragged is drawn live instead
+        editing = self.drag_handle[0] if self.drag_handle is not None else None
+
+        # Lines, circles and angles; lengths, radii and angles come from one vectorized call per kind
+        for kind, table in self.tables.items():
+            if not len(table):
+                continue
+            values = quantity(kind, table.rows).tolist()
+            for row_id, c, value in zip(table.rows['id'].tolist(), table.coords().tolist(), values):
+                if (kind, row_id) != editing:
+                    points = [QPointF(c[i], c[i + 1]) for i in range(0, len(c), 2)]
+                    self.draw_measurement(painter, kind, points, value)
+
+    def draw_measurement(self, painter, kind, points, value=None):
+        color = MEASUREMENT_COLORS[kind]
+        if kind == 'line':
+            self.draw_single_ruler(painter, points[0], points[1], color, value)
+        elif kind == 'circle':
+            self.draw_circle_measurement(painter, points[0], points[1], color, value)
+        else:
+            self.draw_angle_measurement(painter, points[0], points[1], points[2], color, value)
+
+    def draw_highlights(self, painter):
+        z = self.zoom_factor
+        by_kind = {}
+        for kind, row_id in self.selection:
+            by_kind.setdefault(kind, []).append(row_id)
+        if self.hover_key is not None:
+            by_kind.setdefault(self.hover_key[0], []).append(self.hover_key[1])
+        painter.setBrush(Qt.NoBrush)
+        selected_pen = QPen(SELECTION_COLOR, 3)
+        hover_pen = QPen(SELECTION_COLOR, 1)
+        marker = QPointF(3, 3)
+        for kind, ids in by_kind.items():
+            # one vectorized lookup per kind, however many items are highlighted
+            rows = self.tables[kind].take(ids)
+            for row_id, c in zip(rows['id'].tolist(), self.tables[kind].coords(rows).tolist()):
+                item = [QPointF(c[i], c[i + 1]) * z for i in range(0, len(c), 2)]
+                selected = (kind, row_id) in self.selection
+                painter.setPen(selected_pen if selected else hover_pen)
+                if kind == 'circle':
+                    center, edge = item
+                    r = np.hypot(edge.x() - center.x(), edge.y() - center.y())
+                    painter.drawEllipse(center, r, r)
+                elif kind == 'line':
+                    painter.drawLine(item[0], item[1])
+                else:
+                    painter.drawLine(item[1], item[0])
+                    painter.drawLine(item[1], item[2])
+                if selected:
+                    for point in item:
+                        painter.drawRect(QRectF(point - marker, point + marker))
+
+    def draw_single_ruler(self, painter, start_img, end_img, color, distance=None):
         pen = QPen(color, 2)
         painter.setPen(pen)
 
@@ -236,19 +641,15 @@ class RulerLabel(QLabel):
         painter.drawEllipse(end, marker_size, marker_size)
 
         # Calculate image-space distance
-        dx = end_img.x() - start_img.x()
-        dy = end_img.y() - start_img.y()
-        distance = np.hypot(dx, dy)
+        if distance is None:
+            distance = np.hypot(end_img.x() - start_img.x(), end_img.y() - start_img.y())
 
         # Text at midpoint
         mid_x = (start.x() + end.x()) / 2
         mid_y = (start.y() + end.y()) / 2
         text = f"{distance:.1f}px"
 
-        font = QFont()
-        font.setPixelSize(10)
-        font.setBold(True)
-        painter.setFont(font)
+        painter.setFont(self.label_font)
 
         fm = painter.fontMetrics()
         text_rect = fm.boundingRect(text)
@@ -259,7 +660,7 @@ class RulerLabel(QLabel):
         painter.setPen(Qt.white)
         painter.drawText(text_rect, Qt.AlignCenter, text)
 
-    def draw_circle_measurement(self, painter, center_img, edge_img, color):
+    def draw_circle_measurement(self, painter, center_img, edge_img, color, radius=None):
         pen = QPen(color, 2)
         painter.setPen(pen)
 
@@ -267,7 +668,8 @@ class RulerLabel(QLabel):
         edge = edge_img * self.zoom_factor
 
         # Radius in image space
-        radius = np.hypot(edge_img.x() - center_img.x(), edge_img.y() - center_img.y())
+        if radius is None:
+            radius = np.hypot(edge_img.x() - center_img.x(), edge_img.y() - center_img.y())
         radius_scaled = radius * self.zoom_factor
 
         # Draw the circle
@@ -278,10 +680,7 @@ class RulerLabel(QLabel):
 
         # Label radius
         text = f"r = {radius:.1f}px"
-        font = QFont()
-        font.setPixelSize(10)
-        font.setBold(True)
-        painter.setFont(font)
+        painter.setFont(self.label_font)
 
         fm = painter.fontMetrics()
         text_rect = fm.boundingRect(text)
@@ -292,7 +691,7 @@ class RulerLabel(QLabel):
         painter.setPen(Qt.white)
         painter.drawText(text_rect, Qt.AlignCenter, text)
 
-    def draw_angle_measurement(self, painter, a_img, b_img, c_img, color):
+    def draw_angle_measurement(self, painter, a_img, b_img, c_img, color, angle_deg=None):
         pen = QPen(color, 2)
         painter.setPen(pen)
 
@@ -311,26 +710,24 @@ class RulerLabel(QLabel):
         painter.drawEllipse(c, marker_size, marker_size)
 
         # Compute angle using dot product
-        ba = np.array([a_img.x() - b_img.x(), a_img.y() - b_img.y()])
-        bc = np.array([c_img.x() - b_img.x(), c_img.y() - b_img.y()])
+        if angle_deg is None:
+            ba = np.array([a_img.x() - b_img.x(), a_img.y() - b_img.y()])
+            bc = np.array([c_img.x() - b_img.x(), c_img.y() - b_img.y()])
 
-        dot_product = np.dot(ba, bc)
-        norm_ba = np.linalg.norm(ba)
-        norm_bc = np.linalg.norm(bc)
+            dot_product = np.dot(ba, bc)
+            norm_ba = np.linalg.norm(ba)
+            norm_bc = np.linalg.norm(bc)
 
-        if norm_ba > 0 and norm_bc > 0:
-            cosine_angle = np.clip(dot_product / (norm_ba * norm_bc), -1.0, 1.0)
-            angle_rad = np.arccos(cosine_angle)
-            angle_deg = np.degrees(angle_rad)
-        else:
-            angle_deg = 0.0
+            if norm_ba > 0 and norm_bc > 0:
+                cosine_angle = np.clip(dot_product / (norm_ba * norm_bc), -1.0, 1.0)
+                angle_rad = np.arccos(cosine_angle)
+                angle_deg = np.degrees(angle_rad)
+            else:
+                angle_deg = 0.0
 
         # Show angle label
         text = f"{angle_deg:.1f}°"
-        font = QFont()
-        font.setPixelSize(10)
-        font.setBold(True)
-        painter.setFont(font)
+        painter.setFont(self.label_font)
 
         fm = painter.fontMetrics()
         text_rect = fm.boundingRect(text)
@@ -341,6 +738,11 @@ class RulerLabel(QLabel):
         painter.setPen(Qt.white)
         painter.drawText(text_rect, Qt.AlignCenter, text)
 
+    def tool_stacks(self):
+        return (('line', self.line_tool, self.line_redo_stack),
+                ('circle', self.circle_tool, self.circle_redo_stack),
+                ('angle', self.angle_tool, self.angle_redo_stack))
+
     def keyPressEvent(self, event):
         is_undo = (
                 event.key() == Qt.Key_Z and
@@ -353,27 +755,25 @@ class RulerLabel(QLabel):
         )
 
         if is_undo:
-            if self.line_tool and self.ruler_lines:
-                item = self.ruler_lines.pop()
-                self.line_redo_stack.append(item)
-            elif self.circle_tool and self.circle_measurements:
-                item = self.circle_measurements.pop()
-                self.circle_redo_stack.append(item)
-            elif self.angle_tool and self.angle_measurements:
-                item = self.angle_measurements.pop()
-                self.angle_redo_stack.append(item)
-            self.update()
+            for kind, tool, stack in self.tool_stacks():
+                if tool and len(self.tables[kind]):
+                    record = self.tables[kind].pop()
+                    stack.append(record)
+                    self.unindex((kind, int(record['id'])))
+                    break
+            self.invalidate_overlay()
 
         elif is_redo:
-            if self.line_tool and self.line_redo_stack:
-                item = self.line_redo_stack.pop()
-                self.ruler_lines.append(item)
-            elif self.circle_tool and self.circle_redo_stack:
-                item = self.circle_redo_stack.pop()
-                self.circle_measurements.append(item)
-            elif self.angle_tool and self.angle_redo_stack:
-                item = self.angle_redo_stack.pop()
-                self.angle_measurements.append(item)
-            self.update()
+            for kind, tool, stack in self.tool_stacks():
+                if tool and stack:
+                    table = self.tables[kind]
+                    table.restore(stack.pop())
+                    self.index_rows(kind, table.rows[-1:])
+                    break
+            self.invalidate_overlay()
+        elif event.key() in (Qt.Key_Delete, Qt.Key_Backspace) and self.selection:
+            self.delete_selection()
+        elif event.key() == Qt.Key_Escape and self.selection:
+            self.clear_selection()
         else:
             super().keyPressEvent(event)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import numpy as np
+from PyQt5.QtCore import QRectF, QSize
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+from RulerLabel import RulerLabel
+from processing.tiles import ImagePyramid, TileCache
+
+
+class TiledImageLabel(RulerLabel):
+    """RulerLabel that can show very large stills from a tiled image pyramid.
+
+    With a pyramid set, only the tiles intersecting the exposed area are turned
+    into pixmaps, from the pyramid level that matches the current zoom, and kept
+    in an LRU cache bounded by `tile_cache_bytes`. Image (0, 0) is drawn at the
+    widget origin, so ruler measurements stay in full-resolution image
+    coordinates exactly as with a plain pixmap. Without a pyramid it behaves
+    like a RulerLabel.
+    """
+
+    def __init__(self, text="", tile_cache_bytes=256 * 1024 * 1024):
+        super().__init__(text)
+        self.pyramid = None
+        self.tile_cache = TileCache(tile_cache_bytes, size_of=lambda entry: entry[0].width() * entry[0].height() * 4)
+
+    def set_tiled_image(self, rgb_image, full_width=None, full_height=None):
+        """Show an RGB numpy image (optionally a reduced copy of a full_width x full_height image)."""
+        self.pyramid = ImagePyramid(rgb_image, full_width, full_height)
+        self.tile_cache.clear()
+        self.clear()  # drop any QLabel pixmap/text underneath the tiles
+        self.update_tiled_size()
+
+    def clear_tiled_image(self):
+        if self.pyramid is not None:
+            self.pyramid = None
+            self.tile_cache.clear()
+            self.setMinimumSize(0, 0)
+            self.update()
+
+    def set_tile_cache_budget(self, max_bytes):
+        self.tile_cache.set_budget(max_bytes)
+
+    def set_zoom_factor(self, zoom_factor):
+        super().set_zoom_factor(zoom_factor)
+        if self.pyramid is not None:
+            self.update_tiled_size()
+
+    def update_tiled_size(self):
+        size = QSize(int(self.pyramid.full_width * self.zoom_factor),
+                     int(self.pyramid.full_height * self.zoom_factor))
+        # the minimum size makes the enclosing scroll area scroll over the whole image
+        self.setMinimumSize(size)
+        self.resize(size.expandedTo(self.size()))
+        self.update()
+
+    def paintEvent(self, event):
+        if self.pyramid is not None:
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            self.draw_visible_tiles(painter, event.rect())
+            painter.end()
+
+        # QLabel contents (none in tiled mode) and measurement overlays
+        super().paintEvent(event)
+
+    def draw_visible_tiles(self, painter, rect):
+        pyramid = self.pyramid
+        zoom = self.zoom_factor
+        k = pyramid.level_for_zoom(zoom)
+        scale = pyramid.level_scale(k) * zoom  # screen pixels per level pixel
+
+        # exposed rect in full-resolution image coordinates
+        x0, y0 = rect.left() / zoom, rect.top() / zoom
+        x1, y1 = (rect.right() + 1) / zoom, (rect.bottom() + 1) / zoom
+
+        tx_range, ty_range = pyramid.tile_range(k, x0, y0, x1, y1)
+        for ty in ty_range:
+            for tx in tx_range:
+                pixmap, (x, y, w, h) = self.tile_pixmap(k, tx, ty)
+                painter.drawPixmap(QRectF(x * scale, y * scale, w * scale, h * scale),
+                                   pixmap, QRectF(0, 0, w, h))
+
+    def tile_pixmap(self, k, tx, ty):
+        key = (k, tx, ty)
+        cached = self.tile_cache.get(key)
+        if cached is not None:
+            return cached
+
+        region, tile_rect = self.pyramid.tile(k, tx, ty)
+        region = np.ascontiguousarray(region)
+        image = QImage(region.data, region.shape[1], region.shape[0], region.strides[0], QImage.Format_RGB888)
+        entry = (QPixmap.fromImage(image), tile_rect)  # fromImage copies, so region may go away
+        self.tile_cache.put(key, entry)
+        return entry
@@ -0,0 +1,143 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+
+from processing.pipeline import Pipeline, PipelineSettings
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+_pipeline = None
+_overwrite = False
+
+
+def collect_inputs(inputs):
+    """Expand directories and glob patterns into a sorted list of image paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item, recursive=True)
+        paths.extend(p for p in candidates if p.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(p))
+    return sorted(set(paths))
+
+
+def output_paths(paths, output_dir, output_format="same"):
+    """Output path for each input, keeping its location relative to the inputs' common directory.
+
+    Raises ValueError if two inputs would still be written to the same file
+    (for example img.png and img.jpg converted to the same format).
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else ""
+    outputs = []
+    for path in paths:
+        stem, ext = os.path.splitext(os.path.relpath(os.path.abspath(path), root))
+        out_ext = ext if output_format == "same" else "." + output_format
+        outputs.append(os.path.join(output_dir, stem + out_ext))
+
+    seen = {}
+    for path, out_path in zip(paths, outputs):
+        key = os.path.normcase(out_path)
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {path} would both be written to {out_path}")
+        seen[key] = path
+    return outputs
+
+
+def _init_worker(settings, overwrite):
+    global _pipeline, _overwrite
+    cv2.setNumThreads(1)  # parallelism comes from the process pool
+    _pipeline = Pipeline(settings)
+    _overwrite = overwrite
+
+
+def _process_one(job):
+    path, out_path = job
+    if not _overwrite and os.path.exists(out_path):
+        return path, None, "exists"
+
+    # one bad file is reported as failed instead of ending the whole run
+    try:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            return path, None, "unreadable"
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        if not cv2.imwrite(out_path, _pipeline.process(image)):
+            return path, None, "write failed"
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {str(e).strip()}"
+    return path, out_path, None
+
+
+def run_batch(paths, settings, output_dir, output_format="same", jobs=None, overwrite=False, progress=True):
+    """Process `paths` on a pool of `jobs` processes. Returns (done, skipped, failed) counts.
+
+    Outputs mirror the inputs' directory layout under `output_dir` (see output_paths).
+    """
+    jobs_list = list(zip(paths, output_paths(paths, output_dir, output_format)))
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    done = skipped = failed = 0
+    start = time.monotonic()
+
+    with multiprocessing.Pool(jobs, _init_worker, (settings, overwrite)) as pool:
+        # unordered streaming: results are written by the workers as soon as each file is done
+        chunksize = max(1, min(16, len(paths) // (jobs * 8)))
+        for index, (path, _, error) in enumerate(pool.imap_unordered(_process_one, jobs_list, chunksize), 1):
+            if error is None:
+                done += 1
+            elif error == "exists":
+                skipped += 1
+            else:
+                failed += 1
+                print(f"\n{path}: {error}", file=sys.stderr)
+
+            if progress:
+                elapsed = time.monotonic() - start
+                rate = index / elapsed if elapsed > 0 else 0.0
+                print(f"\r[{index}/{len(paths)}] {rate:.1f} images/s", end="", file=sys.stderr, flush=True)
+
+    if progress:
+        print(file=sys.stderr)
+    return done, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply the camera processing chain to saved images.")
+    parser.add_argument("inputs", nargs="+", help="image files, directories or glob patterns")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--brightness", type=int, default=50)
+    parser.add_argument("--contrast", type=int, default=50)
+    parser.add_argument("--exposure", type=int, default=50)
+    parser.add_argument("--awb", action="store_true", help="gray-world auto white balance per image")
+    parser.add_argument("--grayscale", action="store_true")
+    parser.add_argument("--flip", action="store_true", help="mirror horizontally like the live view")
+    parser.add_argument("--format", default="same", choices=["same", "png", "jpg", "bmp", "tiff"])
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        return 1
+
+    settings = PipelineSettings(args.brightness, args.contrast, args.exposure, args.awb, args.grayscale, args.flip)
+    try:
+        done, skipped, failed = run_batch(paths, settings, args.output, args.format, args.jobs,
+                                          args.overwrite, progress=not args.quiet)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Processed {done}, skipped {skipped}, failed {failed} -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
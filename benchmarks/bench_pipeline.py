@@ -0,0 +1,304 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processing.awb import AwbController
+from processing.frame import BGR8, RGB8, Frame
+from processing.geometry import letterbox_rect
+from processing.histogram import HistogramEngine
+from processing.pipeline import apply_grayscale
+from processing.sources import NO_FRAME, source_from_spec
+from processing.tone import ToneMapper
+
+RESOLUTIONS = {
+    "640x480": (640, 480),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+DISPLAY_ZOOM = 0.5  # live view zoom used for the resize and whole-pipeline stages
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def synthetic_frame(width, height, seed=0):
+    """Deterministic BGR test frame: colour gradients plus sensor-like noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[..., 0] = x
+    frame[..., 1] = y
+    frame[..., 2] = (x + y) / 2
+    frame += rng.normal(0, 12, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def recorded_frames(pattern, width, height, limit=8):
+    """Saved frames resized to the benchmark resolution."""
+    paths = sorted(glob.glob(os.path.join(pattern, "*")) if os.path.isdir(pattern) else glob.glob(pattern))
+    frames = []
+    for path in paths:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is not None:
+            frames.append(cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA))
+        if len(frames) >= limit:
+            break
+    return frames
+
+
+def source_frames(spec, width, height, limit=8):
+    """Frames read from a frame source (camera, file, ...) resized to the benchmark resolution."""
+    source = source_from_spec(spec)
+    if not source.open():
+        print(f"Cannot open frame source: {spec}")
+        return []
+    frames = []
+    try:
+        for _ in range(10 * limit):  # a few empty reads (grab timeouts) are tolerated
+            if len(frames) >= limit:
+                break
+            ok, image, _ = source.read()
+            if ok is NO_FRAME:
+                continue
+            if not ok:
+                break
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)  # the stages below expect BGR
+            frames.append(cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA))
+    finally:
+        source.close()
+    return frames
+
+
+def time_stage(fn, frames, iterations, warmup=3):
+    """Per-call times in milliseconds, cycling through `frames`."""
+    for i in range(warmup):
+        fn(frames[i % len(frames)])
+    times = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        frame = frames[i % len(frames)]
+        start = time.perf_counter()
+        fn(frame)
+        times[i] = (time.perf_counter() - start) * 1000.0
+    return times
+
+
+# Stages that run on the letterboxed display canvas; they are timed on frames letterboxed beforehand
+DISPLAY_STAGES = ("awb", "grayscale", "qimage")
+
+
+def display_canvases(frames, width, height):
+    """Each frame resized, mirrored and letterboxed into its own display-size canvas, as the live view does."""
+    out_w, out_h = int(width * DISPLAY_ZOOM), int(height * DISPLAY_ZOOM)
+    x, y, new_w, new_h = letterbox_rect(width, height, out_w, out_h)
+    canvases = []
+    for frame in frames:
+        canvas = np.zeros((out_h, out_w, 3), np.uint8)
+        fitted = canvas[y:y + new_h, x:x + new_w]
+        cv2.resize(frame, (new_w, new_h), dst=fitted, interpolation=cv2.INTER_AREA)
+        cv2.flip(fitted, 1, dst=fitted)
+        canvases.append(canvas)
+    return canvases
+
+
+def allocation_pass(fn, frames, iterations=30, warmup=3):
+    """Largest per-frame (pool bytes, temporary bytes) after warm-up, with tracemalloc on.
+
+    Run separately from the timed loop, since tracing slows every allocation down.
+    """
+    tracemalloc.start()
+    try:
+        counters = [fn(frames[i % len(frames)]) for i in range(warmup + iterations)][warmup:]
+    finally:
+        tracemalloc.stop()
+    return max(c[0] for c in counters), max(c[1] for c in counters)
+
+
+def build_stages(width, height, qt):
+    """name -> callable(frame) for each pipeline stage at one resolution.
+
+    Stages in DISPLAY_STAGES take a display canvas (see display_canvases), the
+    others a full-resolution frame.
+    """
+    tone = ToneMapper(70, 40, 60)
+    awb = AwbController()
+    histogram = HistogramEngine()
+
+    out_w, out_h = int(width * DISPLAY_ZOOM), int(height * DISPLAY_ZOOM)
+    x, y, new_w, new_h = letterbox_rect(width, height, out_w, out_h)
+    full = np.empty((height, width, 3), np.uint8)
+    canvas = np.zeros((out_h, out_w, 3), np.uint8)
+    fitted = canvas[y:y + new_h, x:x + new_w]
+    balanced = np.empty_like(canvas)
+    gray = np.empty((out_h, out_w), np.uint8)
+    rgb = np.empty_like(canvas)
+
+    def letterbox(frame):
+        cv2.resize(frame, (new_w, new_h), dst=fitted, interpolation=cv2.INTER_AREA)
+        cv2.flip(fitted, 1, dst=fitted)
+
+    def awb_stage(display):
+        awb.set_gains(awb.estimate(display))
+        awb.apply(display, dst=balanced)
+
+    stages = {
+        "tone": lambda frame: tone.apply(frame, dst=full),
+        "resize_letterbox": letterbox,
+        "awb": awb_stage,
+        "grayscale": lambda display: apply_grayscale(display, gray),
+        "colour_swap": lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=full),
+        "histogram": lambda frame: histogram.update(frame, force=True),
+    }
+
+    if qt is not None:
+        QPixmap, frame_to_qimage, CameraWorkerThread = qt
+
+        def qimage_stage(display):
+            cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=rgb)
+            QPixmap.fromImage(frame_to_qimage(Frame(rgb, pixel_format=RGB8)))
+
+        worker = CameraWorkerThread()
+        worker.set_brightness(70)
+        worker.set_contrast(40)
+        worker.set_exposure(60)
+        worker.set_display_geometry(0, 0, DISPLAY_ZOOM)
+        worker.set_histogram_rate(0)  # measured on its own above
+        sequence = iter(range(1 << 62))
+
+        def whole_pipeline(frame):
+            display = worker.process_counted(Frame(frame, time.monotonic(), next(sequence), BGR8))
+            QPixmap.fromImage(frame_to_qimage(display))
+            return worker.allocation_counters()
+
+        stages["qimage"] = qimage_stage
+        stages["pipeline"] = whole_pipeline
+
+    return stages
+
+
+def load_qt():
+    """Qt-dependent stages need a (possibly offscreen) QGuiApplication; None if PyQt5 is missing."""
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtGui import QGuiApplication, QPixmap
+        from CameraWorker import CameraWorkerThread
+        from utils.qt_image import frame_to_qimage
+    except ImportError as exc:
+        print(f"Skipping Qt stages: {exc}", file=sys.stderr)
+        return None, None
+    app = QGuiApplication.instance() or QGuiApplication([])
+    return app, (QPixmap, frame_to_qimage, CameraWorkerThread)
+
+
+def run(resolutions, iterations, recorded=None, source=None):
+    app, qt = load_qt()
+    results = {}
+    for res_name in resolutions:
+        width, height = RESOLUTIONS[res_name]
+        sources = {"synthetic": [synthetic_frame(width, height, seed) for seed in range(2)]}
+        if recorded:
+            frames = recorded_frames(recorded, width, height)
+            if frames:
+                sources["recorded"] = frames
+        if source:
+            frames = source_frames(source, width, height)
+            if frames:
+                sources["source"] = frames
+
+        for source_name, frames in sources.items():
+            for stage_name, fn in build_stages(width, height, qt).items():
+                # letterboxed outside the timed call; fresh copies because some stages work in place
+                inputs = display_canvases(frames, width, height) if stage_name in DISPLAY_STAGES else frames
+                times = time_stage(fn, inputs, iterations)
+                mean = float(times.mean())
+                results[f"{res_name}/{source_name}/{stage_name}"] = {
+                    "mean_ms": round(mean, 4),
+                    "p99_ms": round(float(np.percentile(times, 99)), 4),
+                    "fps": round(1000.0 / mean, 1) if mean > 0 else None,
+                }
+                if stage_name == "pipeline":
+                    pooled, transient = allocation_pass(fn, frames)
+                    results[f"{res_name}/{source_name}/{stage_name}"].update(
+                        bytes_allocated=pooled, bytes_transient=transient)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage change against a baseline; returns the keys that regressed."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        change = (result["mean_ms"] - base["mean_ms"]) / base["mean_ms"] * 100.0 if base["mean_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<40} {base['mean_ms']:>9.3f} -> {result['mean_ms']:>9.3f} ms  {change:+6.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the camera processing pipeline stage by stage.")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("-n", "--iterations", type=int, default=100)
+    parser.add_argument("--recorded", help="directory or glob of saved frames to run alongside synthetic ones")
+    parser.add_argument("--source", help="also run on frames from a frame source, e.g. pylon or file:clip.mp4")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, help="write results as the new baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, help="compare against a baseline file")
+    parser.add_argument("--threshold", type=float, default=20.0, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    results = run(args.resolutions, args.iterations, args.recorded, args.source)
+
+    print(f"{'stage':<40} {'mean ms':>9} {'p99 ms':>9} {'fps':>9}")
+    for key, result in results.items():
+        print(f"{key:<40} {result['mean_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['fps']:>9.1f}")
+
+    # steady-state allocation of the whole pipeline: pool buffers should stay at 0
+    print()
+    print(f"{'allocated per frame':<40} {'pool B':>9} {'temp B':>9}")
+    for key, result in results.items():
+        if "bytes_allocated" in result:
+            print(f"{key:<40} {result['bytes_allocated']:>9} {result['bytes_transient']:>9}")
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print()
+        if compare(results, baseline, args.threshold):
+            status = 1
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "machine": {
+                    "platform": platform.platform(),
+                    "python": platform.python_version(),
+                    "opencv": cv2.__version__,
+                    "numpy": np.__version__,
+                    "cpus": os.cpu_count(),
+                },
+                "iterations": args.iterations,
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.save}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import argparse
 import sys
 
 from PyQt5.QtGui import QPalette, QColor
@@ -6,7 +7,11 @@ from MainWindow import MainWindow
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Microscope Camera Software")
+    parser.add_argument('--source', help="frame source: opencv[:INDEX], pylon[:SERIAL], "
+                                         "file:PATH[@FPS] or synthetic[:WxH][@FPS][:PATTERN][:mono]")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
     palette = QPalette()
     palette.setColor(QPalette.Window, QColor(255, 255, 255))
     palette.setColor(QPalette.WindowText, QColor(0, 0, 0))
@@ -22,5 +27,5 @@ if __name__ == "__main__":
     palette.setColor(QPalette.Highlight, QColor(0, 120, 215))
     palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
     app.setPalette(palette)
-    main_window = MainWindow()
+    main_window = MainWindow(args.source)
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+# Averaging modes
+OFF = 'off'
+EMA = 'ema'  # running exponential average
+BOX = 'box'  # mean of the last N frames
+
+
+class TemporalAverager:
+    """Temporal noise reduction over consecutive frames of the same shape.
+
+    EMA keeps one float32 accumulator and folds each frame in with
+    cv2.accumulateWeighted, using alpha = 2 / (N + 1) (the usual equivalent of
+    an N-frame window). BOX keeps the last N frames in a preallocated ring and
+    a running float32 sum: each frame adds itself and subtracts the frame it
+    replaces, so the cost per pixel does not depend on N. Sums of 8-bit values
+    are exact in float32, so the box sum never drifts.
+
+    The state resets itself whenever the frame shape changes. Settings may be
+    changed from another thread; they take effect at the next frame.
+    """
+
+    def __init__(self, mode=OFF, frames=8):
+        self.mode = mode
+        self.frames = frames
+        self._acc = None
+        self._ring = None
+        self._count = 0
+        self._next = 0
+        self._stale = False
+
+    @property
+    def enabled(self):
+        return self.mode != OFF
+
+    @property
+    def alpha(self):
+        return 2.0 / (self.frames + 1)
+
+    def set_mode(self, mode):
+        if mode != self.mode:
+            self.mode = mode
+            self.reset()
+
+    def set_frames(self, frames):
+        frames = max(1, int(frames))
+        if frames != self.frames:
+            self.frames = frames
+            self.reset()
+
+    def reset(self):
+        # applied by the next apply() call, so a reset never races a frame in progress
+        self._stale = True
+
+    def apply(self, image, dst=None):
+        """Average `image` into the running state; returns the 8-bit average (in `dst` if given)."""
+        if self.mode == OFF:
+            return image
+        mode = self.mode
+        if self._stale or self._acc is None or self._acc.shape != image.shape:
+            self._stale = False
+            self._acc = image.astype(np.float32)
+            self._ring = None
+            self._count = self._next = 1
+            if mode == BOX:
+                self._ring = np.empty((self.frames,) + image.shape, dtype=np.uint8)
+                self._ring[0] = image
+        elif mode == EMA or self._ring is None:
+            cv2.accumulateWeighted(image, self._acc, self.alpha)
+        else:
+            frames = len(self._ring)
+            slot = self._next % frames
+            if self._count == frames:
+                cv2.subtract(self._acc, self._ring[slot], dst=self._acc, dtype=cv2.CV_32F)
+            else:
+                self._count += 1
+            cv2.accumulate(image, self._acc)
+            self._ring[slot] = image
+            self._next = slot + 1
+
+        scale = 1.0 / self._count if self._ring is not None else 1.0
+        return cv2.convertScaleAbs(self._acc, dst=dst, alpha=scale)
@@ -0,0 +1,81 @@
+import time
+
+import cv2
+import numpy as np
+
+_RAMP = np.arange(256, dtype=np.float32)
+
+
+class AwbController:
+    """Gray-world auto white balance with low-rate, smoothed gain estimation.
+
+    Gains are estimated at most `rate_hz` times per second from the central
+    region of the frame, sampled every `decimation` pixels, and blended into
+    the running gains with an exponential moving average (`smoothing` is the
+    weight of the new estimate). They are applied in one pass through a
+    per-channel LUT. When locked, the current gains are kept and nothing is
+    estimated.
+    """
+
+    def __init__(self, rate_hz=2.0, smoothing=0.3, decimation=8):
+        self.rate_hz = rate_hz
+        self.smoothing = smoothing
+        self.decimation = decimation
+        self.locked = False
+        self.reset()
+
+    def reset(self):
+        self.gains = np.ones(3, dtype=np.float32)
+        self.lut = None  # None means identity gains
+        self._last_estimate = None
+
+    def set_locked(self, locked):
+        self.locked = locked
+
+    def estimate(self, image):
+        """Gray-world gains (b, g, r) from a decimated center ROI, or None."""
+        h, w = image.shape[:2]
+        step = self.decimation
+        roi = image[h // 4:3 * h // 4:step, w // 4:3 * w // 4:step]
+        avg_b, avg_g, avg_r, _ = cv2.mean(roi)
+        if avg_b <= 0 or avg_g <= 0 or avg_r <= 0:
+            return None
+        avg_gray = (avg_b + avg_g + avg_r) / 3
+        return np.array([avg_gray / avg_b, avg_gray / avg_g, avg_gray / avg_r], dtype=np.float32)
+
+    def update(self, image, now=None):
+        """Re-estimate the gains if unlocked and due. Returns True if they changed."""
+        if self.locked:
+            return False
+        now = time.monotonic() if now is None else now
+        if self._last_estimate is not None and now - self._last_estimate < 1.0 / self.rate_hz:
+            return False
+        self._last_estimate = now
+
+        target = self.estimate(image)
+        if target is None:
+            return False
+        if self.lut is None:
+            gains = target  # first estimate: no point ramping up from 1.0
+        else:
+            gains = self.gains + self.smoothing * (target - self.gains)
+        self.set_gains(gains)
+        return True
+
+    def set_gains(self, gains):
+        gains = np.asarray(gains, dtype=np.float32)
+        lut = np.clip(np.rint(_RAMP[:, None] * gains[None, :]), 0, 255).astype(np.uint8)
+        self.gains = gains
+        self.lut = lut.reshape(1, 256, 3)
+
+    def apply(self, image, dst=None):
+        """Apply the current gains to a BGR image in one pass (in place if dst is image)."""
+        lut = self.lut
+        if lut is None:
+            if dst is None or dst is image:
+                return image
+            np.copyto(dst, image)
+            return dst
+        if dst is None:
+            return cv2.LUT(image, lut)
+        return cv2.LUT(image, lut, dst=dst)
@@ -0,0 +1,74 @@
+import sys
+
+import numpy as np
+
+# getrefcount() of a buffer seen only by its ring: the ring list, the loop
+# variable and the getrefcount argument itself
+_POOL_ONLY_REFS = 3
+
+
+class BufferPool:
+    """Rings of reusable frame buffers keyed by stage name, shape and dtype.
+
+    Each key owns up to `depth` buffers that are handed out round-robin, so a
+    buffer is only overwritten `depth` requests after it was given out. Pipeline
+    stages write into these with OpenCV `dst=` outputs instead of allocating a
+    new array every frame.
+
+    Rings requested with `shared=True` hold buffers that leave the worker (for
+    example inside a Frame sent to the GUI). Those are never handed out round-robin;
+    a buffer is only reused once nothing outside the pool references it, and the
+    ring grows if every buffer is still held somewhere.
+
+    Allocation is counted per frame (between `end_frame` calls) so the caller
+    can check that steady-state allocation is zero.
+    """
+
+    def __init__(self, depth=2):
+        self.depth = depth
+        self._rings = {}  # (name, shape, dtype) -> [buffers, next index]
+        self.total_bytes_allocated = 0
+        self.last_frame_bytes = 0
+        self._frame_bytes = 0
+
+    def get(self, name, shape, dtype=np.uint8, depth=None, shared=False):
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        ring = self._rings.get(key)
+        if ring is None:
+            # a stage changed geometry: drop its old buffers instead of keeping both
+            for stale in [k for k in self._rings if k[0] == name]:
+                del self._rings[stale]
+            ring = self._rings[key] = [[], 0]
+
+        buffers, index = ring
+        if shared:
+            for buf in buffers:
+                if sys.getrefcount(buf) <= _POOL_ONLY_REFS:
+                    return buf
+            return self._allocate(buffers, key[1], dtype)
+
+        if len(buffers) < (depth or self.depth):
+            return self._allocate(buffers, key[1], dtype)
+
+        buf = buffers[index]
+        ring[1] = (index + 1) % len(buffers)
+        return buf
+
+    def _allocate(self, buffers, shape, dtype):
+        buf = np.zeros(shape, dtype=dtype)
+        buffers.append(buf)
+        self._frame_bytes += buf.nbytes
+        self.total_bytes_allocated += buf.nbytes
+        return buf
+
+    def end_frame(self):
+        """Close the current frame's allocation count and start a new one."""
+        self.last_frame_bytes = self._frame_bytes
+        self._frame_bytes = 0
+        return self.last_frame_bytes
+
+    def pooled_bytes(self):
+        return sum(buf.nbytes for buffers, _ in self._rings.values() for buf in buffers)
+
+    def clear(self):
+        self._rings.clear()
@@ -0,0 +1,131 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+INDEX_NAME = "index.json"
+
+
+class BurstRing:
+    """Preallocated in-RAM store for a burst of raw frames.
+
+    All memory is allocated up front, so adding a frame is a single copy and
+    never allocates; this is what lets a burst keep up with the sensor.
+    """
+
+    def __init__(self, frames, shape, dtype=np.uint8, pixel_format=None):
+        self.capacity = frames
+        self.images = np.empty((frames,) + tuple(shape), dtype=dtype)
+        self.images.fill(0)  # touch every page now rather than during the burst
+        self.timestamps = np.zeros(frames, dtype=np.float64)
+        self.sequences = np.zeros(frames, dtype=np.int64)
+        self.pixel_format = pixel_format
+        self.count = 0
+        self.frames_skipped = 0  # frames whose shape did not match the ring
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    @property
+    def nbytes(self):
+        return self.images.nbytes
+
+    def add(self, image, timestamp, sequence=0):
+        """Copy a frame in; returns False once the ring is full."""
+        if self.full:
+            return False
+        if image.shape != self.images.shape[1:]:
+            self.frames_skipped += 1
+            return True
+        np.copyto(self.images[self.count], image)
+        self.timestamps[self.count] = timestamp
+        self.sequences[self.count] = sequence
+        self.count += 1
+        return not self.full
+
+
+def write_burst(ring, directory, settings=None, chunk_frames=64):
+    """Flush a BurstRing to a raw container directory; returns the index path.
+
+    Frames go into `.npy` chunks of `chunk_frames` frames each, so a reader can
+    memory-map any chunk without touching the others. index.json records the
+    frame shape, dtype, chunk files, per-frame timestamps and the settings the
+    burst was taken with.
+    """
+    os.makedirs(directory, exist_ok=True)
+    chunks = []
+    for start in range(0, ring.count, chunk_frames):
+        stop = min(start + chunk_frames, ring.count)
+        name = f"frames_{start:06d}.npy"
+        chunk = np.lib.format.open_memmap(os.path.join(directory, name), mode='w+',
+                                          dtype=ring.images.dtype, shape=(stop - start,) + ring.images.shape[1:])
+        chunk[:] = ring.images[start:stop]
+        chunk.flush()
+        del chunk
+        chunks.append({"file": name, "start": start, "frames": stop - start})
+
+    timestamps = ring.timestamps[:ring.count]
+    duration = float(timestamps[-1] - timestamps[0]) if ring.count > 1 else 0.0
+    index = {
+        "created": datetime.datetime.now().isoformat(timespec='seconds'),
+        "frames": int(ring.count),
+        "shape": list(ring.images.shape[1:]),
+        "dtype": str(ring.images.dtype),
+        "pixel_format": ring.pixel_format,
+        "fps": (ring.count - 1) / duration if duration > 0 else 0.0,
+        "chunk_frames": chunk_frames,
+        "chunks": chunks,
+        "timestamps": (timestamps - timestamps[0]).tolist() if ring.count else [],
+        "sequences": ring.sequences[:ring.count].tolist(),
+        "settings": settings or {},
+    }
+    index_path = os.path.join(directory, INDEX_NAME)
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=1)
+    return index_path
+
+
+class BurstReader:
+    """Random access to a burst container; chunks are memory-mapped on first use."""
+
+    def __init__(self, path):
+        if os.path.isdir(path):
+            path = os.path.join(path, INDEX_NAME)
+        self.directory = os.path.dirname(path)
+        with open(path) as f:
+            self.index = json.load(f)
+        self.chunk_frames = self.index["chunk_frames"]
+        self.timestamps = self.index["timestamps"]
+        self.pixel_format = self.index.get("pixel_format")
+        self.settings = self.index.get("settings", {})
+        self._chunks = {}
+
+    def __len__(self):
+        return self.index["frames"]
+
+    def frame(self, i):
+        """Read-only view of frame `i` (pages are read from disk on access)."""
+        if not 0 <= i < len(self):
+            raise IndexError(f"Frame {i} out of range (0..{len(self) - 1})")
+        c = i // self.chunk_frames
+        chunk = self._chunks.get(c)
+        if chunk is None:
+            name = self.index["chunks"][c]["file"]
+            chunk = self._chunks[c] = np.load(os.path.join(self.directory, name), mmap_mode='r')
+        return chunk[i - c * self.chunk_frames]
+
+    def timestamp(self, i):
+        return self.timestamps[i]
+
+    def close(self):
+        self._chunks.clear()
+
+
+def available_memory():
+    """Physical memory currently available in bytes, or None where it cannot be queried."""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
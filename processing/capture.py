@@ -0,0 +1,125 @@
+import threading
+
+from processing.frame import Frame
+from processing.sources import NO_FRAME
+
+
+class LatestFrameMailbox:
+    """One-slot handoff between the capture and processing threads.
+
+    A new frame always replaces one the consumer has not taken yet, so the
+    consumer never works on anything older than the newest capture. Replaced
+    frames are counted as dropped and handed back to the producer for reuse.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.frames_put = 0
+        self.frames_taken = 0
+        self.frames_dropped = 0
+
+    def put(self, item):
+        """Store `item`, returning the unconsumed item it replaced (or None)."""
+        with self._cond:
+            replaced = self._item
+            if replaced is not None:
+                self.frames_dropped += 1
+            self._item = item
+            self.frames_put += 1
+            self._cond.notify()
+            return replaced
+
+    def take(self, timeout=None):
+        """Wait for and remove the latest item. Returns None on timeout or close."""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            if item is not None:
+                self.frames_taken += 1
+            return item
+
+    def depth(self):
+        return 0 if self._item is None else 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames from a FrameSource as fast as it delivers them.
+
+    Frames go into a LatestFrameMailbox so a slow consumer can never make the
+    camera's own buffer back up. Capture buffers are recycled through a free
+    list: the consumer returns a frame with `recycle` once it is done with it.
+
+    When `burst` is set (a BurstRing), every frame read is also copied into it
+    here, at the source's full rate, until it is full; `on_burst_done(ring)` is
+    then called from this thread.
+
+    Capture ends when the source reports that it has ended or raises; `ended`
+    is then set (and `error` holds the exception, if any) unless stop() asked
+    for it. Reads that simply return no frame are retried.
+    """
+
+    def __init__(self, source, mailbox=None):
+        super().__init__(daemon=True)
+        self.source = source
+        self.mailbox = mailbox or LatestFrameMailbox()
+        self.running = False
+        self.sequence = 0
+        self.burst = None
+        self.on_burst_done = None
+        self.ended = False
+        self.error = None
+        self._free = []
+        self._free_lock = threading.Lock()
+
+    def run(self):
+        self.running = True
+        while self.running:
+            with self._free_lock:
+                buf = self._free.pop() if self._free else None
+
+            try:
+                ret, image, timestamp = self.source.read(buf)
+            except Exception as e:
+                self.error = e
+                ret = False
+            if ret is NO_FRAME:
+                if buf is not None:
+                    with self._free_lock:
+                        self._free.append(buf)
+                continue
+            if not ret:
+                self.ended = self.running
+                break
+
+            burst = self.burst
+            if burst is not None and not burst.add(image, timestamp, self.sequence):
+                self.burst = None
+                if self.on_burst_done is not None:
+                    self.on_burst_done(burst)
+
+            replaced = self.mailbox.put(Frame(image, timestamp, self.sequence, self.source.pixel_format))
+            self.sequence += 1
+            if replaced is not None:
+                self.recycle(replaced)
+
+        self.running = False
+        self.mailbox.close()
+
+    def recycle(self, captured):
+        with self._free_lock:
+            self._free.append(captured.image)
+
+    def stop(self):
+        self.running = False
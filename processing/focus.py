@@ -0,0 +1,64 @@
+import time
+
+import cv2
+import numpy as np
+
+from processing.buffer_pool import BufferPool
+
+CENTER_ROI = (1 / 3, 1 / 3, 1 / 3, 1 / 3)  # x, y, w, h as fractions of the frame
+
+
+class FocusMeter:
+    """Sharpness score (variance of the Laplacian) on a decimated region of interest.
+
+    The ROI is taken from the full-resolution frame by plain striding, so the
+    cost is set by the ROI size after decimation (about 230k pixels for a
+    4K frame with the defaults), not by the frame size. `update` only measures
+    when `1 / rate_hz` seconds have passed.
+    """
+
+    def __init__(self, rate_hz=4.0, decimation=2, roi=CENTER_ROI):
+        self.rate_hz = rate_hz
+        self.decimation = decimation
+        self.roi = roi
+        self._last_update = None
+        self._buffers = BufferPool(depth=1)  # sample, gray and Laplacian, reused between measurements
+
+    def set_rate(self, rate_hz):
+        self.rate_hz = rate_hz
+
+    def set_roi(self, roi):
+        """(x, y, w, h) fractions of the frame; None for the centre third."""
+        self.roi = roi or CENTER_ROI
+
+    def due(self, now=None):
+        if self.rate_hz <= 0:
+            return False
+        now = time.monotonic() if now is None else now
+        return self._last_update is None or now - self._last_update >= 1.0 / self.rate_hz
+
+    def roi_view(self, image):
+        h, w = image.shape[:2]
+        x, y, rw, rh = self.roi
+        x0, y0 = int(x * w), int(y * h)
+        x1, y1 = max(x0 + 8, int((x + rw) * w)), max(y0 + 8, int((y + rh) * h))
+        return image[y0:y1:self.decimation, x0:x1:self.decimation]
+
+    def measure(self, image):
+        view = self.roi_view(image)
+        # OpenCV would make its own contiguous copy of the strided view; gather it into a reused one
+        sample = self._buffers.get('sample', view.shape)
+        np.copyto(sample, view)
+        if sample.ndim == 3:
+            sample = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY, dst=self._buffers.get('gray', sample.shape[:2]))
+        lap = cv2.Laplacian(sample, cv2.CV_32F, dst=self._buffers.get('laplacian', sample.shape, np.float32), ksize=3)
+        _, std = cv2.meanStdDev(lap)
+        return float(std[0, 0] ** 2)
+
+    def update(self, image, now=None):
+        """Score if a measurement is due, otherwise None."""
+        now = time.monotonic() if now is None else now
+        if not self.due(now):
+            return None
+        self._last_update = now
+        return self.measure(image)
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+TILE_SIZE = 512
+
+
+def focus_energy(image, blur=9):
+    """Local Laplacian energy: squared Laplacian response averaged over a `blur`-sized window."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    lap = cv2.Laplacian(gray, cv2.CV_32F, ksize=3)
+    cv2.multiply(lap, lap, dst=lap)
+    return cv2.blur(lap, (blur, blur), dst=lap)
+
+
+def load_slices(paths):
+    """Memory-map every stack slice (.npy); nothing is read until a tile touches it."""
+    return [np.load(path, mmap_mode='r') for path in paths]
+
+
+def fuse_tile(slices, x, y, w, h, margin, blur):
+    """Fused pixels and depth indices for one tile, keeping only running maxima in memory."""
+    height, width = slices[0].shape[:2]
+    # read a margin around the tile so the focus measure is correct at its edges
+    x0, y0 = max(0, x - margin), max(0, y - margin)
+    x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+    inner = (slice(y - y0, y - y0 + h), slice(x - x0, x - x0 + w))
+
+    best = None
+    fused = None
+    depth = np.zeros((h, w), dtype=np.uint8)
+    for index, stack_slice in enumerate(slices):
+        region = np.ascontiguousarray(stack_slice[y0:y1, x0:x1])
+        energy = focus_energy(region, blur)[inner]
+        pixels = region[inner]
+        if best is None:
+            best = energy.copy()
+            fused = pixels.copy()
+            continue
+        sharper = cv2.compare(energy, best, cv2.CMP_GT)
+        cv2.max(energy, best, dst=best)
+        cv2.copyTo(pixels, sharper, fused)
+        depth[sharper > 0] = min(index, 255)
+    return fused, depth
+
+
+def fuse_stack(paths, tile_size=TILE_SIZE, workers=None, blur=9, progress=None):
+    """All-in-focus image from a Z-series of .npy slices; returns (fused, depth_map).
+
+    For every pixel the slice with the highest local Laplacian energy wins;
+    `depth_map` holds that slice's index. Work is split into tiles, and the
+    tiles run on a thread pool (OpenCV releases the GIL). Each tile keeps only
+    a running maximum, so memory does not grow with the number of slices.
+    `progress(done, total)` is called after each tile.
+    """
+    slices = load_slices(paths)
+    if not slices:
+        raise ValueError("Focus stack has no slices")
+    shape = slices[0].shape
+    for stack_slice in slices[1:]:
+        if stack_slice.shape != shape:
+            raise ValueError(f"Stack slices differ in size: {stack_slice.shape} vs {shape}")
+
+    height, width = shape[:2]
+    fused = np.empty(shape, dtype=slices[0].dtype)
+    depth = np.empty((height, width), dtype=np.uint8)
+    tiles = [(x, y, min(tile_size, width - x), min(tile_size, height - y))
+             for y in range(0, height, tile_size) for x in range(0, width, tile_size)]
+    margin = blur + 2
+
+    def run(tile):
+        x, y, w, h = tile
+        fused[y:y + h, x:x + w], depth[y:y + h, x:x + w] = fuse_tile(slices, x, y, w, h, margin, blur)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for done, _ in enumerate(executor.map(run, tiles), 1):
+            if progress is not None:
+                progress(done, len(tiles))
+    return fused, depth
@@ -0,0 +1,49 @@
+# Pixel formats a Frame can carry
+BGR8 = 'bgr8'
+RGB8 = 'rgb8'
+MONO8 = 'mono8'
+
+
+class Frame:
+    """A numpy image plus the metadata that travels with it through the pipeline.
+
+    The frame owns a reference to its buffer, so the pixels stay valid for as
+    long as any consumer holds the frame; pooled buffers are only recycled once
+    every Frame (and view) of them is gone. Consumers take views through
+    `bgr()`/`rgb()` instead of converting. `marks` holds the monotonic time at
+    each pipeline stage boundary (see processing.stats.STAGES).
+    """
+
+    __slots__ = ('image', 'timestamp', 'sequence', 'pixel_format', 'zoom', 'marks')
+
+    def __init__(self, image, timestamp=0.0, sequence=0, pixel_format=BGR8, zoom=1.0, marks=None):
+        self.image = image
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self.pixel_format = pixel_format
+        self.zoom = zoom
+        self.marks = marks
+
+    @property
+    def width(self):
+        return self.image.shape[1]
+
+    @property
+    def height(self):
+        return self.image.shape[0]
+
+    def bgr(self):
+        """BGR view of the pixels (no copy for colour frames)."""
+        if self.pixel_format == BGR8:
+            return self.image
+        if self.pixel_format == RGB8:
+            return self.image[..., ::-1]
+        raise ValueError(f"No BGR view for pixel format {self.pixel_format}")
+
+    def rgb(self):
+        """RGB view of the pixels (no copy for colour frames)."""
+        if self.pixel_format == RGB8:
+            return self.image
+        if self.pixel_format == BGR8:
+            return self.image[..., ::-1]
+        raise ValueError(f"No RGB view for pixel format {self.pixel_format}")
@@ -0,0 +1,24 @@
+from collections import namedtuple
+
+# What the view wants from the worker: a canvas in image coordinates
+# (0 = use the camera's native frame size) and the zoom it is shown at.
+DisplayGeometry = namedtuple('DisplayGeometry', ['canvas_width', 'canvas_height', 'zoom'])
+
+NATIVE_GEOMETRY = DisplayGeometry(0, 0, 1.0)
+
+
+def output_size(geometry, frame_width, frame_height):
+    """Size in screen pixels of the image the worker should emit."""
+    canvas_width = geometry.canvas_width or frame_width
+    canvas_height = geometry.canvas_height or frame_height
+    return max(1, round(canvas_width * geometry.zoom)), max(1, round(canvas_height * geometry.zoom))
+
+
+def letterbox_rect(frame_width, frame_height, out_width, out_height):
+    """(x, y, w, h) of the aspect-preserving fit of a frame inside the output."""
+    scale_factor = min(out_width / frame_width, out_height / frame_height)
+    new_width = max(1, int(frame_width * scale_factor))
+    new_height = max(1, int(frame_height * scale_factor))
+    start_x = (out_width - new_width) // 2
+    start_y = (out_height - new_height) // 2
+    return start_x, start_y, new_width, new_height
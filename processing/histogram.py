@@ -0,0 +1,75 @@
+import time
+
+import cv2
+import numpy as np
+
+from processing.buffer_pool import BufferPool
+
+# Curve colour per channel, in the RGB order of the rendered histogram image
+_CURVE_COLORS = {
+    'bgr': ((0, 0, 255), (0, 255, 0), (255, 0, 0)),
+    'rgb': ((255, 0, 0), (0, 255, 0), (0, 0, 255)),
+}
+
+
+class HistogramEngine:
+    """Throttled per-channel histogram, rendered to a small RGB image.
+
+    Counts are taken on every `stride`-th pixel in both directions, and `update`
+    only does work when `1 / rate_hz` seconds have passed since the last render.
+    Each channel curve is drawn with a single polyline call. The sample and the
+    rendered image live in reused buffers, so the returned image is only valid
+    until the next render.
+    """
+
+    def __init__(self, rate_hz=5.0, stride=4, width=256, height=200):
+        self.rate_hz = rate_hz
+        self.stride = stride
+        self.width = width
+        self.height = height
+        self._last_update = None
+        self._x = np.linspace(0, width - 1, 256).astype(np.int32)
+        self._buffers = BufferPool(depth=1)
+
+    def set_rate(self, rate_hz):
+        self.rate_hz = rate_hz
+
+    def set_stride(self, stride):
+        self.stride = max(1, int(stride))
+
+    def due(self, now=None):
+        if self.rate_hz <= 0:
+            return False
+        now = time.monotonic() if now is None else now
+        return self._last_update is None or now - self._last_update >= 1.0 / self.rate_hz
+
+    def compute(self, image):
+        """(channels, 256) float32 counts from a subsampled 8-bit image."""
+        # one gather into a compact copy; calcHist on a strided view copies once per channel
+        view = image[::self.stride, ::self.stride]
+        sample = self._buffers.get('sample', view.shape)
+        np.copyto(sample, view)
+        channels = 1 if sample.ndim == 2 else sample.shape[2]
+        hists = np.empty((channels, 256), dtype=np.float32)
+        for ch in range(channels):
+            hists[ch] = cv2.calcHist([sample], [ch], None, [256], [0, 256]).ravel()
+        return hists
+
+    def render(self, hists, order='bgr'):
+        hist_img = self._buffers.get('render', (self.height, self.width, 3))
+        hist_img[:] = 0
+        colors = _CURVE_COLORS[order]
+        for ch in range(hists.shape[0]):
+            curve = cv2.normalize(hists[ch], None, 0, self.height - 1, cv2.NORM_MINMAX).ravel()
+            pts = np.column_stack((self._x, self.height - 1 - curve.astype(np.int32)))
+            color = colors[ch] if hists.shape[0] == 3 else (255, 255, 255)
+            cv2.polylines(hist_img, [pts], False, color, 1)
+        return hist_img
+
+    def update(self, image, order='bgr', now=None, force=False):
+        """Rendered histogram if one is due (or forced), otherwise None."""
+        now = time.monotonic() if now is None else now
+        if not force and not self.due(now):
+            return None
+        self._last_update = now
+        return self.render(self.compute(image), order)
@@ -0,0 +1,264 @@
+import json
+
+import numpy as np
+
+# Image-space coordinates stored for each kind of measurement
+FIELDS = {
+    'line': ('x0', 'y0', 'x1', 'y1'),  # start, end
+    'circle': ('cx', 'cy', 'ex', 'ey'),  # center, a point on the edge
+    'angle': ('ax', 'ay', 'bx', 'by', 'cx', 'cy'),  # arms end at A and C, vertex at B
+}
+# Derived quantity reported for each kind, with its unit
+QUANTITIES = {'line': ('length', 'px'), 'circle': ('radius', 'px'), 'angle': ('angle', 'deg')}
+
+
+def measurement_dtype(kind):
+    return np.dtype([('id', np.int64)] + [(name, np.float64) for name in FIELDS[kind]])
+
+
+class MeasurementTable:
+    """Growable structured array holding one kind of measurement.
+
+    Rows carry a stable `id`, so they can be referenced (by the spatial index,
+    the selection, the redo stack) while other rows come and go. Storage
+    doubles when full, so appends are amortized O(1), and `rows` is a view of
+    the live rows that the vectorized functions below work on directly. Ids are
+    handed out densely, so an array indexed by id holds each row's position
+    (-1 once removed) and looking rows up by id costs O(1) per id.
+    """
+
+    def __init__(self, kind, capacity=64):
+        self.kind = kind
+        self.dtype = measurement_dtype(kind)
+        self.fields = FIELDS[kind]
+        self._data = np.zeros(capacity, dtype=self.dtype)
+        self.count = 0
+        self.next_id = 0
+        self._position = np.full(capacity, -1, dtype=np.int64)  # id -> row position
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def rows(self):
+        return self._data[:self.count]
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed > len(self._data):
+            grown = np.zeros(max(needed, 2 * len(self._data)), dtype=self.dtype)
+            grown[:self.count] = self.rows
+            self._data = grown
+
+    def _reserve_ids(self, extra):
+        needed = self.next_id + extra
+        if needed > len(self._position):
+            grown = np.full(max(needed, 2 * len(self._position)), -1, dtype=np.int64)
+            grown[:len(self._position)] = self._position
+            self._position = grown
+
+    def extend(self, coords):
+        """Append rows from an (n, len(fields)) array of coordinates; returns their ids."""
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, len(self.fields))
+        n = len(coords)
+        self._reserve(n)
+        self._reserve_ids(n)
+        new = self._data[self.count:self.count + n]
+        ids = np.arange(self.next_id, self.next_id + n, dtype=np.int64)
+        new['id'] = ids
+        for i, name in enumerate(self.fields):
+            new[name] = coords[:, i]
+        self._position[ids] = np.arange(self.count, self.count + n)
+        self.count += n
+        self.next_id += n
+        return ids
+
+    def append(self, coords):
+        """Append one row from a flat sequence of coordinates; returns its id."""
+        return int(self.extend([coords])[0])
+
+    def restore(self, record):
+        """Put back a row removed by pop(), keeping its id."""
+        self._reserve(1)
+        self._data[self.count] = record
+        self._position[record['id']] = self.count
+        self.count += 1
+
+    def pop(self):
+        """Remove and return the newest row (a copy), or None when empty."""
+        if not self.count:
+            return None
+        self.count -= 1
+        record = self._data[self.count].copy()
+        self._position[record['id']] = -1
+        return record
+
+    def positions(self, ids):
+        """Row positions of `ids`, in the order given (unknown ids are skipped)."""
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        ids = ids[(ids >= 0) & (ids < self.next_id)]
+        found = self._position[ids]
+        return found[found >= 0]
+
+    def take(self, ids):
+        return self.rows[self.positions(ids)]
+
+    def record(self, row_id):
+        """Copy of the row with `row_id`, or None."""
+        found = self.positions([row_id])
+        return self.rows[found[0]].copy() if len(found) else None
+
+    def set_point(self, row_id, index, x, y):
+        """Move point `index` of a row to (x, y)."""
+        found = self.positions([row_id])
+        if len(found):
+            row = self._data[found[0]]
+            row[self.fields[2 * index]] = x
+            row[self.fields[2 * index + 1]] = y
+
+    def remove(self, ids):
+        """Delete the rows with `ids`; returns how many were removed."""
+        doomed = np.unique(self.positions(ids))
+        if not len(doomed):
+            return 0
+        keep = np.ones(self.count, dtype=bool)
+        keep[doomed] = False
+        self._position[self.rows['id'][doomed]] = -1
+        kept = self.rows[keep]
+        self.count = len(kept)
+        self._data[:self.count] = kept
+        self._position[kept['id']] = np.arange(self.count)
+        return len(doomed)
+
+    def clear(self):
+        self._position[self.rows['id']] = -1
+        self.count = 0
+
+    def coords(self, rows=None):
+        """(n, len(fields)) float array of the coordinates of `rows` (default: all rows)."""
+        rows = self.rows if rows is None else rows
+        return np.column_stack([rows[name] for name in self.fields]) if len(rows) else \
+            np.empty((0, len(self.fields)))
+
+
+def line_lengths(rows):
+    return np.hypot(rows['x1'] - rows['x0'], rows['y1'] - rows['y0'])
+
+
+def circle_radii(rows):
+    return np.hypot(rows['ex'] - rows['cx'], rows['ey'] - rows['cy'])
+
+
+def angles_deg(rows):
+    """Angle ABC in degrees for every row; 0 where an arm has zero length."""
+    bax, bay = rows['ax'] - rows['bx'], rows['ay'] - rows['by']
+    bcx, bcy = rows['cx'] - rows['bx'], rows['cy'] - rows['by']
+    norms = np.hypot(bax, bay) * np.hypot(bcx, bcy)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosine = np.clip((bax * bcx + bay * bcy) / norms, -1.0, 1.0)
+    return np.where(norms > 0, np.degrees(np.arccos(cosine)), 0.0)
+
+
+def quantity(kind, rows):
+    """The reported quantity (see QUANTITIES) for every row, in one vectorized call."""
+    if kind == 'line':
+        return line_lengths(rows)
+    if kind == 'circle':
+        return circle_radii(rows)
+    return angles_deg(rows)
+
+
+def bounds(kind, rows):
+    """(n, 4) array of image-space boxes x0, y0, x1, y1."""
+    if kind == 'circle':
+        r = circle_radii(rows)
+        return np.column_stack([rows['cx'] - r, rows['cy'] - r, rows['cx'] + r, rows['cy'] + r])
+    names = FIELDS[kind]
+    xs = np.column_stack([rows[n] for n in names[0::2]])
+    ys = np.column_stack([rows[n] for n in names[1::2]])
+    return np.column_stack([xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)])
+
+
+def _segment_distances(ax, ay, bx, by, x, y):
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.where(length2 > 0, ((x - ax) * dx + (y - ay) * dy) / length2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(x - ax - t * dx, y - ay - t * dy)
+
+
+def distances(kind, rows, x, y):
+    """Distance from (x, y) to the outline of every row (0 inside a circle)."""
+    if kind == 'line':
+        return _segment_distances(rows['x0'], rows['y0'], rows['x1'], rows['y1'], x, y)
+    if kind == 'circle':
+        return np.maximum(0.0, np.hypot(x - rows['cx'], y - rows['cy']) - circle_radii(rows))
+    return np.minimum(_segment_distances(rows['bx'], rows['by'], rows['ax'], rows['ay'], x, y),
+                      _segment_distances(rows['bx'], rows['by'], rows['cx'], rows['cy'], x, y))
+
+
+def summarize(values, bins=10):
+    """count, mean, std, min, max and a `bins`-bin histogram of a 1-D array."""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {'count': 0}
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+    }
+
+
+def summarize_tables(tables, bins=10):
+    """Per-kind summaries of the reported quantity, keyed by kind."""
+    summaries = {}
+    for kind, table in tables.items():
+        name, unit = QUANTITIES[kind]
+        summary = summarize(quantity(kind, table.rows), bins)
+        summary.update(quantity=name, unit=unit)
+        summaries[kind] = summary
+    return summaries
+
+
+# CSV layout shared by all kinds: up to three points, then the reported value
+CSV_HEADER = "kind,id,x0,y0,x1,y1,x2,y2,value,unit"
+
+
+def export_csv(path, tables):
+    """Write every measurement to one CSV file; returns the number of rows.
+
+    Each kind is written as one block with np.savetxt, so the cost is a
+    formatted write per row and no per-item Python objects.
+    """
+    written = 0
+    with open(path, 'w', newline='') as f:
+        f.write(CSV_HEADER + "\n")
+        for kind, table in tables.items():
+            if not len(table):
+                continue
+            rows = table.rows
+            block = np.column_stack([rows['id'], table.coords(), quantity(kind, rows)])
+            points = len(table.fields) // 2
+            fmt = (f"{kind},%d," + ",".join(["%.3f"] * (2 * points)) + "," * (2 * (3 - points))
+                   + f",%.4f,{QUANTITIES[kind][1]}")
+            np.savetxt(f, block, fmt=fmt)
+            written += len(rows)
+    return written
+
+
+def export_json(path, tables, bins=10):
+    """Write the measurements column-wise plus their summaries to JSON; returns the number of rows."""
+    data = {'summary': summarize_tables(tables, bins), 'measurements': {}}
+    for kind, table in tables.items():
+        rows = table.rows
+        columns = {name: rows[name].tolist() for name in ('id',) + table.fields}
+        columns[QUANTITIES[kind][0]] = quantity(kind, rows).tolist()
+        data['measurements'][kind] = columns
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return sum(len(table) for table in tables.values())
@@ -0,0 +1,280 @@
+import json
+import os
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+TILE_SIZE = 1024
+THUMB_SIZE = 64  # overview pixels per canvas tile
+
+
+def overlap_score(reference, image, ox, oy, min_overlap=0.05):
+    """Normalized cross-correlation of the overlap when `image`'s origin sits at (ox, oy) in `reference`.
+
+    Returns -1 when the overlap is smaller than `min_overlap` of the frame.
+    """
+    h, w = reference.shape[:2]
+    x0, y0, x1, y1 = max(0, ox), max(0, oy), min(w, w + ox), min(h, h + oy)
+    if (x1 - x0) * (y1 - y0) < min_overlap * w * h or x1 - x0 < 8 or y1 - y0 < 8:
+        return -1.0
+    ref_part = reference[y0:y1, x0:x1]
+    img_part = image[y0 - oy:y1 - oy, x0 - ox:x1 - ox]
+    return float(cv2.matchTemplate(ref_part, img_part, cv2.TM_CCOEFF_NORMED)[0, 0])
+
+
+def phase_offset(reference, image):
+    """(ox, oy, score): where `image`'s origin lies in `reference`'s frame (same-size float32 grays).
+
+    Phase correlation only knows the shift modulo the frame size, and the
+    overlap between neighbouring fields is usually small, so each
+    wrap-around reading of the peak is checked by correlating the overlap it
+    implies, and the best one wins. The offsets keep the subpixel part of
+    the peak; only the overlap check uses whole pixels.
+    """
+    h, w = reference.shape[:2]
+    (dx, dy), _ = cv2.phaseCorrelate(reference, image)
+    best = (0.0, 0.0, -1.0)
+    for ox in {-dx, -dx + w, -dx - w, dx, dx - w, dx + w}:
+        for oy in {-dy, -dy + h, -dy - h, dy, dy - h, dy + h}:
+            if abs(ox) >= w or abs(oy) >= h:
+                continue
+            score = overlap_score(reference, image, int(round(ox)), int(round(oy)))
+            if score > best[2]:
+                best = (ox, oy, score)
+    return best
+
+
+def gray_float(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return gray.astype(np.float32)
+
+
+class TileStore:
+    """A canvas of unbounded extent stored as fixed-size .npy tiles on disk.
+
+    Tiles are created on first write and memory-mapped while in use; at most
+    `max_open` stay mapped, least recently used first out, so memory stays
+    flat however large the canvas grows.
+    """
+
+    def __init__(self, directory, channels=3, tile_size=TILE_SIZE, max_open=16):
+        self.directory = directory
+        self.channels = channels
+        self.tile_size = tile_size
+        self.max_open = max_open
+        self.tiles = set()
+        self._open = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def tile_shape(self):
+        shape = (self.tile_size, self.tile_size)
+        return shape + (self.channels,) if self.channels > 1 else shape
+
+    def path(self, key):
+        return os.path.join(self.directory, f"tile_{key[0]}_{key[1]}.npy")
+
+    def tile(self, key, create=True):
+        tile = self._open.get(key)
+        if tile is not None:
+            self._open.move_to_end(key)
+            return tile
+        if key in self.tiles:
+            tile = np.load(self.path(key), mmap_mode='r+')
+        elif create:
+            tile = np.lib.format.open_memmap(self.path(key), mode='w+', dtype=np.uint8, shape=self.tile_shape())
+            self.tiles.add(key)
+        else:
+            return None
+        self._open[key] = tile
+        while len(self._open) > self.max_open:
+            _, old = self._open.popitem(last=False)
+            old.flush()
+        return tile
+
+    def write(self, image, x, y):
+        """Paste `image` with its top-left corner at canvas (x, y); returns the tile keys touched."""
+        h, w = image.shape[:2]
+        ts = self.tile_size
+        touched = []
+        for ty in range(y // ts, (y + h - 1) // ts + 1):
+            for tx in range(x // ts, (x + w - 1) // ts + 1):
+                # overlap of the image with this tile, in canvas coordinates
+                cx0, cy0 = max(x, tx * ts), max(y, ty * ts)
+                cx1, cy1 = min(x + w, (tx + 1) * ts), min(y + h, (ty + 1) * ts)
+                tile = self.tile((tx, ty))
+                tile[cy0 - ty * ts:cy1 - ty * ts, cx0 - tx * ts:cx1 - tx * ts] = image[cy0 - y:cy1 - y, cx0 - x:cx1 - x]
+                touched.append((tx, ty))
+        return touched
+
+    def read(self, x, y, w, h):
+        """Canvas pixels in the rectangle at (x, y); parts never written are zero."""
+        ts = self.tile_size
+        out = np.zeros((h, w) + self.tile_shape()[2:], dtype=np.uint8)
+        for ty in range(y // ts, (y + h - 1) // ts + 1):
+            for tx in range(x // ts, (x + w - 1) // ts + 1):
+                tile = self.tile((tx, ty), create=False)
+                if tile is None:
+                    continue
+                cx0, cy0 = max(x, tx * ts), max(y, ty * ts)
+                cx1, cy1 = min(x + w, (tx + 1) * ts), min(y + h, (ty + 1) * ts)
+                out[cy0 - y:cy1 - y, cx0 - x:cx1 - x] = tile[cy0 - ty * ts:cy1 - ty * ts, cx0 - tx * ts:cx1 - tx * ts]
+        return out
+
+    def flush(self):
+        for tile in self._open.values():
+            tile.flush()
+
+
+class Mosaic:
+    """Incremental slide mosaic built from overlapping fields of view.
+
+    Each new field is registered by phase correlation on downsampled grayscale
+    copies (`registration_scale`), first against the previous field and then,
+    if that overlap is too weak, against the placed fields nearest to it. The
+    match with the best overlap correlation (at least `min_response`) gives a
+    coarse position, which is refined by a second phase correlation at full
+    resolution over the overlap strip with the canvas, so placement errors
+    stay under a pixel and do not add up along a chain of fields. The field
+    is then written into a
+    disk-backed TileStore (newest field wins where fields overlap). A small
+    in-RAM overview with THUMB_SIZE pixels per tile is kept up to date for
+    display. Field positions are saved to fields.json after every field.
+    """
+
+    def __init__(self, directory, registration_scale=0.25, min_response=0.3, tile_size=TILE_SIZE):
+        self.directory = directory
+        self.registration_scale = registration_scale
+        self.min_response = min_response
+        self.tile_size = tile_size
+        self.store = None
+        self.fields = []  # dicts: x, y, w, h, response
+        self._small = []  # downsampled float32 grays used for registration
+        self.thumbs = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _registration_copy(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small = cv2.resize(gray, None, fx=self.registration_scale, fy=self.registration_scale,
+                           interpolation=cv2.INTER_AREA)
+        return small.astype(np.float32)
+
+    def _candidates(self):
+        """Placed fields to try, most recent first, then the others nearest to it."""
+        last = len(self.fields) - 1
+        lx, ly = self.fields[last]['x'], self.fields[last]['y']
+        others = sorted(range(last), key=lambda i: abs(self.fields[i]['x'] - lx) + abs(self.fields[i]['y'] - ly))
+        return [last] + others[:8]
+
+    def register(self, small):
+        """Best coarse (x, y, response, field index) for a new field's registration copy, or None.
+
+        x and y are full-resolution canvas coordinates, still fractional.
+        """
+        best = None
+        for i in self._candidates():
+            if self._small[i].shape != small.shape:
+                continue
+            ox, oy, response = phase_offset(self._small[i], small)
+            if best is None or response > best[2]:
+                x = self.fields[i]['x'] + ox / self.registration_scale
+                y = self.fields[i]['y'] + oy / self.registration_scale
+                best = (x, y, response, i)
+            if response >= 2 * self.min_response:
+                break  # the newest neighbour is already a clear match
+        if best is None or best[2] < self.min_response:
+            return None
+        return best
+
+    def refine(self, image, x, y, field, min_strip=32):
+        """Full-resolution (x, y) from a coarse position, by phase correlation over the overlap
+        with `field` on the canvas. Keeps the coarse position if the strip is too small or the
+        correction is not plausible."""
+        xi, yi = int(round(x)), int(round(y))
+        h, w = image.shape[:2]
+        x0, y0 = max(xi, field['x']), max(yi, field['y'])
+        x1, y1 = min(xi + w, field['x'] + field['w']), min(yi + h, field['y'] + field['h'])
+        if x1 - x0 < min_strip or y1 - y0 < min_strip:
+            return x, y
+        reference = gray_float(self.store.read(x0, y0, x1 - x0, y1 - y0))
+        strip = gray_float(image[y0 - yi:y1 - yi, x0 - xi:x1 - xi])
+        window = cv2.createHanningWindow((x1 - x0, y1 - y0), cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(reference, strip, window)
+        # the strip is the canvas moved by minus the residual placement error
+        limit = 2.0 / self.registration_scale
+        if response < self.min_response or abs(dx) > limit or abs(dy) > limit:
+            return x, y
+        return xi - dx, yi - dy
+
+    def add(self, image):
+        """Register and place a field; returns its field dict, or None if it could not be placed."""
+        small = self._registration_copy(image)
+        if not self.fields:
+            x, y, response = 0, 0, 1.0
+            channels = 1 if image.ndim == 2 else image.shape[2]
+            self.store = TileStore(os.path.join(self.directory, "tiles"), channels, self.tile_size)
+        else:
+            placed = self.register(small)
+            if placed is None:
+                return None
+            x, y, response, i = placed
+            x, y = self.refine(image, x, y, self.fields[i])
+            x, y = int(round(x)), int(round(y))
+
+        touched = self.store.write(image, x, y)
+        self.store.flush()
+        for key in touched:
+            tile = self.store.tile(key)
+            self.thumbs[key] = cv2.resize(np.asarray(tile), (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA)
+
+        field = {'x': x, 'y': y, 'w': image.shape[1], 'h': image.shape[0], 'response': round(float(response), 4)}
+        self.fields.append(field)
+        self._small.append(small)
+        self.save_index()
+        return field
+
+    def bounds(self):
+        """(x0, y0, x1, y1) canvas extent covered by fields."""
+        if not self.fields:
+            return 0, 0, 0, 0
+        return (min(f['x'] for f in self.fields), min(f['y'] for f in self.fields),
+                max(f['x'] + f['w'] for f in self.fields), max(f['y'] + f['h'] for f in self.fields))
+
+    def overview(self):
+        """Thumbnail of the whole mosaic assembled from the per-tile thumbs (None while empty)."""
+        if not self.thumbs:
+            return None
+        keys = list(self.thumbs)
+        tx0, ty0 = min(k[0] for k in keys), min(k[1] for k in keys)
+        tx1, ty1 = max(k[0] for k in keys), max(k[1] for k in keys)
+        sample = next(iter(self.thumbs.values()))
+        overview = np.zeros(((ty1 - ty0 + 1) * THUMB_SIZE, (tx1 - tx0 + 1) * THUMB_SIZE) + sample.shape[2:],
+                            dtype=np.uint8)
+        for (tx, ty), thumb in self.thumbs.items():
+            oy, ox = (ty - ty0) * THUMB_SIZE, (tx - tx0) * THUMB_SIZE
+            overview[oy:oy + THUMB_SIZE, ox:ox + THUMB_SIZE] = thumb
+        return overview
+
+    def save_index(self):
+        with open(os.path.join(self.directory, "fields.json"), 'w') as f:
+            json.dump({'tile_size': self.tile_size, 'bounds': self.bounds(), 'fields': self.fields}, f, indent=1)
+
+    def export(self, path):
+        """Write the full mosaic to one image file, assembled through a disk-backed buffer."""
+        x0, y0, x1, y1 = self.bounds()
+        ts = self.tile_size
+        shape = (y1 - y0, x1 - x0) + self.store.tile_shape()[2:]
+        scratch = os.path.join(self.directory, "export.npy")
+        canvas = np.lib.format.open_memmap(scratch, mode='w+', dtype=np.uint8, shape=shape)
+        for key in sorted(self.store.tiles):
+            tx, ty = key
+            cx0, cy0 = max(x0, tx * ts), max(y0, ty * ts)
+            cx1, cy1 = min(x1, (tx + 1) * ts), min(y1, (ty + 1) * ts)
+            if cx1 <= cx0 or cy1 <= cy0:
+                continue
+            tile = self.store.tile(key)
+            canvas[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0] = tile[cy0 - ty * ts:cy1 - ty * ts, cx0 - tx * ts:cx1 - tx * ts]
+        ok = cv2.imwrite(path, canvas)
+        del canvas
+        os.remove(scratch)
+        return ok
@@ -0,0 +1,155 @@
+import cv2
+import numpy as np
+
+# Detection methods
+CONTOURS = 'contours'  # Otsu threshold, then outer contours
+HOUGH = 'hough'  # Hough gradient circles on the blurred gray image
+
+# Object polarity against the background
+DARK = 'dark'
+BRIGHT = 'bright'
+AUTO = 'auto'  # objects are whichever class covers less of the frame
+
+DETECTION_WIDTH = 1024  # coarse pass runs at about this width
+
+
+class ParticleDetector:
+    """Finds round objects (particles, cells) in a frame.
+
+    A coarse pass runs on a copy downsampled to about DETECTION_WIDTH pixels
+    wide (never so far that the smallest object drops below 2 pixels of
+    radius). Each candidate is then refined at full resolution inside a small
+    ROI around it: the object is re-thresholded there and its centroid,
+    equivalent radius and circularity (4*pi*area / perimeter^2) come from the
+    full-resolution contour. Radii are in full-resolution pixels.
+
+    Results are an (n, 4) float array of x, y, radius, circularity.
+    """
+
+    def __init__(self, min_radius=3.0, max_radius=200.0, min_circularity=0.7, method=CONTOURS, polarity=AUTO):
+        if not 0 < min_radius <= max_radius:
+            raise ValueError(f"Invalid radius range: {min_radius} - {max_radius}")
+        self.min_radius = min_radius
+        self.max_radius = max_radius
+        self.min_circularity = min_circularity
+        self.method = method
+        self.polarity = polarity
+
+    def detection_scale(self, width):
+        scale = min(1.0, DETECTION_WIDTH / width)
+        return min(1.0, max(scale, 2.0 / max(self.min_radius, 1e-3)))
+
+    def detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        scale = self.detection_scale(gray.shape[1])
+        small = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+
+        threshold, mask = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        bright = self.bright_objects(mask)
+        if not bright:
+            cv2.bitwise_not(mask, mask)
+
+        if self.method == HOUGH:
+            candidates = self.hough_candidates(small, scale)
+        else:
+            candidates = self.contour_candidates(mask, scale)
+            if scale == 1.0:
+                return self.filtered(candidates)  # the coarse pass already ran at full resolution
+
+        particles = []
+        for x, y, r, *_ in candidates:
+            refined = self.refine(gray, x, y, r, threshold, bright)
+            if refined is not None:
+                particles.append(refined)
+        return self.filtered(particles)
+
+    def bright_objects(self, mask):
+        if self.polarity == AUTO:
+            return cv2.countNonZero(mask) < mask.size / 2
+        return self.polarity == BRIGHT
+
+    @staticmethod
+    def object_mask(roi, threshold, bright):
+        mode = cv2.THRESH_BINARY if bright else cv2.THRESH_BINARY_INV
+        return cv2.threshold(cv2.GaussianBlur(roi, (5, 5), 0), threshold, 255, mode)[1]
+
+    def contour_candidates(self, mask, scale):
+        """(x, y, r, circularity) in full-resolution pixels for each outer contour of a plausible size."""
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        candidates = []
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            radius = np.sqrt(area / np.pi) / scale
+            # loose bounds here; the refined size is filtered exactly
+            if radius < 0.5 * self.min_radius or radius > 1.5 * self.max_radius:
+                continue
+            m = cv2.moments(contour)
+            if m['m00'] == 0:
+                continue
+            candidates.append((m['m10'] / m['m00'] / scale, m['m01'] / m['m00'] / scale, radius,
+                               self.circularity(area, cv2.arcLength(contour, True))))
+        return candidates
+
+    def hough_candidates(self, small, scale):
+        min_r = max(1, int(self.min_radius * scale))
+        max_r = max(min_r + 1, int(np.ceil(self.max_radius * scale)))
+        circles = cv2.HoughCircles(small, cv2.HOUGH_GRADIENT, dp=1.5, minDist=max(2, 2 * min_r),
+                                   param1=100, param2=20, minRadius=min_r, maxRadius=max_r)
+        if circles is None:
+            return []
+        return [(x / scale, y / scale, r / scale) for x, y, r in circles[0]]
+
+    @staticmethod
+    def circularity(area, perimeter):
+        return 4 * np.pi * area / (perimeter * perimeter) if perimeter > 0 else 0.0
+
+    def refine(self, gray, x, y, r, threshold, bright):
+        """Centroid, radius and circularity of the object at (x, y) from a full-resolution ROI, or None."""
+        height, width = gray.shape[:2]
+        half = int(r * 1.5) + 4
+        x0, y0 = max(0, int(x) - half), max(0, int(y) - half)
+        x1, y1 = min(width, int(x) + half + 1), min(height, int(y) + half + 1)
+        if x1 - x0 < 3 or y1 - y0 < 3:
+            return None
+        mask = self.object_mask(gray[y0:y1, x0:x1], threshold, bright)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        # the contour that contains the coarse center, else the largest one
+        best = None
+        cx, cy = x - x0, y - y0
+        for contour in contours:
+            inside = cv2.pointPolygonTest(contour, (float(cx), float(cy)), False) >= 0
+            area = cv2.contourArea(contour)
+            if best is None or (inside, area) > best[0]:
+                best = ((inside, area), contour)
+        if best is None:
+            return None
+        contour = best[1]
+        area = cv2.contourArea(contour)
+        m = cv2.moments(contour)
+        if m['m00'] == 0:
+            return None
+        return (x0 + m['m10'] / m['m00'], y0 + m['m01'] / m['m00'], np.sqrt(area / np.pi),
+                self.circularity(area, cv2.arcLength(contour, True)))
+
+    def filtered(self, particles):
+        if not particles:
+            return np.empty((0, 4))
+        particles = np.array(particles, dtype=np.float64)
+        keep = ((particles[:, 2] >= self.min_radius) & (particles[:, 2] <= self.max_radius)
+                & (particles[:, 3] >= self.min_circularity))
+        particles = particles[keep]
+        # a refinement can land two candidates on the same object; keep the first. Distinct
+        # objects are at least two minimum radii apart, so one grid step of min_radius is safe
+        if len(particles) > 1:
+            cells = np.round(particles[:, :2] / max(self.min_radius, 1.0)).astype(np.int64)
+            _, unique = np.unique(cells, axis=0, return_index=True)
+            particles = particles[np.sort(unique)]
+        return particles
+
+
+def circle_coords(particles):
+    """Rows for the circle measurement table (center, then a point on the edge) from detections."""
+    x, y, r = particles[:, 0], particles[:, 1], particles[:, 2]
+    return np.column_stack([x, y, x + r, y])
@@ -0,0 +1,51 @@
+from collections import namedtuple
+
+import cv2
+
+from processing.awb import AwbController
+from processing.tone import ToneMapper
+
+PipelineSettings = namedtuple('PipelineSettings', [
+    'brightness', 'contrast', 'exposure', 'auto_awb', 'grayscale', 'flip'])
+PipelineSettings.__new__.__defaults__ = (50, 50, 50, False, False, False)
+
+
+def apply_grayscale(image, gray=None):
+    """Replace a BGR image's colour with its luma, in place. `gray` is an optional scratch buffer."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
+    cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=image)
+    return image
+
+
+class Pipeline:
+    """Tone -> flip -> white balance -> grayscale on full frames, as in the live view.
+
+    For stills (no previous frames to smooth against) white balance gains are
+    estimated from each image on its own.
+    """
+
+    def __init__(self, settings=PipelineSettings()):
+        self.settings = settings
+        self.tone = ToneMapper(settings.brightness, settings.contrast, settings.exposure)
+        self.awb = AwbController()
+
+    def process(self, image, cancelled=None):
+        """Processed BGR copy of `image` (None if `cancelled()` turned true between stages)."""
+        settings = self.settings
+        out = self.tone.apply(image)
+        if settings.flip:
+            cv2.flip(out, 1, dst=out)
+        if cancelled is not None and cancelled():
+            return None
+
+        if settings.auto_awb:
+            gains = self.awb.estimate(out)
+            if gains is not None:
+                self.awb.set_gains(gains)
+                self.awb.apply(out, dst=out)
+            if cancelled is not None and cancelled():
+                return None
+
+        if settings.grayscale:
+            apply_grayscale(out)
+        return out
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+# What submit() does when the queue is full
+BLOCK = 'block'
+DROP_OLDEST = 'drop-oldest'
+DROP_NEWEST = 'drop-newest'
+
+RecordingSummary = namedtuple('RecordingSummary', [
+    'path', 'frames_written', 'frames_dropped', 'fps', 'avg_encode_ms', 'duration_s'])
+
+
+def estimate_fps(timestamps, fallback=30.0):
+    """Frame rate from monotonic capture timestamps (median interval, robust to hiccups)."""
+    if len(timestamps) < 2:
+        return fallback
+    intervals = np.diff(np.asarray(timestamps, dtype=np.float64))
+    intervals = intervals[intervals > 0]
+    if intervals.size == 0:
+        return fallback
+    return float(1.0 / np.median(intervals))
+
+
+class VideoRecorder(threading.Thread):
+    """Encodes frames to a video file on its own thread.
+
+    Producers call `submit` with a BGR frame and its capture timestamp; the frame
+    is copied into one of the recorder's own buffers and queued. The queue is
+    bounded and `overflow` decides what happens when the encoder falls behind:
+    BLOCK waits for room, DROP_OLDEST discards the oldest queued frame and
+    DROP_NEWEST discards the incoming one.
+
+    The writer is opened lazily once `warmup_frames` frames are queued, so the
+    container frame rate comes from the measured timestamps instead of a guess.
+
+    `on_finished(summary)`, if set, is called from the recorder thread once the
+    file is closed, so a GUI can stop a recording without waiting for the
+    queue to drain.
+    """
+
+    def __init__(self, path, max_queue=64, overflow=DROP_OLDEST, fourcc='mp4v', fps=None, warmup_frames=15):
+        super().__init__(daemon=True)
+        if overflow not in (BLOCK, DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.path = path
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.fourcc = fourcc
+        self.fps = fps
+        self.warmup_frames = min(warmup_frames, max_queue)
+
+        self._queue = deque()
+        self._free = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._writer = None
+        self._frame_size = None
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._encode_time = 0.0
+        self._first_timestamp = None
+        self._last_timestamp = None
+        self.summary = None
+        self.on_finished = None
+
+    def submit(self, image, timestamp):
+        """Queue a copy of `image`. Returns False if the frame was dropped."""
+        with self._cond:
+            if self._stopping:
+                return False
+            self.frames_submitted += 1
+
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == DROP_NEWEST:
+                    self.frames_dropped += 1
+                    return False
+                if self.overflow == DROP_OLDEST:
+                    old, _ = self._queue.popleft()
+                    self._free.append(old)
+                    self.frames_dropped += 1
+                else:
+                    while len(self._queue) >= self.max_queue and not self._stopping:
+                        self._cond.wait()
+                    if self._stopping:
+                        return False
+
+            buf = self._free.pop() if self._free else None
+
+        # copy outside the lock so the encoder thread is never held up by it
+        if buf is None or buf.shape != image.shape:
+            buf = image.copy()
+        else:
+            np.copyto(buf, image)
+
+        with self._cond:
+            self._queue.append((buf, timestamp))
+            self._cond.notify_all()
+        return True
+
+    def queue_depth(self):
+        return len(self._queue)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue and self._stopping:
+                    break
+                if self._writer is None and not self._stopping and len(self._queue) < self.warmup_frames:
+                    # wait for enough timestamps to measure the real frame rate
+                    self._cond.wait(0.1)
+                    continue
+                if self._writer is None:
+                    self._open_writer([ts for _, ts in self._queue])
+                image, timestamp = self._queue.popleft()
+                self._cond.notify_all()
+
+            self._write(image, timestamp)
+
+            with self._cond:
+                self._free.append(image)
+
+        if self._writer is not None:
+            self._writer.release()
+        self.summary = self._summarize()
+        if self.on_finished is not None:
+            self.on_finished(self.summary)
+
+    def stop(self, wait=True):
+        """Flush queued frames, close the file and return a RecordingSummary.
+
+        With wait=False this only asks the thread to finish and returns None;
+        the summary arrives through on_finished.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if not wait:
+            return None
+        if self.is_alive():
+            self.join()
+        return self.summary or self._summarize()
+
+    def _open_writer(self, timestamps):
+        if self.fps is None:
+            self.fps = estimate_fps(timestamps)
+        height, width = self._queue[0][0].shape[:2]
+        self._frame_size = (width, height)
+        self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self._frame_size)
+
+    def _write(self, image, timestamp):
+        if (image.shape[1], image.shape[0]) != self._frame_size:
+            image = cv2.resize(image, self._frame_size, interpolation=cv2.INTER_AREA)
+        start = time.perf_counter()
+        self._writer.write(image)
+        self._encode_time += time.perf_counter() - start
+        self.frames_written += 1
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+        self._last_timestamp = timestamp
+
+    def _summarize(self):
+        avg_encode_ms = 1000.0 * self._encode_time / self.frames_written if self.frames_written else 0.0
+        duration = self._last_timestamp - self._first_timestamp if self.frames_written > 1 else 0.0
+        return RecordingSummary(self.path, self.frames_written, self.frames_dropped,
+                                self.fps or 0.0, avg_encode_ms, duration)
@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# cv2.imwrite parameters per file extension
+ENCODE_PARAMS = {
+    '.jpg': [cv2.IMWRITE_JPEG_QUALITY, 95],
+    '.jpeg': [cv2.IMWRITE_JPEG_QUALITY, 95],
+    '.png': [cv2.IMWRITE_PNG_COMPRESSION, 1],  # fast; level 9 is several times slower for a few % smaller files
+}
+
+
+class SnapshotSaver:
+    """Encodes and writes images on a small thread pool.
+
+    `save` returns immediately. Jobs are queued without limit, so a burst of
+    requests is never dropped, only delayed. `on_done(path, ok, elapsed_s)` is
+    called from a pool thread when each file has been written. A `.npy` path
+    stores the raw array instead of encoding an image.
+    """
+
+    def __init__(self, max_workers=2, on_done=None):
+        self.on_done = on_done
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='snapshot')
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def save(self, image, path):
+        """Queue `image` (which must not be modified afterwards) to be written to `path`."""
+        with self._lock:
+            self.pending += 1
+        return self._executor.submit(self._write, image, path)
+
+    def _write(self, image, path):
+        start = time.perf_counter()
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            if extension == '.npy':
+                np.save(path, image)
+                ok = True
+            else:
+                ok = cv2.imwrite(path, image, ENCODE_PARAMS.get(extension, []))
+        except (cv2.error, OSError) as e:
+            print(f"Failed to save {path}: {e}")
+            ok = False
+        with self._lock:
+            self.pending -= 1
+        if self.on_done is not None:
+            self.on_done(path, ok, time.perf_counter() - start)
+        return ok
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs; by default waits until every queued file is written."""
+        self._executor.shutdown(wait=wait)
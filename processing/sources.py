@@ -0,0 +1,323 @@
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from processing.frame import BGR8, MONO8
+
+NO_FRAME = None  # read() result: no frame yet, try again
+
+
+class FrameSource:
+    """Where frames come from. Backends deliver BGR8 or MONO8 images.
+
+    `read(image)` returns (ok, image, timestamp) where timestamp is the host
+    time.monotonic() of acquisition, and may fill `image` in place when its
+    shape matches. ok is NO_FRAME when nothing arrived this time (a grab
+    timeout or a failed grab) and the caller should simply read again; False
+    means the source has ended or failed for good. `pixel_format` is the format of the images read() returns,
+    so later stages can skip conversions that would do nothing (for example
+    white balance and grayscale on a mono sensor).
+    """
+
+    pixel_format = BGR8
+    width = 0
+    height = 0
+    fps = 0.0
+
+    def open(self):
+        return True
+
+    def read(self, image=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def describe(self):
+        return f"{type(self).__name__} {self.width}x{self.height} {self.pixel_format}"
+
+
+class OpenCVSource(FrameSource):
+    """A camera opened through cv2.VideoCapture (UVC webcams, most USB cameras)."""
+
+    def __init__(self, index=0, width=None, height=None, fps=None):
+        self.index = index
+        self.requested = (width, height, fps)
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            return False
+        width, height, fps = self.requested
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        return True
+
+    def read(self, image=None):
+        ret, image = self.cap.read(image)
+        return ret, image, time.monotonic()
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class PylonSource(FrameSource):
+    """A Basler camera through pypylon (optional dependency, imported on open)."""
+
+    def __init__(self, serial=None, width=None, height=None, fps=None, timeout_ms=1000):
+        self.serial = serial
+        self.requested = (width, height, fps)
+        self.timeout_ms = timeout_ms
+        self.camera = None
+        self.converter = None
+
+    def open(self):
+        try:
+            from pypylon import pylon
+        except ImportError:
+            print("pypylon is not installed")
+            return False
+        self.pylon = pylon
+
+        factory = pylon.TlFactory.GetInstance()
+        if self.serial:
+            info = pylon.DeviceInfo()
+            info.SetSerialNumber(str(self.serial))
+            device = factory.CreateDevice(info)
+        else:
+            device = factory.CreateFirstDevice()
+        self.camera = pylon.InstantCamera(device)
+        self.camera.Open()
+
+        width, height, fps = self.requested
+        if width and height:
+            self.camera.Width.Value = width
+            self.camera.Height.Value = height
+        if fps:
+            self.camera.AcquisitionFrameRateEnable.Value = True
+            self.camera.AcquisitionFrameRate.Value = float(fps)
+
+        self.width = self.camera.Width.Value
+        self.height = self.camera.Height.Value
+        self.fps = float(self.camera.ResultingFrameRate.Value) if hasattr(self.camera, 'ResultingFrameRate') else 0.0
+
+        # Mono sensors are passed through untouched; everything else is converted to BGR once here
+        if self.camera.PixelFormat.Value == "Mono8":
+            self.pixel_format = MONO8
+        else:
+            self.pixel_format = BGR8
+            self.converter = pylon.ImageFormatConverter()
+            self.converter.OutputPixelFormat = pylon.PixelType_BGR8packed
+            self.converter.OutputBitAlignment = pylon.OutputBitAlignment_MsbAligned
+
+        # latest image only: a slow consumer never works through a backlog
+        self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+        return True
+
+    def read(self, image=None):
+        if self.camera.IsCameraDeviceRemoved() or not self.camera.IsGrabbing():
+            return False, image, time.monotonic()
+        grab = self.camera.RetrieveResult(self.timeout_ms, self.pylon.TimeoutHandling_Return)
+        if grab is None or not grab.IsValid():
+            return NO_FRAME, image, time.monotonic()  # timed out; the camera may just be slow (long exposure)
+        try:
+            if not grab.GrabSucceeded():
+                return NO_FRAME, image, time.monotonic()  # one incomplete frame, not the end of the stream
+            timestamp = time.monotonic()
+            data = self.converter.Convert(grab).GetArray() if self.converter else grab.GetArray()
+            if image is not None and image.shape == data.shape:
+                np.copyto(image, data)
+            else:
+                image = data.copy()  # the grab buffer goes back to the driver on Release()
+            return True, image, timestamp
+        finally:
+            grab.Release()
+
+    def close(self):
+        if self.camera is not None:
+            self.camera.StopGrabbing()
+            self.camera.Close()
+            self.camera = None
+
+
+class FileSource(FrameSource):
+    """A video file, or an image sequence given as a directory or glob, played at `fps`."""
+
+    IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+    def __init__(self, path, fps=None, loop=True, realtime=True):
+        self.path = path
+        self.requested_fps = fps
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = None
+        self.files = None
+        self.position = 0
+        self._next_time = None
+
+    def open(self):
+        if os.path.isdir(self.path) or any(ch in self.path for ch in "*?["):
+            pattern = os.path.join(self.path, "*") if os.path.isdir(self.path) else self.path
+            self.files = sorted(p for p in glob.glob(pattern) if p.lower().endswith(self.IMAGE_EXTENSIONS))
+            if not self.files:
+                return False
+            first = cv2.imread(self.files[0], cv2.IMREAD_UNCHANGED)
+            if first is None:
+                return False
+            self.fps = self.requested_fps or 10.0
+        else:
+            self.cap = cv2.VideoCapture(self.path)
+            if not self.cap.isOpened():
+                return False
+            ok, first = self.cap.read()
+            if not ok:
+                return False
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.fps = self.requested_fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        self.height, self.width = first.shape[:2]
+        self.pixel_format = MONO8 if first.ndim == 2 else BGR8
+        return True
+
+    def read(self, image=None):
+        self._pace()
+        if self.files is not None:
+            if self.position >= len(self.files):
+                if not self.loop:
+                    return False, image, time.monotonic()
+                self.position = 0
+            flags = cv2.IMREAD_GRAYSCALE if self.pixel_format == MONO8 else cv2.IMREAD_COLOR
+            image = cv2.imread(self.files[self.position], flags)
+            self.position += 1
+            return image is not None, image, time.monotonic()
+
+        ret, image = self.cap.read(image)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, image = self.cap.read(image)
+        if ret and self.pixel_format == MONO8 and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return ret, image, time.monotonic()
+
+    def _pace(self):
+        # play back at the file's frame rate against a monotonic clock
+        if not self.realtime or not self.fps:
+            return
+        now = time.monotonic()
+        if self._next_time is None or now - self._next_time > 1.0:
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += 1.0 / self.fps
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class SyntheticSource(FrameSource):
+    """Moving test pattern at a configurable resolution and frame rate; no hardware needed."""
+
+    PATTERNS = ("gradient", "bars", "noise")
+
+    def __init__(self, width=1920, height=1080, fps=30.0, pattern="gradient", mono=False, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pattern = pattern
+        self.pixel_format = MONO8 if mono else BGR8
+        self.seed = seed
+        self.frame_index = 0
+        self._tile = None
+        self._next_time = None
+
+    def open(self):
+        if self.pattern not in self.PATTERNS:
+            print(f"Unknown synthetic pattern: {self.pattern}")
+            return False
+        # Twice as wide as a frame so each frame is one horizontally scrolled slice (a single copy)
+        w, h = self.width, self.height
+        x = np.arange(2 * w, dtype=np.float32)
+        y = np.arange(h, dtype=np.float32)[:, None]
+        if self.pattern == "gradient":
+            base = np.stack([np.broadcast_to((x % w) / w * 255, (h, 2 * w)),
+                             np.broadcast_to(y / h * 255, (h, 2 * w)),
+                             np.broadcast_to(((x % w) / w + y / h) * 127.5, (h, 2 * w))], axis=-1)
+        elif self.pattern == "bars":
+            bar = ((x // max(1, w // 8)) % 8).astype(np.int32)
+            colors = np.array([[255, 255, 255], [0, 255, 255], [255, 255, 0], [0, 255, 0],
+                               [255, 0, 255], [0, 0, 255], [255, 0, 0], [0, 0, 0]], dtype=np.float32)
+            base = np.broadcast_to(colors[bar][None, :, :], (h, 2 * w, 3))
+        else:
+            base = np.zeros((h, 2 * w, 3), dtype=np.float32) + 128
+        rng = np.random.default_rng(self.seed)
+        tile = np.clip(base + rng.normal(0, 8, (h, 2 * w, 3)), 0, 255).astype(np.uint8)
+        self._tile = cv2.cvtColor(tile, cv2.COLOR_BGR2GRAY) if self.pixel_format == MONO8 else tile
+        return True
+
+    def read(self, image=None):
+        self._pace()
+        offset = (self.frame_index * 4) % self.width
+        self.frame_index += 1
+        view = self._tile[:, offset:offset + self.width]
+        if image is None or image.shape != view.shape:
+            image = view.copy()
+        else:
+            np.copyto(image, view)
+        return True, image, time.monotonic()
+
+    def _pace(self):
+        if not self.fps:
+            return
+        now = time.monotonic()
+        if self._next_time is None or now - self._next_time > 1.0:
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += 1.0 / self.fps
+
+
+def source_from_spec(spec, default_index=0):
+    """Build a FrameSource from a short spec string.
+
+    opencv[:INDEX]              e.g. opencv:1
+    pylon[:SERIAL]              e.g. pylon:40012345
+    file:PATH[@FPS]             video file, directory or glob of images
+    synthetic[:WxH][@FPS][:PATTERN][:mono]   e.g. synthetic:3840x2160@30:bars
+    """
+    kind, _, rest = (spec or "opencv").partition(":")
+    kind = kind.lower()
+    if kind == "opencv":
+        return OpenCVSource(int(rest) if rest else default_index)
+    if kind == "pylon":
+        return PylonSource(rest or None)
+    if kind == "file":
+        path, _, fps = rest.rpartition("@") if "@" in rest else (rest, "", "")
+        return FileSource(path, float(fps) if fps else None)
+    if kind == "synthetic":
+        width, height, fps, pattern, mono = 1920, 1080, 30.0, "gradient", False
+        for part in filter(None, rest.split(":")):
+            size, _, rate = part.partition("@")
+            if "x" in size:
+                width, height = (int(v) for v in size.split("x"))
+            elif size == "mono":
+                mono = True
+            elif size:
+                pattern = size
+            if rate:
+                fps = float(rate)
+        return SyntheticSource(width, height, fps, pattern, mono)
+    raise ValueError(f"Unknown frame source: {spec}")
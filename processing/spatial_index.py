@@ -0,0 +1,69 @@
+import math
+from collections import defaultdict
+
+
+class GridIndex:
+    """Uniform-grid spatial index of axis-aligned bounding boxes.
+
+    Each key is filed under every `cell_size` cell its box touches, so a
+    point or rectangle query only looks at the few cells it covers. With
+    items of roughly similar size (particles, rulers) the cost of a query
+    does not depend on how many items are stored. Boxes are (x0, y0, x1, y1).
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)
+        self.boxes = {}
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, key):
+        return key in self.boxes
+
+    def _cell_range(self, x0, y0, x1, y1):
+        cs = self.cell_size
+        for cy in range(math.floor(y0 / cs), math.floor(y1 / cs) + 1):
+            for cx in range(math.floor(x0 / cs), math.floor(x1 / cs) + 1):
+                yield cx, cy
+
+    def insert(self, key, box):
+        if key in self.boxes:
+            self.remove(key)
+        self.boxes[key] = box
+        for cell in self._cell_range(*box):
+            self.cells[cell].add(key)
+
+    def remove(self, key):
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cell_range(*box):
+            keys = self.cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cells[cell]
+
+    def update(self, key, box):
+        self.insert(key, box)
+
+    def clear(self):
+        self.cells.clear()
+        self.boxes.clear()
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Keys whose boxes intersect the rectangle."""
+        found = set()
+        for cell in self._cell_range(x0, y0, x1, y1):
+            keys = self.cells.get(cell)
+            if keys:
+                found.update(keys)
+        return [key for key in found
+                if self.boxes[key][0] <= x1 and self.boxes[key][2] >= x0
+                and self.boxes[key][1] <= y1 and self.boxes[key][3] >= y0]
+
+    def query_point(self, x, y, radius=0.0):
+        """Keys whose boxes lie within `radius` of (x, y)."""
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius)
@@ -0,0 +1,93 @@
+import csv
+import time
+from collections import deque
+
+import numpy as np
+
+# Stage boundaries marked on every live frame, in pipeline order. 'capture' is
+# the acquisition time from the frame source; 'displayed' is set by the GUI
+# once the pixmap has been handed to the view.
+STAGES = ('capture', 'dequeued', 'tone', 'resize', 'color', 'histogram', 'record', 'convert', 'emitted',
+          'displayed')
+
+
+class PipelineStats:
+    """Rolling per-stage timings and rates for the live pipeline.
+
+    `record` is called once per displayed frame with its stage marks. Summary
+    figures cover the last `window` frames; per-frame rows are kept (up to
+    `history` of them) for CSV export. Allocation figures are the bytes the
+    frame made the buffer pool allocate (0 in steady state) and, when traced,
+    the peak of its temporary numpy/OpenCV allocations (None otherwise).
+    """
+
+    def __init__(self, window=120, history=100000):
+        self.window = window
+        self.rows = deque(maxlen=history)
+        self._recent = deque(maxlen=window)
+        self._captured = deque(maxlen=window)  # (time, frames captured so far)
+
+    def reset(self):
+        self.rows.clear()
+        self._recent.clear()
+        self._captured.clear()
+
+    def record(self, sequence, marks, frames_captured=0, frames_dropped=0, queue_depth=0, recorder_queue=0,
+               bytes_allocated=0, bytes_transient=None):
+        displayed = marks.get('displayed', time.monotonic())
+        row = [sequence]
+        previous = marks.get('capture', displayed)
+        for stage in STAGES:
+            t = marks.get(stage)
+            row.append(t)
+        # stage durations in ms; a skipped stage costs nothing
+        durations = []
+        for stage in STAGES[1:]:
+            t = marks.get(stage, previous)
+            durations.append((t - previous) * 1000.0)
+            previous = t
+        latency_ms = (displayed - marks.get('capture', displayed)) * 1000.0
+        row.extend(durations)
+        row.extend([latency_ms, frames_captured, frames_dropped, queue_depth, recorder_queue, bytes_allocated,
+                    bytes_transient])
+        self.rows.append(row)
+        self._recent.append((displayed, latency_ms, durations, bytes_allocated, bytes_transient))
+        self._captured.append((displayed, frames_captured))
+
+    def summary(self):
+        """Current figures as a dict (empty until two frames have been recorded)."""
+        if len(self._recent) < 2:
+            return {}
+        times = np.array([r[0] for r in self._recent])
+        latency = np.array([r[1] for r in self._recent])
+        durations = np.array([r[2] for r in self._recent])
+        span = times[-1] - times[0]
+        transient = [r[4] for r in self._recent if r[4] is not None]
+        (t0, c0), (t1, c1) = self._captured[0], self._captured[-1]
+        last = self.rows[-1]
+        return {
+            'capture_fps': (c1 - c0) / (t1 - t0) if t1 > t0 else 0.0,
+            'display_fps': (len(times) - 1) / span if span > 0 else 0.0,
+            'latency_ms': float(latency.mean()),
+            'latency_p95_ms': float(np.percentile(latency, 95)),
+            'latency_max_ms': float(latency.max()),
+            'stage_ms': dict(zip(STAGES[1:], durations.mean(axis=0).tolist())),
+            'frames_dropped': last[-5],
+            'queue_depth': last[-4],
+            'recorder_queue': last[-3],
+            'bytes_allocated_max': max(r[3] for r in self._recent),
+            'bytes_transient_max': max(transient) if transient else None,
+        }
+
+    def header(self):
+        return (['sequence'] + [f'{stage}_s' for stage in STAGES] + [f'{stage}_ms' for stage in STAGES[1:]]
+                + ['latency_ms', 'frames_captured', 'frames_dropped', 'queue_depth', 'recorder_queue',
+                   'bytes_allocated', 'bytes_transient'])
+
+    def export_csv(self, path):
+        """Write every recorded frame to `path`; returns the number of rows."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.header())
+            writer.writerows(self.rows)
+        return len(self.rows)
@@ -0,0 +1,56 @@
+import cv2
+
+from processing.pipeline import apply_grayscale
+
+
+class StillImage:
+    """A still decoded once per open, plus a cached screen-sized proxy of it."""
+
+    def __init__(self, source, path=None):
+        self.source = source  # full-resolution BGR
+        self.path = path
+        self._proxy = None
+        self._proxy_key = None
+
+    @classmethod
+    def load(cls, path):
+        """Decode `path` with OpenCV; None if OpenCV cannot read it."""
+        source = cv2.imread(path, cv2.IMREAD_COLOR)
+        if source is None:
+            return None
+        return cls(source, path)
+
+    @property
+    def width(self):
+        return self.source.shape[1]
+
+    @property
+    def height(self):
+        return self.source.shape[0]
+
+    def proxy(self, max_width, max_height):
+        """Downsampled copy that fits in max_width x max_height (the source itself if it already fits)."""
+        scale = min(1.0, max_width / self.width, max_height / self.height)
+        if scale >= 1.0:
+            return self.source
+
+        size = (max(1, int(self.width * scale)), max(1, int(self.height * scale)))
+        if self._proxy_key != size:
+            self._proxy = cv2.resize(self.source, size, interpolation=cv2.INTER_AREA)
+            self._proxy_key = size
+        return self._proxy
+
+
+def adjust_still(image, tone, grayscale, cancelled=None):
+    """Tone + grayscale adjustments on a BGR still, returned as a new RGB array.
+
+    `cancelled` is polled between stages so a superseded request can give up
+    early; None is returned in that case.
+    """
+    adjusted = tone.apply(image)
+    if cancelled is not None and cancelled():
+        return None
+
+    if grayscale:
+        apply_grayscale(adjusted)
+    return cv2.cvtColor(adjusted, cv2.COLOR_BGR2RGB, dst=adjusted)
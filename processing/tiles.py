@@ -0,0 +1,107 @@
+import math
+from collections import OrderedDict
+
+import cv2
+
+TILE_SIZE = 256
+
+
+class ImagePyramid:
+    """Power-of-two levels of an image, built lazily on first use.
+
+    `image` may itself be a reduced copy of the real image (a preview proxy);
+    `full_width`/`full_height` give the real size so callers can stay in
+    full-resolution image coordinates. Level k is `base_scale * 2**k` image
+    pixels per level pixel.
+    """
+
+    def __init__(self, image, full_width=None, full_height=None, tile_size=TILE_SIZE):
+        self.full_width = full_width or image.shape[1]
+        self.full_height = full_height or image.shape[0]
+        self.base_scale = self.full_width / image.shape[1]
+        self.tile_size = tile_size
+        self._levels = [image]
+        longest = max(image.shape[:2])
+        self.level_count = 1 + max(0, math.ceil(math.log2(longest / tile_size)))
+
+    def level(self, k):
+        while len(self._levels) <= k:
+            prev = self._levels[-1]
+            h, w = prev.shape[:2]
+            self._levels.append(cv2.resize(prev, ((w + 1) // 2, (h + 1) // 2), interpolation=cv2.INTER_AREA))
+        return self._levels[k]
+
+    def level_scale(self, k):
+        """Full-resolution image pixels per pixel of level k."""
+        return self.base_scale * (1 << k)
+
+    def level_for_zoom(self, zoom):
+        """Coarsest level that still has at least one pixel per screen pixel."""
+        k = 0
+        while k + 1 < self.level_count and self.level_scale(k + 1) * zoom <= 1.0:
+            k += 1
+        return k
+
+    def tile_range(self, k, x0, y0, x1, y1):
+        """Tile indices of level k covering the image-coordinate rect [x0, x1) x [y0, y1)."""
+        h, w = self.level(k).shape[:2]
+        step = self.tile_size * self.level_scale(k)
+        tx0 = max(0, int(x0 // step))
+        ty0 = max(0, int(y0 // step))
+        tx1 = min((w - 1) // self.tile_size, int(math.ceil(x1 / step)) - 1)
+        ty1 = min((h - 1) // self.tile_size, int(math.ceil(y1 / step)) - 1)
+        return range(tx0, tx1 + 1), range(ty0, ty1 + 1)
+
+    def tile(self, k, tx, ty):
+        """Pixels of one tile (a view into the level) and its rect in level pixels."""
+        level = self.level(k)
+        x, y = tx * self.tile_size, ty * self.tile_size
+        region = level[y:y + self.tile_size, x:x + self.tile_size]
+        return region, (x, y, region.shape[1], region.shape[0])
+
+
+class TileCache:
+    """LRU cache with a memory budget; `size_of` gives the cost of one entry in bytes."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, size_of=None):
+        self.max_bytes = max_bytes
+        self.size_of = size_of or (lambda item: item.nbytes)
+        self._items = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, value):
+        size = self.size_of(value)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[1]
+        self._items[key] = (value, size)
+        self.current_bytes += size
+        self._evict()
+
+    def set_budget(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _evict(self):
+        # least recently used first; the newest entry always stays
+        while self.current_bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def clear(self):
+        self._items.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,41 @@
+import time
+
+
+class TimelapseSchedule:
+    """Capture slots every `interval_s` seconds on the monotonic clock.
+
+    Slot k is at `start + k * interval_s`, computed from the start time rather
+    than from the previous capture, so timing errors never accumulate over a
+    long run. After a stall (e.g. the machine was busy) the late frame stands
+    in for the most recent slot; every earlier slot it passed is skipped and
+    counted in `missed`, so the next capture waits for the next future slot.
+    """
+
+    def __init__(self, interval_s, count=0, start=None):
+        self.interval_s = float(interval_s)
+        self.count = count  # 0 runs until stopped
+        self.start = time.monotonic() if start is None else start
+        self.index = 0
+        self.missed = 0
+
+    @property
+    def finished(self):
+        return 0 < self.count <= self.index
+
+    def slot_time(self, k):
+        return self.start + k * self.interval_s
+
+    def next_time(self):
+        return self.slot_time(self.index + self.missed)
+
+    def due(self, now):
+        return not self.finished and now >= self.next_time()
+
+    def advance(self, now):
+        """Mark the current slot as captured at `now`; returns its capture number (from 0)."""
+        taken = self.index
+        self.index += 1
+        # skip every slot that is already due, so the next capture is never in the past
+        while self.next_time() <= now:
+            self.missed += 1
+        return taken
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+# identity ramp used to evaluate the slider math once per LUT build
+_RAMP = np.arange(256, dtype=np.uint8).reshape(1, 256)
+
+
+def build_tone_lut(brightness, contrast, exposure):
+    """Fold brightness/contrast/exposure (0-100 slider values) into one 256-entry LUT."""
+    brightness_factor = (brightness - 50) * 2
+    contrast_factor = (contrast - 50) / 50.0
+    exposure_factor = (exposure - 50) / 50.0
+
+    # Run the exact same saturating ops the per-frame code used, but on 256 values only
+    lut = cv2.convertScaleAbs(_RAMP, alpha=1 + contrast_factor, beta=brightness_factor)
+    lut = cv2.convertScaleAbs(lut, alpha=1.0, beta=exposure_factor * 50)
+    return lut
+
+
+class ToneMapper:
+    """Brightness, contrast and exposure applied as a single table lookup per pixel.
+
+    The LUT is rebuilt only when one of the slider values actually changes, and the
+    new table is swapped in as one reference so a worker thread never sees a
+    half-built table.
+    """
+
+    def __init__(self, brightness=50, contrast=50, exposure=50):
+        self.brightness = brightness
+        self.contrast = contrast
+        self.exposure = exposure
+        self.lut = build_tone_lut(brightness, contrast, exposure)
+
+    def set_brightness(self, value):
+        if value != self.brightness:
+            self.brightness = value
+            self._rebuild()
+
+    def set_contrast(self, value):
+        if value != self.contrast:
+            self.contrast = value
+            self._rebuild()
+
+    def set_exposure(self, value):
+        if value != self.exposure:
+            self.exposure = value
+            self._rebuild()
+
+    def set_values(self, brightness, contrast, exposure):
+        if (brightness, contrast, exposure) != (self.brightness, self.contrast, self.exposure):
+            self.brightness = brightness
+            self.contrast = contrast
+            self.exposure = exposure
+            self._rebuild()
+
+    def is_identity(self):
+        return self.brightness == 50 and self.contrast == 50 and self.exposure == 50
+
+    def apply(self, frame, dst=None):
+        """Map every channel of a uint8 frame through the current LUT."""
+        if dst is None:
+            return cv2.LUT(frame, self.lut)
+        return cv2.LUT(frame, self.lut, dst=dst)
+
+    def _rebuild(self):
+        self.lut = build_tone_lut(self.brightness, self.contrast, self.exposure)
@@ -0,0 +1,54 @@
+import tracemalloc
+
+import numpy as np
+
+from CameraWorker import CameraWorkerThread
+from processing.frame import BGR8, Frame
+
+
+def synthetic_frames(width=640, height=480, count=2):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def run_frames(worker, frames, count, start=0, fps=30.0):
+    """Push `count` frames through process_counted; returns the (pool, transient) counters of each."""
+    counters = []
+    for i in range(start, start + count):
+        display = worker.process_counted(Frame(frames[i % len(frames)], i / fps, i, BGR8))
+        counters.append(worker.allocation_counters())
+        del display
+    return counters
+
+
+def make_worker():
+    worker = CameraWorkerThread()
+    worker.set_brightness(70)
+    worker.set_display_geometry(0, 0, 0.5)
+    return worker
+
+
+def test_steady_state_allocates_no_pool_buffers():
+    worker = make_worker()
+    frames = synthetic_frames()
+    warmup = run_frames(worker, frames, 5)
+    assert warmup[0][0] > 0  # the first frame fills the pool
+
+    # 2 s of frames, so the histogram, focus and white balance estimates all run several times
+    steady = run_frames(worker, frames, 60, start=5)
+    assert [pooled for pooled, _ in steady] == [0] * 60
+
+
+def test_steady_state_allocates_no_frame_sized_temporaries():
+    worker = make_worker()
+    frames = synthetic_frames()
+    run_frames(worker, frames, 30)
+
+    tracemalloc.start()
+    try:
+        steady = run_frames(worker, frames, 60, start=30)
+    finally:
+        tracemalloc.stop()
+    # Python-level bookkeeping (the Frame, its marks) only; one display canvas alone is 115 KB
+    assert max(transient for _, transient in steady) < 16 * 1024
+    assert worker.bytes_transient_per_frame is not None
@@ -0,0 +1,48 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import batch_process
+from processing.pipeline import PipelineSettings
+
+
+def write_image(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cv2.imwrite(str(path), np.full((8, 8, 3), value, np.uint8))
+
+
+def test_same_names_in_different_folders_keep_their_layout(tmp_path):
+    write_image(tmp_path / "in" / "a" / "img.png", 10)
+    write_image(tmp_path / "in" / "b" / "img.png", 200)
+    paths = batch_process.collect_inputs([str(tmp_path / "in" / "**" / "*.png")])
+    out = tmp_path / "out"
+
+    done, skipped, failed = batch_process.run_batch(paths, PipelineSettings(), str(out), jobs=1, progress=False)
+
+    assert (done, skipped, failed) == (2, 0, 0)
+    assert cv2.imread(str(out / "a" / "img.png"))[0, 0, 0] == 10
+    assert cv2.imread(str(out / "b" / "img.png"))[0, 0, 0] == 200
+
+
+def test_colliding_outputs_are_rejected_before_starting(tmp_path):
+    paths = [str(tmp_path / "img.png"), str(tmp_path / "img.jpg")]
+    with pytest.raises(ValueError):
+        batch_process.output_paths(paths, str(tmp_path / "out"), "png")
+    assert len(set(batch_process.output_paths(paths, str(tmp_path / "out")))) == 2
+
+
+def test_processing_error_fails_only_that_file(tmp_path, monkeypatch):
+    class Broken:
+        def process(self, image):
+            raise cv2.error("simulated failure")
+
+    source = tmp_path / "img.png"
+    write_image(source, 50)
+    monkeypatch.setattr(batch_process, "_pipeline", Broken())
+    monkeypatch.setattr(batch_process, "_overwrite", False)
+
+    path, out_path, error = batch_process._process_one((str(source), str(tmp_path / "out" / "img.png")))
+    assert out_path is None
+    assert "simulated failure" in error
@@ -0,0 +1,48 @@
+from processing.capture import CaptureThread
+from processing.sources import NO_FRAME, FrameSource
+
+
+class ScriptedSource(FrameSource):
+    """Replays a list of read() results, then reports the end of the stream."""
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    def read(self, image=None):
+        if not self.results:
+            return False, image, 0.0
+        ok = self.results.pop(0)
+        if isinstance(ok, Exception):
+            raise ok
+        return ok, bytearray(1) if ok else image, 0.0
+
+
+def run_capture(results):
+    capture = CaptureThread(ScriptedSource(results))
+    capture.start()
+    capture.join(timeout=5)
+    return capture
+
+
+def test_empty_reads_do_not_end_capture():
+    capture = run_capture([NO_FRAME, True, NO_FRAME, NO_FRAME, True])
+    assert capture.mailbox.frames_put == 2
+    assert capture.ended
+    assert capture.error is None
+    assert capture.mailbox.closed
+
+
+def test_source_error_ends_capture():
+    capture = run_capture([True, RuntimeError("device removed"), True])
+    assert capture.mailbox.frames_put == 1
+    assert capture.ended
+    assert isinstance(capture.error, RuntimeError)
+
+
+def test_stop_is_not_reported_as_an_end():
+    source = ScriptedSource([])
+    capture = CaptureThread(source)
+    source.read = lambda image=None: (capture.stop(), (False, image, 0.0))[1]  # stopped during a read
+    capture.start()
+    capture.join(timeout=5)
+    assert not capture.ended
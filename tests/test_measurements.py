@@ -0,0 +1,91 @@
+import csv
+import json
+
+import numpy as np
+
+from processing.measurements import (MeasurementTable, angles_deg, bounds, circle_radii, distances, export_csv,
+                                     export_json, line_lengths, summarize)
+
+
+def line_table(count):
+    table = MeasurementTable('line', capacity=4)
+    table.extend([[0, 0, i + 1, 0] for i in range(count)])  # lengths 1, 2, ..., count
+    return table
+
+
+def test_extend_grows_and_hands_out_dense_ids():
+    table = line_table(10)
+    assert len(table) == 10
+    assert table.rows['id'].tolist() == list(range(10))
+    assert table.append([0, 0, 3, 4]) == 10
+    assert line_lengths(table.rows)[-1] == 5.0
+
+
+def test_positions_follow_rows_after_removal():
+    table = line_table(10)
+    assert table.remove([2, 5, 5, 99]) == 2  # duplicates and unknown ids are ignored
+
+    assert table.rows['id'].tolist() == [0, 1, 3, 4, 6, 7, 8, 9]
+    assert table.take([9, 3, 5, 0])['id'].tolist() == [9, 3, 0]  # order kept, removed ids skipped
+    assert table.record(5) is None
+    assert table.record(7)['x1'] == 8.0
+
+    table.set_point(8, 1, 100.0, 0.0)
+    assert line_lengths(table.take([8]))[0] == 100.0
+
+
+def test_pop_and_restore_keep_the_id():
+    table = line_table(3)
+    record = table.pop()
+    assert record['id'] == 2 and len(table) == 2
+    assert table.record(2) is None
+
+    table.restore(record)
+    assert table.record(2)['x1'] == 3.0
+    assert table.append([0, 0, 1, 1]) == 3  # ids are never reused
+
+
+def test_clear_forgets_every_position():
+    table = line_table(5)
+    table.clear()
+    assert len(table) == 0
+    assert len(table.take(range(5))) == 0
+    assert table.append([0, 0, 1, 0]) == 5
+
+
+def test_vectorized_quantities():
+    circles = MeasurementTable('circle')
+    circles.extend([[10, 10, 13, 14], [0, 0, 0, 2]])
+    assert circle_radii(circles.rows).tolist() == [5.0, 2.0]
+    assert bounds('circle', circles.rows).tolist() == [[5, 5, 15, 15], [-2, -2, 2, 2]]
+    assert distances('circle', circles.rows, 10, 10).tolist() == [0.0, 12.142135623730951]
+
+    angles = MeasurementTable('angle')
+    angles.extend([[1, 0, 0, 0, 0, 1], [1, 0, 0, 0, -1, 0], [0, 0, 0, 0, 1, 1]])
+    np.testing.assert_allclose(angles_deg(angles.rows), [90.0, 180.0, 0.0])  # a zero-length arm gives 0
+
+
+def test_summarize():
+    summary = summarize([1, 2, 3, 4], bins=2)
+    assert summary['count'] == 4 and summary['mean'] == 2.5 and summary['max'] == 4.0
+    assert summary['histogram']['counts'] == [2, 2]
+    assert summarize([]) == {'count': 0}
+
+
+def test_export_csv_and_json(tmp_path):
+    tables = {'line': line_table(2), 'circle': MeasurementTable('circle'), 'angle': MeasurementTable('angle')}
+    tables['angle'].append([1, 0, 0, 0, 0, 1])
+
+    assert export_csv(tmp_path / "m.csv", tables) == 3
+    with open(tmp_path / "m.csv", newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['kind'] for row in rows] == ['line', 'line', 'angle']
+    assert float(rows[1]['value']) == 2.0 and rows[1]['x2'] == ''
+    assert float(rows[2]['value']) == 90.0 and rows[2]['unit'] == 'deg'
+
+    assert export_json(tmp_path / "m.json", tables) == 3
+    with open(tmp_path / "m.json") as f:
+        data = json.load(f)
+    assert data['measurements']['line']['length'] == [1.0, 2.0]
+    assert data['summary']['line']['mean'] == 1.5
+    assert data['summary']['circle'] == {'count': 0, 'quantity': 'radius', 'unit': 'px'}
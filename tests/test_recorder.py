@@ -0,0 +1,21 @@
+import threading
+
+import numpy as np
+
+from processing.recorder import VideoRecorder
+
+
+def test_stop_without_waiting_reports_through_on_finished(tmp_path):
+    recorder = VideoRecorder(str(tmp_path / "clip.avi"), fourcc='MJPG', warmup_frames=2)
+    finished = threading.Event()
+    summaries = []
+    recorder.on_finished = lambda summary: (summaries.append(summary), finished.set())
+    recorder.start()
+    frame = np.zeros((64, 96, 3), np.uint8)
+    for i in range(10):
+        recorder.submit(frame, i / 30.0)
+
+    assert recorder.stop(wait=False) is None
+    assert finished.wait(10)
+    assert summaries[0].frames_written + summaries[0].frames_dropped == 10
+    assert abs(summaries[0].fps - 30.0) < 1e-6
@@ -0,0 +1,39 @@
+from processing.spatial_index import GridIndex
+
+
+def test_queries_find_boxes_across_cells():
+    index = GridIndex(cell_size=10)
+    index.insert('a', (0, 0, 5, 5))
+    index.insert('b', (8, 8, 25, 12))  # spans three cells
+    index.insert('c', (-30, -30, -25, -25))
+
+    assert sorted(index.query_rect(0, 0, 30, 30)) == ['a', 'b']
+    assert index.query_point(24, 11) == ['b']
+    assert index.query_point(-27, -27) == ['c']
+    assert index.query_point(7, 7) == []
+    assert sorted(index.query_point(7, 7, radius=2)) == ['a', 'b']
+
+
+def test_update_moves_a_box_out_of_its_old_cells():
+    index = GridIndex(cell_size=10)
+    index.insert('a', (0, 0, 5, 5))
+    index.update('a', (100, 100, 105, 105))
+
+    assert index.query_point(2, 2) == []
+    assert index.query_point(102, 102) == ['a']
+    assert len(index) == 1
+    assert all(cell[0] >= 10 for cell in index.cells)  # no empty cells left behind
+
+
+def test_remove_and_clear():
+    index = GridIndex(cell_size=10)
+    for i in range(5):
+        index.insert(i, (i * 10, 0, i * 10 + 5, 5))
+    index.remove(2)
+    index.remove(42)  # unknown keys are ignored
+
+    assert 2 not in index and len(index) == 4
+    assert sorted(index.query_rect(0, 0, 50, 5)) == [0, 1, 3, 4]
+
+    index.clear()
+    assert len(index) == 0 and not index.cells
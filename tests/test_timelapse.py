@@ -0,0 +1,23 @@
+from processing.timelapse import TimelapseSchedule
+
+
+def test_late_frame_skips_passed_slots():
+    schedule = TimelapseSchedule(10, start=0.0)
+    captured = []
+    for now in (0.0, 10.0, 35.0, 35.03):
+        if schedule.due(now):
+            captured.append((now, schedule.advance(now)))
+
+    # the frame at 35 stands in for slot 30; slot 20 is missed and 35.03 is not due
+    assert captured == [(0.0, 0), (10.0, 1), (35.0, 2)]
+    assert schedule.missed == 1
+    assert schedule.next_time() == 40.0
+
+
+def test_on_time_frames_miss_nothing():
+    schedule = TimelapseSchedule(10, count=3, start=0.0)
+    for now in (0.0, 10.02, 20.5):
+        assert schedule.due(now)
+        schedule.advance(now)
+    assert schedule.missed == 0
+    assert schedule.finished
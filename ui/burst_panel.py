@@ -0,0 +1,65 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QSpinBox,
+                             QSlider)
+
+
+def burst_panel(self):
+    """Create the raw burst capture and review panel inside the right-side toolbox."""
+    burst_widget = QWidget()
+    burst_layout = QVBoxLayout()
+
+    # Capture
+    capture_group = QGroupBox("Burst Capture")
+    capture_layout = QVBoxLayout()
+
+    frames_row = QHBoxLayout()
+    frames_row.addWidget(QLabel("Frames:"))
+    self.burst_frames_spinbox = QSpinBox()
+    self.burst_frames_spinbox.setRange(2, 5000)
+    self.burst_frames_spinbox.setValue(200)
+    frames_row.addWidget(self.burst_frames_spinbox)
+
+    self.burst_btn = QPushButton("Capture Burst")
+    self.burst_btn.clicked.connect(self.start_burst)
+    self.burst_status_label = QLabel("Raw frames at the full camera rate.")
+    self.burst_status_label.setWordWrap(True)
+
+    capture_layout.addLayout(frames_row)
+    capture_layout.addWidget(self.burst_btn)
+    capture_layout.addWidget(self.burst_status_label)
+    capture_group.setLayout(capture_layout)
+
+    # Review
+    review_group = QGroupBox("Burst Review")
+    review_layout = QVBoxLayout()
+
+    open_btn = QPushButton("Open Burst...")
+    open_btn.clicked.connect(self.open_burst)
+
+    self.burst_slider = QSlider(Qt.Horizontal)
+    self.burst_slider.setRange(0, 0)
+    self.burst_slider.setEnabled(False)
+    self.burst_slider.valueChanged.connect(self.show_burst_frame)
+
+    step_row = QHBoxLayout()
+    prev_btn = QPushButton("<")
+    prev_btn.clicked.connect(lambda: self.burst_slider.setValue(self.burst_slider.value() - 1))
+    next_btn = QPushButton(">")
+    next_btn.clicked.connect(lambda: self.burst_slider.setValue(self.burst_slider.value() + 1))
+    self.burst_frame_label = QLabel("-")
+    self.burst_frame_label.setAlignment(Qt.AlignCenter)
+    step_row.addWidget(prev_btn)
+    step_row.addWidget(self.burst_frame_label, 1)
+    step_row.addWidget(next_btn)
+
+    review_layout.addWidget(open_btn)
+    review_layout.addWidget(self.burst_slider)
+    review_layout.addLayout(step_row)
+    review_group.setLayout(review_layout)
+
+    burst_layout.addWidget(capture_group)
+    burst_layout.addWidget(review_group)
+    burst_layout.addStretch()
+    burst_widget.setLayout(burst_layout)
+
+    self.right_toolbox.addItem(burst_widget, "Burst")
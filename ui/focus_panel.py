@@ -0,0 +1,53 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QCheckBox
+
+from FocusSparkline import FocusSparkline
+
+
+def focus_panel(self):
+    """Create the live focus metric panel inside the right-side toolbox."""
+    focus_widget = QWidget()
+    focus_layout = QVBoxLayout()
+
+    group = QGroupBox("Focus Metric")
+    group_layout = QVBoxLayout()
+
+    self.focus_enabled_checkbox = QCheckBox("Live Focus Metric")
+    self.focus_enabled_checkbox.setChecked(True)
+    self.focus_enabled_checkbox.toggled.connect(self.update_focus_metric)
+
+    self.focus_score_label = QLabel("-")
+    font = QFont()
+    font.setPointSize(20)
+    font.setBold(True)
+    self.focus_score_label.setFont(font)
+    self.focus_score_label.setAlignment(Qt.AlignCenter)
+
+    self.focus_sparkline = FocusSparkline()
+    self.focus_peak_label = QLabel("Peak: -")
+
+    roi_row = QHBoxLayout()
+    self.focus_roi_btn = QPushButton("Draw ROI")
+    self.focus_roi_btn.setCheckable(True)
+    self.focus_roi_btn.toggled.connect(self.central_label.enable_focus_roi_tool)
+    center_btn = QPushButton("Center ROI")
+    center_btn.clicked.connect(lambda: self.central_label.set_focus_roi(None))
+    reset_btn = QPushButton("Reset Peak")
+    reset_btn.clicked.connect(self.reset_focus_peak)
+    roi_row.addWidget(self.focus_roi_btn)
+    roi_row.addWidget(center_btn)
+    roi_row.addWidget(reset_btn)
+
+    group_layout.addWidget(self.focus_enabled_checkbox)
+    group_layout.addWidget(self.focus_score_label)
+    group_layout.addWidget(self.focus_sparkline)
+    group_layout.addWidget(self.focus_peak_label)
+    group_layout.addLayout(roi_row)
+    group.setLayout(group_layout)
+
+    focus_layout.addWidget(group)
+    focus_layout.addStretch()
+    focus_widget.setLayout(focus_layout)
+
+    self.right_toolbox.addItem(focus_widget, "Focus")
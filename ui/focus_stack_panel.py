@@ -0,0 +1,51 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QCheckBox,
+                             QDoubleSpinBox)
+
+
+def focus_stack_panel(self):
+    """Create the focus stacking panel inside the right-side toolbox."""
+    stack_widget = QWidget()
+    stack_layout = QVBoxLayout()
+
+    group = QGroupBox("Focus Stack")
+    group_layout = QVBoxLayout()
+
+    new_btn = QPushButton("New Stack")
+    new_btn.clicked.connect(self.new_focus_stack)
+
+    # one slice per press (Ctrl+F); step the focus between presses
+    self.stack_slice_btn = QPushButton("Add Slice (Ctrl+F)")
+    self.stack_slice_btn.setShortcut("Ctrl+F")
+    self.stack_slice_btn.clicked.connect(self.capture_stack_slice)
+
+    interval_row = QHBoxLayout()
+    self.stack_interval_checkbox = QCheckBox("Every")
+    self.stack_interval_checkbox.toggled.connect(self.toggle_stack_interval)
+    self.stack_interval_spinbox = QDoubleSpinBox()
+    self.stack_interval_spinbox.setRange(0.2, 60.0)
+    self.stack_interval_spinbox.setValue(2.0)
+    self.stack_interval_spinbox.setSuffix(" s")
+    interval_row.addWidget(self.stack_interval_checkbox)
+    interval_row.addWidget(self.stack_interval_spinbox)
+
+    self.stack_fuse_btn = QPushButton("Fuse Stack")
+    self.stack_fuse_btn.clicked.connect(self.fuse_focus_stack)
+    self.stack_status_label = QLabel("No stack.")
+    self.stack_status_label.setWordWrap(True)
+
+    self.stack_timer = QTimer(self)
+    self.stack_timer.timeout.connect(self.capture_stack_slice)
+
+    group_layout.addWidget(new_btn)
+    group_layout.addWidget(self.stack_slice_btn)
+    group_layout.addLayout(interval_row)
+    group_layout.addWidget(self.stack_fuse_btn)
+    group_layout.addWidget(self.stack_status_label)
+    group.setLayout(group_layout)
+
+    stack_layout.addWidget(group)
+    stack_layout.addStretch()
+    stack_widget.setLayout(stack_layout)
+
+    self.right_toolbox.addItem(stack_widget, "Focus Stack")
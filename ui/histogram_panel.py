@@ -1,5 +1,5 @@
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QLabel, QPushButton
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QSpinBox
 
 def histogram_panel(self):
     """Create a Histogram panel inside the right-side toolbox."""
@@ -22,7 +22,18 @@ def histogram_panel(self):
     refresh_btn = QPushButton("Refresh Histogram")
     refresh_btn.clicked.connect(self.update_histogram)
 
+    # Live histogram update rate (0 turns live updates off)
+    rate_row = QHBoxLayout()
+    rate_row.addWidget(QLabel("Live updates:"))
+    self.histogram_rate_spinbox = QSpinBox()
+    self.histogram_rate_spinbox.setRange(0, 30)
+    self.histogram_rate_spinbox.setSuffix(" Hz")
+    self.histogram_rate_spinbox.setValue(int(self.histogram_engine.rate_hz))
+    self.histogram_rate_spinbox.valueChanged.connect(self.update_histogram_rate)
+    rate_row.addWidget(self.histogram_rate_spinbox)
+
     hist_layout.addWidget(self.histogram_panel_label)
+    hist_layout.addLayout(rate_row)
     hist_layout.addWidget(refresh_btn)
     hist_group.setLayout(hist_layout)
 
@@ -0,0 +1,50 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QFormLayout,
+                             QComboBox)
+
+
+def measurements_panel(self):
+    """Create the measurement summary and export panel inside the right-side toolbox."""
+    measurements_widget = QWidget()
+    measurements_layout = QVBoxLayout()
+
+    group = QGroupBox("Measurement Summary")
+    group_layout = QVBoxLayout()
+
+    self.measurement_kind_combo = QComboBox()
+    for title, kind in (("Lines (length)", 'line'), ("Circles (radius)", 'circle'), ("Angles", 'angle')):
+        self.measurement_kind_combo.addItem(title, kind)
+    self.measurement_kind_combo.currentIndexChanged.connect(self.refresh_measurement_summary)
+
+    form = QFormLayout()
+    self.measurement_labels = {}
+    for key, title in (('count', "Count:"), ('mean', "Mean:"), ('std', "Std:"), ('min', "Min:"), ('max', "Max:")):
+        self.measurement_labels[key] = QLabel("-")
+        form.addRow(title, self.measurement_labels[key])
+
+    self.measurement_histogram_label = QLabel()
+    self.measurement_histogram_label.setFixedHeight(80)
+    self.measurement_histogram_label.setAlignment(Qt.AlignCenter)
+
+    button_row = QHBoxLayout()
+    csv_btn = QPushButton("Export CSV")
+    csv_btn.clicked.connect(lambda: self.export_measurements('csv'))
+    json_btn = QPushButton("Export JSON")
+    json_btn.clicked.connect(lambda: self.export_measurements('json'))
+    button_row.addWidget(csv_btn)
+    button_row.addWidget(json_btn)
+
+    group_layout.addWidget(self.measurement_kind_combo)
+    group_layout.addLayout(form)
+    group_layout.addWidget(self.measurement_histogram_label)
+    group_layout.addLayout(button_row)
+    group.setLayout(group_layout)
+
+    measurements_layout.addWidget(group)
+    measurements_layout.addStretch()
+    measurements_widget.setLayout(measurements_layout)
+
+    # Summaries are recomputed whenever the committed measurements change
+    self.central_label.measurements_changed.connect(self.refresh_measurement_summary)
+
+    self.right_toolbox.addItem(measurements_widget, "Measurements")
@@ -9,6 +9,9 @@ def menu_bar(self):
     open_image_action.triggered.connect(self.open_image)
     open_image_action.setShortcut("Ctrl+I")
 
+    open_burst_action = open_menu_item.addAction("Open Burst")
+    open_burst_action.triggered.connect(self.open_burst)
+
     open_camera_action = open_menu_item.addAction("Open Camera")
     open_camera_action.triggered.connect(self.start_stop_camera_feed)
     open_camera_action.setShortcut("Ctrl+C")
@@ -29,4 +32,7 @@ def menu_bar(self):
     self.ruler_action.setShortcut("Ctrl+M")
 
     clear_rulers_action = tools_menu.addAction("Clear All Measurements")
-    clear_rulers_action.triggered.connect(self.clear_all_rulers)
\ No newline at end of file
+    clear_rulers_action.triggered.connect(self.clear_all_rulers)
+
+    delete_measurements_action = tools_menu.addAction("Delete Selected Measurements")
+    delete_measurements_action.triggered.connect(self.delete_selected_measurements)
\ No newline at end of file
@@ -0,0 +1,45 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton
+
+
+def mosaic_panel(self):
+    """Create the slide mosaic panel inside the right-side toolbox."""
+    mosaic_widget = QWidget()
+    mosaic_layout = QVBoxLayout()
+
+    group = QGroupBox("Mosaic")
+    group_layout = QVBoxLayout()
+
+    button_row = QHBoxLayout()
+    new_btn = QPushButton("New Mosaic")
+    new_btn.clicked.connect(self.new_mosaic)
+    # move the stage so the next field overlaps the last one, then add it
+    self.mosaic_add_btn = QPushButton("Add Field (Ctrl+G)")
+    self.mosaic_add_btn.setShortcut("Ctrl+G")
+    self.mosaic_add_btn.clicked.connect(self.add_mosaic_field)
+    button_row.addWidget(new_btn)
+    button_row.addWidget(self.mosaic_add_btn)
+
+    # Live overview of the canvas, refreshed as fields are placed
+    self.mosaic_overview_label = QLabel("No mosaic.")
+    self.mosaic_overview_label.setAlignment(Qt.AlignCenter)
+    self.mosaic_overview_label.setMinimumHeight(160)
+    self.mosaic_overview_label.setStyleSheet("background-color:#111; border:1px solid #333; color:#aaa;")
+
+    self.mosaic_status_label = QLabel("")
+    self.mosaic_status_label.setWordWrap(True)
+
+    export_btn = QPushButton("Export Mosaic...")
+    export_btn.clicked.connect(self.export_mosaic)
+
+    group_layout.addLayout(button_row)
+    group_layout.addWidget(self.mosaic_overview_label)
+    group_layout.addWidget(self.mosaic_status_label)
+    group_layout.addWidget(export_btn)
+    group.setLayout(group_layout)
+
+    mosaic_layout.addWidget(group)
+    mosaic_layout.addStretch()
+    mosaic_widget.setLayout(mosaic_layout)
+
+    self.right_toolbox.addItem(mosaic_widget, "Mosaic")
@@ -0,0 +1,82 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QDoubleSpinBox,
+                             QComboBox, QFormLayout, QCheckBox)
+
+from processing.particles import AUTO, BRIGHT, CONTOURS, DARK, HOUGH
+
+# Live detection: label -> detections per second
+LIVE_DETECTION_RATES = (("1 / s", 1.0), ("2 / s", 2.0), ("1 / 5 s", 0.2))
+
+
+def particles_panel(self):
+    """Create the particle/cell detection panel inside the right-side toolbox."""
+    particles_widget = QWidget()
+    particles_layout = QVBoxLayout()
+
+    group = QGroupBox("Particle Detection")
+    form = QFormLayout()
+
+    self.particle_method_combo = QComboBox()
+    self.particle_method_combo.addItem("Threshold + contours", CONTOURS)
+    self.particle_method_combo.addItem("Hough circles", HOUGH)
+    form.addRow("Method:", self.particle_method_combo)
+
+    self.particle_polarity_combo = QComboBox()
+    for title, polarity in (("Auto", AUTO), ("Dark on light", DARK), ("Light on dark", BRIGHT)):
+        self.particle_polarity_combo.addItem(title, polarity)
+    form.addRow("Objects:", self.particle_polarity_combo)
+
+    self.particle_min_radius_spinbox = QDoubleSpinBox()
+    self.particle_min_radius_spinbox.setRange(1.0, 5000.0)
+    self.particle_min_radius_spinbox.setValue(3.0)
+    self.particle_min_radius_spinbox.setSuffix(" px")
+    form.addRow("Min radius:", self.particle_min_radius_spinbox)
+
+    self.particle_max_radius_spinbox = QDoubleSpinBox()
+    self.particle_max_radius_spinbox.setRange(1.0, 5000.0)
+    self.particle_max_radius_spinbox.setValue(200.0)
+    self.particle_max_radius_spinbox.setSuffix(" px")
+    form.addRow("Max radius:", self.particle_max_radius_spinbox)
+
+    self.particle_circularity_spinbox = QDoubleSpinBox()
+    self.particle_circularity_spinbox.setRange(0.0, 1.0)
+    self.particle_circularity_spinbox.setSingleStep(0.05)
+    self.particle_circularity_spinbox.setValue(0.7)
+    form.addRow("Min circularity:", self.particle_circularity_spinbox)
+
+    button_row = QHBoxLayout()
+    detect_btn = QPushButton("Detect")
+    detect_btn.clicked.connect(self.detect_particles)
+    clear_btn = QPushButton("Clear Detections")
+    clear_btn.clicked.connect(self.clear_detected_particles)
+    button_row.addWidget(detect_btn)
+    button_row.addWidget(clear_btn)
+
+    live_row = QHBoxLayout()
+    self.particle_live_checkbox = QCheckBox("Live")
+    self.particle_live_checkbox.toggled.connect(self.update_live_detection)
+    self.particle_rate_combo = QComboBox()
+    self.particle_rate_combo.addItems([label for label, _ in LIVE_DETECTION_RATES])
+    self.particle_rate_combo.currentIndexChanged.connect(self.update_live_detection)
+    live_row.addWidget(self.particle_live_checkbox)
+    live_row.addWidget(self.particle_rate_combo)
+
+    self.particle_status_label = QLabel("")
+    self.particle_status_label.setWordWrap(True)
+
+    group_layout = QVBoxLayout()
+    group_layout.addLayout(form)
+    group_layout.addLayout(button_row)
+    group_layout.addLayout(live_row)
+    group_layout.addWidget(self.particle_status_label)
+    group.setLayout(group_layout)
+
+    particles_layout.addWidget(group)
+    particles_layout.addStretch()
+    particles_widget.setLayout(particles_layout)
+
+    # Live detection requests a frame on this timer, skipping a tick while one is still running
+    self.particle_timer = QTimer(self)
+    self.particle_timer.timeout.connect(self.detect_live_particles)
+
+    self.right_toolbox.addItem(particles_widget, "Particles")
@@ -0,0 +1,51 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QFormLayout
+
+from processing.stats import STAGES
+
+
+def stats_panel(self):
+    """Create a live pipeline statistics panel inside the right-side toolbox."""
+    stats_widget = QWidget()
+    stats_layout = QVBoxLayout()
+
+    # Rates, latency and queues
+    live_group = QGroupBox("Live Pipeline")
+    live_form = QFormLayout()
+    self.stats_labels = {}
+    for key, title in (('capture_fps', "Capture:"), ('display_fps', "Display:"), ('latency_ms', "Latency:"),
+                       ('queue_depth', "Queue depth:"), ('recorder_queue', "Recorder queue:"),
+                       ('frames_dropped', "Dropped frames:"), ('bytes_allocated', "Allocated / frame:")):
+        self.stats_labels[key] = QLabel("-")
+        live_form.addRow(title, self.stats_labels[key])
+    live_group.setLayout(live_form)
+
+    # Mean time spent in each stage
+    stage_group = QGroupBox("Stage Times (ms)")
+    stage_form = QFormLayout()
+    self.stats_stage_labels = {}
+    for stage in STAGES[1:]:
+        self.stats_stage_labels[stage] = QLabel("-")
+        stage_form.addRow(stage.capitalize() + ":", self.stats_stage_labels[stage])
+    stage_group.setLayout(stage_form)
+
+    button_row = QHBoxLayout()
+    export_btn = QPushButton("Export CSV")
+    export_btn.clicked.connect(self.export_stats_csv)
+    reset_btn = QPushButton("Reset")
+    reset_btn.clicked.connect(self.reset_stats)
+    button_row.addWidget(export_btn)
+    button_row.addWidget(reset_btn)
+
+    stats_layout.addWidget(live_group)
+    stats_layout.addWidget(stage_group)
+    stats_layout.addLayout(button_row)
+    stats_layout.addStretch()
+    stats_widget.setLayout(stats_layout)
+
+    # The labels refresh on a timer, not per frame
+    self.stats_timer = QTimer(self)
+    self.stats_timer.timeout.connect(self.refresh_stats_panel)
+    self.stats_timer.start(500)
+
+    self.right_toolbox.addItem(stats_widget, "Statistics")
@@ -0,0 +1,49 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QLabel, QPushButton, QSpinBox, QDoubleSpinBox,
+                             QComboBox, QFormLayout)
+
+# Live view while a time-lapse runs: label -> preview rate in Hz (None = every frame, 0 = off)
+PREVIEW_RATES = (("Full rate", None), ("1 fps", 1.0), ("1 frame / 5 s", 0.2), ("Off", 0))
+
+
+def timelapse_panel(self):
+    """Create the time-lapse panel inside the right-side toolbox."""
+    timelapse_widget = QWidget()
+    timelapse_layout = QVBoxLayout()
+
+    group = QGroupBox("Time-lapse")
+    form = QFormLayout()
+
+    self.timelapse_interval_spinbox = QDoubleSpinBox()
+    self.timelapse_interval_spinbox.setRange(0.1, 86400.0)
+    self.timelapse_interval_spinbox.setDecimals(1)
+    self.timelapse_interval_spinbox.setValue(10.0)
+    self.timelapse_interval_spinbox.setSuffix(" s")
+    form.addRow("Interval:", self.timelapse_interval_spinbox)
+
+    self.timelapse_count_spinbox = QSpinBox()
+    self.timelapse_count_spinbox.setRange(0, 1000000)
+    self.timelapse_count_spinbox.setSpecialValueText("Until stopped")
+    form.addRow("Frames:", self.timelapse_count_spinbox)
+
+    self.timelapse_preview_combo = QComboBox()
+    self.timelapse_preview_combo.addItems([label for label, _ in PREVIEW_RATES])
+    self.timelapse_preview_combo.setCurrentIndex(1)
+    self.timelapse_preview_combo.currentIndexChanged.connect(self.update_timelapse_preview)
+    form.addRow("Live view:", self.timelapse_preview_combo)
+
+    self.timelapse_btn = QPushButton("Start Time-lapse")
+    self.timelapse_btn.clicked.connect(self.start_stop_timelapse)
+    self.timelapse_status_label = QLabel("Not running.")
+    self.timelapse_status_label.setWordWrap(True)
+
+    group_layout = QVBoxLayout()
+    group_layout.addLayout(form)
+    group_layout.addWidget(self.timelapse_btn)
+    group_layout.addWidget(self.timelapse_status_label)
+    group.setLayout(group_layout)
+
+    timelapse_layout.addWidget(group)
+    timelapse_layout.addStretch()
+    timelapse_widget.setLayout(timelapse_layout)
+
+    self.right_toolbox.addItem(timelapse_widget, "Time-lapse")
@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from processing.frame import MONO8, RGB8
+
+_QT_FORMATS = {
+    RGB8: QImage.Format_RGB888,
+    MONO8: QImage.Format_Grayscale8,
+}
+
+
+def frame_to_qimage(frame):
+    """QImage that wraps the frame's pixels without copying.
+
+    The QImage does not own the memory: keep `frame` referenced for as long as
+    the QImage (or anything implicitly sharing it) is in use.
+    """
+    image = frame.image
+    return QImage(image.data, image.shape[1], image.shape[0], image.strides[0],
+                  _QT_FORMATS[frame.pixel_format])
+
+
+def qimage_to_bgr(qimage):
+    """Copy a QImage of any format into a new BGR numpy array."""
+    qimage = qimage.convertToFormat(QImage.Format_RGB888)
+    width, height = qimage.width(), qimage.height()
+    ptr = qimage.bits()
+    ptr.setsize(qimage.bytesPerLine() * height)
+    rows = np.frombuffer(ptr, dtype=np.uint8).reshape((height, qimage.bytesPerLine()))
+    rgb = rows[:, :width * 3].reshape((height, width, 3))
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)